@@ -0,0 +1,110 @@
+"""Compare JSON codec backends on load, scan and insert workloads.
+
+For every installed backend (see `rdbms.codec.available()`) this builds a
+table of synthetic rows in a temporary directory and times:
+
+- insert: `Table.insert_many` of all rows (encode + append + index persist)
+- load:   opening the table (decode data.jsonl, build the primary-key map)
+- scan:   decoding data.jsonl line by line, as a streaming reader would
+
+Usage:
+    python benchmarks/codec_bench.py [--rows 50000] [--repeat 3] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from rdbms import codec  # noqa: E402
+from rdbms.catalog import Catalog  # noqa: E402
+from rdbms.storage import Table  # noqa: E402
+
+SCHEMA = {
+    "name": "bench",
+    "columns": [
+        {"name": "id", "type": "INT"},
+        {"name": "name", "type": "TEXT"},
+        {"name": "price", "type": "FLOAT"},
+        {"name": "active", "type": "BOOL"},
+        {"name": "created", "type": "TIMESTAMP"},
+    ],
+    "constraints": {"primary_key": ["id"], "unique": []},
+    "indexes": [],
+}
+
+
+def make_rows(n: int):
+    rnd = random.Random(42)
+    return [
+        {
+            "id": i,
+            "name": f"item-{i}-{rnd.randrange(10**6)}",
+            "price": round(rnd.random() * 1000, 2),
+            "active": rnd.random() < 0.5,
+            "created": f"2024-01-{1 + i % 28:02d}T12:00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def run_backend(name: str, rows, repeat: int):
+    codec.use(name)
+    best = {"insert": float("inf"), "load": float("inf"), "scan": float("inf")}
+    for _ in range(repeat):
+        base = tempfile.mkdtemp(prefix="codec_bench_")
+        try:
+            cat = Catalog(base_dir=base)
+            cat.create_table(SCHEMA)
+            t = Table("bench", catalog=cat)
+            start = time.perf_counter()
+            t.insert_many(rows)
+            best["insert"] = min(best["insert"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            Table("bench", catalog=cat)
+            best["load"] = min(best["load"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with open(t.data_file, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        codec.loads(line)
+            best["scan"] = min(best["scan"], time.perf_counter() - start)
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+    return best
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=50000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args(argv)
+
+    rows = make_rows(args.rows)
+    original = codec.BACKEND
+    results = {}
+    try:
+        for name in codec.available():
+            results[name] = run_backend(name, rows, args.repeat)
+    finally:
+        codec.use(original)
+
+    print(f"{args.rows} rows, best of {args.repeat} (rows/s)")
+    print(f"{'backend':<10}{'insert':>14}{'load':>14}{'scan':>14}")
+    for name, r in results.items():
+        print(f"{name:<10}" + "".join(f"{args.rows / r[k]:>14,.0f}" for k in ("insert", "load", "scan")))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "seconds": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
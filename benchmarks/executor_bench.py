@@ -0,0 +1,227 @@
+"""Benchmark `Executor.execute` on the core statement types.
+
+Builds synthetic tables in a temporary directory and measures throughput and
+latency percentiles for:
+
+- insert:        bulk multi-row INSERT statements (--batch rows each)
+- pk_lookup:     SELECT * ... WHERE id = ?
+- index_lookup:  SELECT * ... WHERE grp = ? (secondary index, ~rows/groups matches)
+- scan_filter:   SELECT id ... WHERE val < ? (full scan, ~1% selectivity)
+- join:          SELECT * FROM groups INNER JOIN items ON groups.gid = items.grp WHERE groups.gid = ?
+- update:        UPDATE items SET val = ? WHERE id = ?
+- delete:        DELETE FROM items WHERE id = ?
+
+The `items` table has id (PRIMARY KEY), grp (indexed INT) and val (FLOAT)
+plus the extra columns given by --columns, e.g. `int=2,text=2,timestamp=1`
+(types: int, float, text, bool, date, timestamp). The result cache is off, so
+every statement runs through the engine.
+
+Usage:
+    python benchmarks/executor_bench.py [--rows 20000] [--columns text=2,int=1] [--ops pk_lookup,join]
+                                        [--samples 500] [--write-samples 50] [--storage jsonl|segmented]
+                                        [--json out.json] [--compare previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from rdbms import codec  # noqa: E402
+from rdbms.executor import Executor  # noqa: E402
+
+OPS = ["insert", "pk_lookup", "index_lookup", "scan_filter", "join", "update", "delete"]
+TYPES = {"int": "INT", "float": "FLOAT", "text": "TEXT", "bool": "BOOL", "date": "DATE", "timestamp": "TIMESTAMP"}
+
+
+def parse_columns(spec: str):
+    """Turn `text=2,int=1` into [(name, TYPE), ...]."""
+    cols = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, count = part.partition("=")
+        if kind not in TYPES:
+            raise SystemExit(f"unknown column type {kind!r} (expected one of {', '.join(TYPES)})")
+        cols += [(f"{kind}{i}", TYPES[kind]) for i in range(int(count or 1))]
+    return cols
+
+
+def sql_literal(v):
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, str):
+        return "'" + v.replace("'", "''") + "'"
+    return repr(v)
+
+
+def make_row(i: int, rnd: random.Random, extra, groups: int):
+    row = {"id": i, "grp": rnd.randrange(groups), "val": round(rnd.random(), 6)}
+    for name, typ in extra:
+        if typ == "INT":
+            row[name] = rnd.randrange(10**6)
+        elif typ == "FLOAT":
+            row[name] = round(rnd.random() * 1000, 3)
+        elif typ == "TEXT":
+            row[name] = "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(12))
+        elif typ == "BOOL":
+            row[name] = rnd.random() < 0.5
+        elif typ == "DATE":
+            row[name] = (date(2024, 1, 1) + timedelta(days=i // 1000)).isoformat()
+        else:
+            # append-ordered, like a CURRENT_TIMESTAMP default
+            row[name] = (datetime(2024, 1, 1) + timedelta(seconds=i)).isoformat()
+    return row
+
+
+def summarize(samples, items: int = None):
+    """Latency percentiles (ms) and throughput for a list of per-statement seconds."""
+    s = sorted(samples)
+    n = len(s)
+
+    def pct(p):
+        return s[min(n - 1, int(round(p / 100 * (n - 1))))] * 1000
+
+    total = sum(s)
+    out = {
+        "count": n,
+        "total_s": total,
+        "ops_per_s": n / total if total else 0.0,
+        "mean_ms": total / n * 1000,
+        "p50_ms": pct(50),
+        "p90_ms": pct(90),
+        "p99_ms": pct(99),
+        "max_ms": s[-1] * 1000,
+    }
+    if items is not None:
+        out["rows_per_s"] = items / total if total else 0.0
+    return out
+
+
+def timed(exe: Executor, statements):
+    samples = []
+    for sql, params in statements:
+        start = time.perf_counter()
+        exe.execute(sql, params)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(args):
+    rnd = random.Random(args.seed)
+    extra = parse_columns(args.columns)
+    groups = max(1, args.rows // args.group_size)
+    ops = args.ops.split(",") if args.ops else OPS
+    for op in ops:
+        if op not in OPS:
+            raise SystemExit(f"unknown op {op!r} (expected some of {', '.join(OPS)})")
+    base = tempfile.mkdtemp(prefix="executor_bench_")
+    results = {}
+    try:
+        exe = Executor(base_dir=base)
+        opts = " WITH (format = segmented)" if args.storage == "segmented" else ""
+        coldefs = ", ".join(f"{n} {t}" for n, t in extra)
+        exe.execute(f"CREATE TABLE items (id INT, grp INT, val FLOAT{', ' + coldefs if coldefs else ''}, "
+                    f"PRIMARY KEY (id), INDEX (grp)){opts}")
+        exe.execute("CREATE TABLE groups (gid INT, label TEXT, PRIMARY KEY (gid))")
+
+        names = ["id", "grp", "val"] + [n for n, _ in extra]
+        rows = [make_row(i, rnd, extra, groups) for i in range(args.rows)]
+        inserts = []
+        for i in range(0, len(rows), args.batch):
+            values = ", ".join("(" + ", ".join(sql_literal(r[c]) for c in names) + ")" for r in rows[i:i + args.batch])
+            inserts.append((f"INSERT INTO items ({', '.join(names)}) VALUES {values}", None))
+        samples = timed(exe, inserts)
+        if "insert" in ops:
+            results["insert"] = summarize(samples, items=len(rows))
+        exe.execute("INSERT INTO groups (gid, label) VALUES " + ", ".join(f"({g}, 'group-{g}')" for g in range(groups)))
+
+        ids = [rnd.randrange(args.rows) for _ in range(args.samples)]
+        if "pk_lookup" in ops:
+            results["pk_lookup"] = summarize(timed(exe, [("SELECT * FROM items WHERE id = ?", [i]) for i in ids]))
+        if "index_lookup" in ops:
+            stmts = [("SELECT * FROM items WHERE grp = ?", [rnd.randrange(groups)]) for _ in range(args.samples)]
+            results["index_lookup"] = summarize(timed(exe, stmts))
+        if "scan_filter" in ops:
+            stmts = [("SELECT id FROM items WHERE val < ?", [rnd.random() * 0.02]) for _ in range(args.scan_samples)]
+            results["scan_filter"] = summarize(timed(exe, stmts), items=args.rows * args.scan_samples)
+        if "join" in ops:
+            stmts = [("SELECT * FROM groups INNER JOIN items ON groups.gid = items.grp WHERE groups.gid = ?",
+                      [rnd.randrange(groups)]) for _ in range(args.samples)]
+            results["join"] = summarize(timed(exe, stmts))
+        victims = rnd.sample(range(args.rows), min(args.rows, 2 * args.write_samples))
+        if "update" in ops:
+            stmts = [("UPDATE items SET val = ? WHERE id = ?", [rnd.random(), i]) for i in victims[:args.write_samples]]
+            results["update"] = summarize(timed(exe, stmts))
+        if "delete" in ops:
+            stmts = [("DELETE FROM items WHERE id = ?", [i]) for i in victims[args.write_samples:]]
+            results["delete"] = summarize(timed(exe, stmts))
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+    return {
+        "meta": {
+            "rows": args.rows,
+            "columns": args.columns,
+            "storage": args.storage,
+            "batch": args.batch,
+            "group_size": args.group_size,
+            "seed": args.seed,
+            "codec": codec.BACKEND,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().replace(microsecond=0).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def report(data, previous=None):
+    meta = data["meta"]
+    print(f"{meta['rows']} rows, storage={meta['storage']}, columns='{meta['columns']}', codec={meta['codec']}")
+    print(f"{'op':<14}{'count':>7}{'ops/s':>11}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+          + ("   p50 vs prev" if previous else ""))
+    for op, r in data["results"].items():
+        line = (f"{op:<14}{r['count']:>7}{r['ops_per_s']:>11,.0f}{r['p50_ms']:>10.3f}"
+                f"{r['p90_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}")
+        prev = (previous or {}).get("results", {}).get(op)
+        if prev and prev["p50_ms"]:
+            line += f"   {(r['p50_ms'] / prev['p50_ms'] - 1) * 100:+.1f}%"
+        print(line)
+        if "rows_per_s" in r:
+            print(f"{'':<14}{r['rows_per_s']:>18,.0f} rows/s")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=20000)
+    ap.add_argument("--columns", default="text=2,int=1,timestamp=1", help="extra column mix, e.g. text=2,int=1")
+    ap.add_argument("--ops", help=f"comma-separated subset of {','.join(OPS)}")
+    ap.add_argument("--batch", type=int, default=500, help="rows per INSERT statement")
+    ap.add_argument("--group-size", type=int, default=20, help="average rows per grp value")
+    ap.add_argument("--samples", type=int, default=500, help="statements per lookup/join op")
+    ap.add_argument("--scan-samples", type=int, default=20, help="statements for scan_filter")
+    ap.add_argument("--write-samples", type=int, default=50, help="statements per update/delete op")
+    ap.add_argument("--storage", choices=["jsonl", "segmented"], default="jsonl")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--compare", help="previous --json output to compare p50 latencies with")
+    args = ap.parse_args(argv)
+
+    data = run(args)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    report(data, previous)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare opening a table from its JSON files with opening it from a snapshot.
+
+Builds a table with a unique index and a covering index in a temporary
+directory and times, best of --repeat:
+
+- json:     `Table(...)` with no snapshot (decode data.jsonl and index files)
+- snapshot: `Table(...)` after `Table.checkpoint()`
+- replay:   as snapshot, after --append more rows were inserted since the checkpoint
+
+Usage:
+    python benchmarks/snapshot_bench.py [--rows 100000] [--append 1000] [--repeat 3] [--json out.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from rdbms import storage  # noqa: E402
+from rdbms.catalog import Catalog  # noqa: E402
+from rdbms.storage import Table  # noqa: E402
+
+SCHEMA = {
+    "name": "bench",
+    "columns": [
+        {"name": "id", "type": "INT"},
+        {"name": "email", "type": "TEXT"},
+        {"name": "kind", "type": "TEXT"},
+        {"name": "price", "type": "FLOAT"},
+        {"name": "created", "type": "TIMESTAMP"},
+    ],
+    "constraints": {"primary_key": ["id"], "unique": [["email"]]},
+    "indexes": ["email", {"name": "kind", "columns": ["kind"], "unique": False, "include": ["price"]}],
+}
+
+
+def make_rows(start: int, n: int):
+    return [
+        {
+            "id": i,
+            "email": f"user{i}@example.com",
+            "kind": "abcdefgh"[i % 8],
+            "price": (i * 37 % 1000) / 10,
+            "created": f"2024-01-{1 + i % 28:02d}T12:00:00",
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def best_open(cat: Catalog, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Table("bench", catalog=cat)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--append", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args(argv)
+
+    base = tempfile.mkdtemp(prefix="snapshot_bench_")
+    min_rows = storage.SNAPSHOT_MIN_ROWS
+    try:
+        cat = Catalog(base_dir=base)
+        cat.create_table(SCHEMA)
+        t = Table("bench", catalog=cat)
+        t.insert_many(make_rows(0, args.rows))
+        # keep the JSON-only measurement from writing a snapshot
+        storage.SNAPSHOT_MIN_ROWS = float("inf")
+        results = {"json": best_open(cat, args.repeat)}
+        t.checkpoint()
+        results["snapshot"] = best_open(cat, args.repeat)
+        t.insert_many(make_rows(args.rows, args.append))
+        results["replay"] = best_open(cat, args.repeat)
+        sizes = {"data": os.path.getsize(t.data_file), "snapshot": os.path.getsize(t.snapshot_file)}
+    finally:
+        storage.SNAPSHOT_MIN_ROWS = min_rows
+        shutil.rmtree(base, ignore_errors=True)
+
+    print(f"{args.rows} rows (+{args.append} appended for replay), best of {args.repeat}")
+    for k, v in results.items():
+        print(f"{k:<10}{v * 1000:>10.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "append": args.append, "seconds": results, "bytes": sizes}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
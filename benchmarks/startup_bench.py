@@ -0,0 +1,119 @@
+"""Measure interpreter startup cost of the rdbms package against a budget.
+
+Each case runs in a fresh interpreter (best of --repeat wall time), reported
+as overhead over a bare `python -c pass`:
+
+- import_rdbms:     `import rdbms` (public classes load lazily)
+- import_executor:  `import rdbms.executor` (the whole engine)
+- one_statement:    open an Executor and run one primary-key SELECT
+
+`python -X importtime` is used to list the slowest modules under the engine
+import and to check that none of the budget's `forbidden_modules` (heavy or
+optional dependencies) are imported eagerly.
+
+Exits with status 1 if any overhead exceeds `benchmarks/startup_budget.json`.
+
+Usage:
+    python benchmarks/startup_bench.py [--repeat 15] [--budget FILE] [--json out.json] [--no-check]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+SETUP = """
+from rdbms import Executor
+e = Executor(base_dir={base!r})
+e.execute("CREATE TABLE t (id INT, name TEXT, PRIMARY KEY (id))")
+e.execute("INSERT INTO t (id, name) VALUES (1, 'a'), (2, 'b')")
+"""
+ONE_STATEMENT = """
+from rdbms import Executor
+Executor(base_dir={base!r}).execute("SELECT * FROM t WHERE id = 1")
+"""
+
+
+def _env():
+    return {**os.environ, "PYTHONPATH": os.path.abspath(ROOT)}
+
+
+def run(code: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=_env(), cwd=ROOT)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def import_profile(module: str):
+    """Return [(self_us, cumulative_us, name)] from `python -X importtime`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          check=True, env=_env(), cwd=ROOT, capture_output=True, text=True)
+    out = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        out.append((int(self_us), int(cum_us), name.strip()))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=15)
+    ap.add_argument("--budget", default=DEFAULT_BUDGET)
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--no-check", action="store_true", help="report only, never fail")
+    args = ap.parse_args(argv)
+
+    with open(args.budget, encoding="utf-8") as f:
+        budget = json.load(f)
+    base = tempfile.mkdtemp(prefix="startup_bench_")
+    try:
+        subprocess.run([sys.executable, "-c", SETUP.format(base=base)], check=True, env=_env(), cwd=ROOT)
+        bare = run("pass", args.repeat)
+        overhead = {
+            "import_rdbms": run("import rdbms", args.repeat) - bare,
+            "import_executor": run("import rdbms.executor", args.repeat) - bare,
+            "one_statement": run(ONE_STATEMENT.format(base=base), args.repeat) - bare,
+        }
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+    profile = import_profile("rdbms.executor")
+    loaded = {name for _, _, name in profile}
+
+    print(f"bare interpreter {bare:.1f} ms; overhead, best of {args.repeat}:")
+    failures = []
+    for name, ms in overhead.items():
+        limit = budget["overhead_ms"].get(name)
+        status = "" if limit is None else ("ok" if ms <= limit else "OVER BUDGET")
+        print(f"  {name:<18}{ms:>8.1f} ms   budget {limit} ms  {status}")
+        if limit is not None and ms > limit:
+            failures.append(name)
+    print("slowest modules under `import rdbms.executor` (self time):")
+    for self_us, cum_us, name in sorted(profile, reverse=True)[:10]:
+        print(f"  {self_us / 1000:>7.1f} ms  {name}")
+    eager = sorted(m for m in budget.get("forbidden_modules", []) if m in loaded)
+    if eager:
+        print("imported eagerly:", ", ".join(eager))
+        failures.append("forbidden_modules")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"bare_ms": bare, "overhead_ms": overhead, "eager_forbidden": eager}, f, indent=2)
+    if failures and not args.no_check:
+        print("startup budget exceeded:", ", ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,28 @@
-from .catalog import Catalog
-from .storage import Table
-from .executor import Executor
-from .parser import Parser
+"""mini-rdbms: a small educational relational database.
+
+The public classes are imported on first access (PEP 562), so `import rdbms`
+stays cheap for short-lived scripts that only need part of the package.
+"""
+from importlib import import_module
 
 __all__ = ["Catalog", "Table", "Executor", "Parser"]
+
+_LAZY = {
+    "Catalog": ".catalog",
+    "Table": ".storage",
+    "Executor": ".executor",
+    "Parser": ".parser",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
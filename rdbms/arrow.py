@@ -0,0 +1,137 @@
+"""Apache Arrow and Parquet export/import (requires the optional `pyarrow`).
+
+Tables are converted to Arrow record batches of `BATCH_ROWS` rows, built
+column by column straight from the stored rows, so a table never exists as
+both a full list of row dicts and an Arrow table:
+
+    from rdbms import arrow
+    tbl = arrow.to_table(exe.table("events"))           # pyarrow.Table
+    arrow.write_parquet(exe.table("events"), "events.parquet")
+
+Column types map INT -> int64, FLOAT -> float64, TEXT -> string, BOOL ->
+bool, DATE -> date32 and TIMESTAMP -> timestamp[s]. `COPY t TO 'x.parquet'`
+and `COPY t FROM 'x.parquet'` use this module, so Parquet files load through
+`Table.copy_from` like CSV and JSONL.
+"""
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import metrics
+
+# rows per record batch (and per Parquet row group write)
+BATCH_ROWS = 65536
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Arrow and Parquet support requires pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def available() -> bool:
+    try:
+        _pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def _arrow_type(pa, typ: str):
+    return {
+        "INT": pa.int64(),
+        "FLOAT": pa.float64(),
+        "TEXT": pa.string(),
+        "BOOL": pa.bool_(),
+        "DATE": pa.date32(),
+        "TIMESTAMP": pa.timestamp("s"),
+    }[typ.upper()]
+
+
+def schema(table, columns: Optional[List[str]] = None):
+    """Return the `pyarrow.Schema` for `columns` (default: all) of `table`."""
+    pa = _pyarrow()
+    columns = columns or list(table.columns)
+    return pa.schema([pa.field(c, _arrow_type(pa, table.columns[c]["type"])) for c in columns])
+
+
+def _column(pa, values: List[Any], typ: str):
+    if typ in ("DATE", "TIMESTAMP"):
+        # stored as ISO strings; parse them in one vectorized call, falling
+        # back to Python for values with a UTC offset or fractional seconds
+        fmt = "%Y-%m-%d" if typ == "DATE" else "%Y-%m-%dT%H:%M:%S"
+        try:
+            parsed = pa.compute.strptime(pa.array(values, pa.string()), format=fmt, unit="s")
+        except pa.ArrowInvalid:
+            parse = date.fromisoformat if typ == "DATE" else datetime.fromisoformat
+            return pa.array([None if v is None else parse(v) for v in values], _arrow_type(pa, typ))
+        return parsed.cast(pa.date32()) if typ == "DATE" else parsed
+    return pa.array(values, _arrow_type(pa, typ))
+
+
+def record_batches(table, columns: Optional[List[str]] = None,
+                   batch_rows: int = BATCH_ROWS) -> Iterator[Any]:
+    """Yield `pyarrow.RecordBatch`es of `table`'s rows in storage order."""
+    pa = _pyarrow()
+    columns = columns or list(table.columns)
+    sch = schema(table, columns)
+    types = [table.columns[c]["type"].upper() for c in columns]
+    rows = [r for _, r in table.scan_items()]
+    metrics.current().rows_scanned += len(rows)
+    for i in range(0, len(rows), batch_rows):
+        chunk = rows[i:i + batch_rows]
+        arrays = [_column(pa, [r.get(c) for r in chunk], typ) for c, typ in zip(columns, types)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=sch)
+
+
+def to_table(table, columns: Optional[List[str]] = None):
+    """Return `table` (or some of its columns) as a `pyarrow.Table`."""
+    pa = _pyarrow()
+    return pa.Table.from_batches(list(record_batches(table, columns)), schema=schema(table, columns))
+
+
+def write_parquet(table, path: str, columns: Optional[List[str]] = None,
+                  compression: str = "zstd") -> int:
+    """Write `table` to a Parquet file one record batch at a time; returns
+    the number of rows written."""
+    pa = _pyarrow()
+    tmp = path + ".tmp"
+    n = 0
+    try:
+        with pa.parquet.ParquetWriter(tmp, schema(table, columns), compression=compression) as writer:
+            for batch in record_batches(table, columns):
+                writer.write_batch(batch)
+                n += batch.num_rows
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    metrics.record_write(os.path.getsize(path))
+    return n
+
+
+def read_parquet(path: str, columns: Optional[List[str]] = None, known: Optional[List[str]] = None,
+                 batch_rows: int = BATCH_ROWS) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of a Parquet file as dicts, one record batch at a time.
+
+    `columns` selects the columns to read; otherwise every file column is
+    read and must appear in `known` (when given).
+    """
+    pa = _pyarrow()
+    f = pa.parquet.ParquetFile(path)
+    names = f.schema_arrow.names
+    if columns is None and known is not None:
+        unknown = [c for c in names if c not in known]
+        if unknown:
+            raise ValueError(f"{path}: unknown column(s) {', '.join(unknown)}")
+    missing = [c for c in columns or () if c not in names]
+    if missing:
+        raise ValueError(f"{path}: no column(s) {', '.join(missing)}")
+    for batch in f.iter_batches(batch_size=batch_rows, columns=columns):
+        yield from batch.to_pylist()
+    metrics.record_read(os.path.getsize(path))
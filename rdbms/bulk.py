@@ -0,0 +1,155 @@
+"""Streaming CSV and JSONL readers and writers for COPY (Parquet goes
+through `rdbms.arrow`).
+
+`read_rows` yields one dict per record without loading the file, so
+`Table.copy_from` can coerce and check it chunk by chunk; `write_rows`
+writes rows out in chunks. Values are coerced by the table, not here: CSV
+fields arrive as strings, with an empty field meaning NULL.
+
+    COPY users FROM 'users.csv'                       -- header row names the columns
+    COPY users (id, name) FROM 'users.csv' WITH (header = false)
+    COPY users TO 'users.jsonl'
+"""
+import csv
+import os
+from typing import Any, Dict, Iterable, Iterator, List
+
+from . import codec, metrics
+
+FORMATS = ("csv", "jsonl", "parquet")
+# rows serialized per write when exporting
+WRITE_CHUNK_ROWS = 10000
+
+
+def check_options(path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate COPY ... WITH (...) options, inferring the format from the
+    file extension (.csv, .jsonl, .ndjson or .parquet) when it is not given."""
+    for key in options:
+        if key not in ("format", "header", "delimiter"):
+            raise ValueError(f"Unknown COPY option '{key}'")
+    opts = dict(options)
+    if "format" not in opts:
+        ext = os.path.splitext(path)[1].lower()
+        opts["format"] = ("jsonl" if ext in (".jsonl", ".ndjson", ".json")
+                          else "parquet" if ext in (".parquet", ".pq") else "csv")
+    if opts["format"] not in FORMATS:
+        raise ValueError(f"Unknown COPY format '{opts['format']}' (expected csv, jsonl or parquet)")
+    header = opts.get("header", True)
+    if isinstance(header, str):
+        if header not in ("true", "false"):
+            raise ValueError("COPY option header must be true or false")
+        header = header == "true"
+    opts["header"] = bool(header)
+    delimiter = opts.get("delimiter", ",")
+    if not isinstance(delimiter, str) or len(delimiter) != 1:
+        raise ValueError("COPY option delimiter must be a single character")
+    opts["delimiter"] = delimiter
+    return opts
+
+
+def read_rows(path: str, columns: List[str], known: Iterable[str], options: Dict[str, Any],
+              explicit: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield the records of `path` as dicts keyed by column name.
+
+    `columns` is the column order for CSV files without a header; with
+    `explicit`, it also restricts which columns may appear. Unknown columns
+    are rejected.
+    """
+    known = set(known)
+    if options["format"] == "parquet":
+        from . import arrow
+
+        yield from arrow.read_parquet(path, columns if explicit else None, list(known))
+        return
+    if options["format"] == "jsonl":
+        yield from _read_jsonl(path, set(columns) if explicit else known)
+    else:
+        yield from _read_csv(path, columns, known, options, explicit)
+    metrics.record_read(os.path.getsize(path))
+
+
+def _read_jsonl(path: str, allowed: set) -> Iterator[Dict[str, Any]]:
+    loads = codec.loads
+    with open(path, "rb") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path} line {lineno}: invalid JSON ({e})") from e
+            if not isinstance(row, dict):
+                raise ValueError(f"{path} line {lineno}: expected a JSON object")
+            if not row.keys() <= allowed:
+                unknown = sorted(set(row) - allowed)
+                raise ValueError(f"{path} line {lineno}: unknown column(s) {', '.join(unknown)}")
+            yield row
+
+
+def _read_csv(path: str, columns: List[str], known: set, options: Dict[str, Any],
+              explicit: bool) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=options["delimiter"])
+        names = columns
+        if options["header"]:
+            first = next(reader, None)
+            if first is None:
+                return
+            if not explicit:
+                names = [c.strip() for c in first]
+        unknown = [c for c in names if c not in known]
+        if unknown:
+            raise ValueError(f"{path}: unknown column(s) {', '.join(unknown)}")
+        width = len(names)
+        for fields in reader:
+            if not fields:
+                continue
+            if len(fields) != width:
+                raise ValueError(f"{path} line {reader.line_num}: expected {width} fields, got {len(fields)}")
+            yield {c: (v if v != "" else None) for c, v in zip(names, fields)}
+
+
+def _csv_value(v: Any) -> Any:
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return v
+
+
+def write_rows(path: str, columns: List[str], rows: Iterable[Dict[str, Any]],
+               options: Dict[str, Any]) -> int:
+    """Write `rows` (their `columns`, in order) to `path`; returns the row count.
+
+    The file is written to a temporary name and moved into place when done.
+    """
+    tmp = path + ".tmp"
+    n = 0
+    chunk: List[Dict[str, Any]] = []
+    try:
+        if options["format"] == "jsonl":
+            dumpb = codec.dumpb
+            with open(tmp, "wb") as f:
+                for row in rows:
+                    chunk.append({c: row.get(c) for c in columns})
+                    if len(chunk) >= WRITE_CHUNK_ROWS:
+                        f.write(b"".join(dumpb(r) + b"\n" for r in chunk))
+                        n += len(chunk)
+                        chunk = []
+                f.write(b"".join(dumpb(r) + b"\n" for r in chunk))
+                n += len(chunk)
+        else:
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, delimiter=options["delimiter"])
+                if options["header"]:
+                    writer.writerow(columns)
+                for row in rows:
+                    writer.writerow([_csv_value(row.get(c)) for c in columns])
+                    n += 1
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    metrics.record_write(os.path.getsize(path))
+    return n
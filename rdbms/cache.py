@@ -0,0 +1,87 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def estimate_size(obj: Any) -> int:
+    """Rough in-memory size of a query result (lists/dicts of scalars), in bytes."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            size += estimate_size(v)
+    return size
+
+
+class ResultCache:
+    """LRU cache of SELECT results bounded by an estimated memory budget.
+
+    Each entry remembers the version of every table it read. `get` asks for
+    the current versions of those tables and treats any difference as a miss,
+    so results are invalidated exactly when a referenced table changes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[str, ...], Tuple[int, ...], Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, versions_of: Callable[[Tuple[str, ...]], Optional[Tuple[int, ...]]]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        versions = versions_of(entry[0]) if entry is not None else None
+        with self._lock:
+            if entry is None or self._entries.get(key) is not entry:
+                self.misses += 1
+                return None
+            if entry[1] != versions:
+                self._drop(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, tables: Tuple[str, ...], versions: Tuple[int, ...], result: Any):
+        size = estimate_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (tables, versions, result, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self.bytes -= entry[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -1,24 +1,63 @@
-import json
 import os
-from typing import Dict, Any
-import shutil
+from typing import Dict, Any, List, Optional, Tuple
 
+from . import codec
 from .exceptions import SchemaError, TableNotFound
 
 
+def _file_sig(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
 class Catalog:
     """Manage table schemas and table directories on disk.
 
     Each table lives in a folder under `base_dir` with `schema.json` and data/index files.
+
+    Parsed schemas and the table list are cached in memory. A cached schema
+    is revalidated with one stat of its schema.json and the table list with
+    one stat of `base_dir`, so changes made by another process are still
+    seen. `version` increases with every create, drop, rename or schema
+    change made through this catalog. Cached schemas are shared: callers
+    must not modify them in place, only pass a new dict to `save_schema`.
     """
 
     def __init__(self, base_dir: str = "data"):
         self.base_dir = base_dir
         os.makedirs(self.base_dir, exist_ok=True)
+        self.version = 0
+        # table name -> (schema.json signature, parsed schema)
+        self._schemas: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        # (base_dir signature, sorted table names)
+        self._names: Optional[Tuple[Any, List[str]]] = None
 
     def table_path(self, table_name: str) -> str:
         return os.path.join(self.base_dir, table_name)
 
+    def _changed(self, *names: str):
+        self.version += 1
+        self._names = None
+        for name in names:
+            self._schemas.pop(name, None)
+
+    def list_tables(self) -> List[str]:
+        """Return the names of all tables (directories with a schema.json), sorted."""
+        sig = _file_sig(self.base_dir)
+        cached = self._names
+        if cached is not None and cached[0] == sig:
+            return list(cached[1])
+        base = self.base_dir
+        names = [d for d in sorted(os.listdir(base)) if os.path.exists(os.path.join(base, d, "schema.json"))]
+        self._names = (sig, names)
+        return list(names)
+
+    def exists(self, table_name: str) -> bool:
+        return os.path.exists(os.path.join(self.table_path(table_name), "schema.json"))
+
     def create_table(self, schema: Dict[str, Any]):
         name = schema.get("name")
         if not name:
@@ -26,22 +65,41 @@ class Catalog:
         path = self.table_path(name)
         os.makedirs(path, exist_ok=True)
         schema_file = os.path.join(path, "schema.json")
-        with open(schema_file, "w", encoding="utf-8") as f:
-            json.dump(schema, f, indent=2)
+        with open(schema_file, "wb") as f:
+            f.write(codec.dump_pretty(schema))
+        self._changed(name)
 
     def load_schema(self, table_name: str) -> Dict[str, Any]:
+        schema_file = os.path.join(self.table_path(table_name), "schema.json")
+        sig = _file_sig(schema_file)
+        if sig is None:
+            raise TableNotFound(f"Table '{table_name}' not found")
+        cached = self._schemas.get(table_name)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+        with open(schema_file, "rb") as f:
+            schema = codec.loads(f.read())
+        self._schemas[table_name] = (sig, schema)
+        return schema
+
+    def save_schema(self, table_name: str, schema: Dict[str, Any]):
         path = self.table_path(table_name)
-        schema_file = os.path.join(path, "schema.json")
-        if not os.path.exists(schema_file):
+        if not os.path.exists(path):
             raise TableNotFound(f"Table '{table_name}' not found")
-        with open(schema_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        schema_file = os.path.join(path, "schema.json")
+        with open(schema_file + ".tmp", "wb") as f:
+            f.write(codec.dump_pretty(schema))
+        os.replace(schema_file + ".tmp", schema_file)
+        self._changed(table_name)
 
     def drop_table(self, table_name: str):
         path = self.table_path(table_name)
         if not os.path.exists(path):
             raise TableNotFound(f"Table '{table_name}' not found")
+        import shutil
+
         shutil.rmtree(path)
+        self._changed(table_name)
 
     def rename_table(self, old_name: str, new_name: str):
         old_path = self.table_path(old_name)
@@ -54,8 +112,11 @@ class Catalog:
         # update schema.json name field if present
         schema_file = os.path.join(new_path, "schema.json")
         if os.path.exists(schema_file):
-            with open(schema_file, "r", encoding="utf-8") as f:
-                schema = json.load(f)
+            with open(schema_file, "rb") as f:
+                schema = codec.loads(f.read())
             schema["name"] = new_name
-            with open(schema_file, "w", encoding="utf-8") as f:
-                json.dump(schema, f, indent=2)
+            # write a new file rather than rewriting in place: backups hard-link it
+            with open(schema_file + ".tmp", "wb") as f:
+                f.write(codec.dump_pretty(schema))
+            os.replace(schema_file + ".tmp", schema_file)
+        self._changed(old_name, new_name)
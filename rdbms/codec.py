@@ -0,0 +1,106 @@
+"""JSON codec used by the storage layer (rows, indexes and schemas).
+
+The fastest installed backend is picked at import time: orjson, then
+msgspec, falling back to the stdlib `json` module. Set the environment
+variable MINI_RDBMS_CODEC to `json`, `orjson` or `msgspec` to force one, or
+call `use()` at runtime. Every backend emits UTF-8 JSON that the others can
+read, so files written with one backend load with any other.
+
+Call the functions through the module (`codec.dumpb(...)`) so `use()` takes
+effect everywhere.
+"""
+import gc
+import json
+import os
+from typing import Any, Callable, Dict, List, Union
+
+BACKEND = "json"
+
+
+def _stdlib():
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(", ", ": "))
+    return (lambda obj: enc.encode(obj).encode("utf-8")), json.loads
+
+
+# encode an object to UTF-8 bytes / decode bytes or str; replaced by use()
+dumpb: Callable[[Any], bytes]
+loads: Callable[[Union[bytes, str]], Any]
+dumpb, loads = _stdlib()
+
+
+def _orjson():
+    import orjson
+
+    return orjson.dumps, orjson.loads
+
+
+def _msgspec():
+    import msgspec
+
+    enc = msgspec.json.Encoder()
+    return enc.encode, msgspec.json.Decoder().decode
+
+
+_BACKENDS: Dict[str, Callable[[], Any]] = {"orjson": _orjson, "msgspec": _msgspec, "json": _stdlib}
+
+
+def available() -> List[str]:
+    """Names of the backends importable in this environment, fastest first."""
+    out = []
+    for name, factory in _BACKENDS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        out.append(name)
+    return out
+
+
+def use(name: str):
+    """Switch the active backend. Raises ImportError if it is not installed."""
+    global BACKEND, dumpb, loads
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown codec backend: {name}")
+    dumpb, loads = _BACKENDS[name]()
+    BACKEND = name
+
+
+def dumps(obj: Any) -> str:
+    return dumpb(obj).decode("utf-8")
+
+
+def dump_pretty(obj: Any) -> bytes:
+    """Encode with 2-space indentation, for human-edited files like schema.json."""
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def load_lines(data: bytes) -> List[Any]:
+    """Decode a JSONL buffer in one call by framing its lines as a JSON array."""
+    lines = [line for line in data.split(b"\n") if line.strip()]
+    if not lines:
+        return []
+    # pause the cyclic GC: building many row dicts otherwise triggers repeated
+    # collections that cost more than the decoding itself
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return loads(b"[" + b",".join(lines) + b"]")
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _select():
+    forced = os.environ.get("MINI_RDBMS_CODEC")
+    if forced:
+        use(forced)
+        return
+    for name in _BACKENDS:
+        try:
+            use(name)
+            return
+        except ImportError:
+            continue
+
+
+_select()
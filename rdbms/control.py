@@ -0,0 +1,145 @@
+"""Statement timeouts, cancellation and admission control.
+
+Every statement run by `Executor.execute` gets a `Statement` handle that
+is current on the executing thread. Long loops (scans, join probes, hash
+builds, aggregation, projection) call `check()` every CHECK_EVERY rows,
+which raises `QueryTimeout` once the statement's deadline has passed or
+`QueryCancelled` after `Executor.cancel(id)` from another thread. Checks
+happen only while rows are read, never once UPDATE or DELETE has started
+writing, so a stopped statement changes nothing.
+
+`AdmissionController` caps how many heavy statements (estimated cost at or
+above `heavy_cost` rows) run at once. Further heavy statements wait in
+arrival order until a slot frees up or their own deadline passes; cheap
+statements such as point lookups are never queued.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .exceptions import QueryCancelled, QueryTimeout
+
+# executor loops call check() when `i & CHECK_MASK == 0`, i.e. every CHECK_EVERY rows
+CHECK_EVERY = 1024
+CHECK_MASK = CHECK_EVERY - 1
+
+_ids = itertools.count(1)
+
+
+class Statement:
+    """A running (or queued) statement: its deadline and cancel flag."""
+
+    def __init__(self, sql: str, timeout: Optional[float] = None):
+        self.id = next(_ids)
+        self.sql = sql
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout if timeout is not None else None
+        self.cancelled = False
+        # "queued" while waiting for admission, then "running"
+        self.state = "running"
+        self.cost = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        """Raise if the statement was cancelled or ran past its deadline."""
+        if self.cancelled:
+            raise QueryCancelled(f"Statement {self.id} was cancelled")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise QueryTimeout(f"Statement {self.id} exceeded its {self.timeout:g} s timeout")
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "sql": self.sql, "state": self.state, "cost": self.cost,
+                "seconds": time.monotonic() - self.started, "timeout": self.timeout,
+                "cancelled": self.cancelled}
+
+
+class _Local(threading.local):
+    statement: Optional[Statement] = None
+
+
+_local = _Local()
+# checks outside a statement never fire
+_IDLE = Statement("")
+
+
+def activate(statement: Statement) -> Optional[Statement]:
+    """Make `statement` current on this thread; returns the one it replaces."""
+    prev = _local.statement
+    _local.statement = statement
+    return prev
+
+
+def deactivate(prev: Optional[Statement]):
+    _local.statement = prev
+
+
+def current() -> Statement:
+    s = _local.statement
+    return s if s is not None else _IDLE
+
+
+class AdmissionController:
+    """Runs at most `max_heavy` heavy statements at once, queueing the rest FIFO."""
+
+    def __init__(self, max_heavy: int, heavy_cost: int = 10000):
+        self.max_heavy = max_heavy
+        self.heavy_cost = heavy_cost
+        self._cond = threading.Condition()
+        self._queue: Deque[Statement] = deque()
+        self.running = 0
+        self.admitted = 0
+        self.queued = 0
+        self.timed_out = 0
+
+    def is_heavy(self, cost: int) -> bool:
+        return cost >= self.heavy_cost
+
+    def acquire(self, statement: Statement):
+        """Wait for a heavy-statement slot; raises QueryTimeout/QueryCancelled
+        (leaving the queue) if the statement's deadline passes or it is cancelled."""
+        with self._cond:
+            if not self._queue and self.running < self.max_heavy:
+                self.running += 1
+                self.admitted += 1
+                return
+            self._queue.append(statement)
+            self.queued += 1
+            statement.state = "queued"
+            try:
+                while self._queue[0] is not statement or self.running >= self.max_heavy:
+                    try:
+                        statement.check()
+                    except QueryTimeout:
+                        self.timed_out += 1
+                        raise
+                    remaining = statement.remaining()
+                    # wake up now and then to notice a cancel() from another thread
+                    self._cond.wait(0.1 if remaining is None else max(0.0, min(remaining, 0.1)))
+            except BaseException:
+                self._queue.remove(statement)
+                self._cond.notify_all()
+                raise
+            self._queue.popleft()
+            self.running += 1
+            self.admitted += 1
+            statement.state = "running"
+            # the next in line may also fit
+            self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self.running -= 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"max_heavy": self.max_heavy, "heavy_cost": self.heavy_cost, "running": self.running,
+                "waiting": len(self._queue), "admitted": self.admitted, "queued": self.queued,
+                "timed_out": self.timed_out}
@@ -16,3 +16,15 @@ class ConstraintViolation(RDBMSException):
 
 class IndexErrorRDB(RDBMSException):
     pass
+
+
+class ReadOnlyError(RDBMSException):
+    pass
+
+
+class QueryCancelled(RDBMSException):
+    pass
+
+
+class QueryTimeout(QueryCancelled):
+    pass
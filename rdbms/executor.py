@@ -1,9 +1,106 @@
-from typing import Any, List, Dict
+import dataclasses
+import operator
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from .parser import Parser, CreateTable, Insert, Select, Update, Delete, DropTable, RenameTable
+from . import bulk, control, memory, metrics, segments, system, views
+from .plan import PlanNode, describe_terms, literal
+from .cache import ResultCache, estimate_size
+from .parser import (Parser, CreateTable, Insert, Select, Update, Delete, DropTable, RenameTable,
+                     CreateIndex, DropIndex, Reindex, Checkpoint, Copy, Backup, Explain, And, Where, ColumnRef,
+                     Exists, bind_params, conjuncts, normalize_sql, CreateMaterializedView, RefreshMaterializedView)
 from .catalog import Catalog
-from .storage import Table
-from .exceptions import TableNotFound
+from .storage import IndexBuild, Table
+from .exceptions import ReadOnlyError, SchemaError, TableNotFound
+from .types import PRIMITIVE_TYPES, column_converter
+
+
+_OPS = {"=": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+        ">": operator.gt, ">=": operator.ge}
+
+
+def _satisfies(row: Dict[str, Any], terms: List[Where]) -> bool:
+    """True if `row` satisfies every predicate; ordering comparisons with NULL are false."""
+    for w in terms:
+        v = row.get(w.column)
+        if w.op == "=":
+            if v != w.value:
+                return False
+        elif w.op == "!=":
+            if v == w.value:
+                return False
+        elif w.op == "IN":
+            try:
+                if v is None or v not in w.value:
+                    return False
+            except TypeError:
+                return False
+        elif v is None or w.value is None:
+            return False
+        else:
+            try:
+                if not _OPS[w.op](v, w.value):
+                    return False
+            except TypeError:
+                return False
+    return True
+
+
+# statements copied to the change log as-is (REINDEX and CHECKPOINT only
+# rewrite local files)
+_REPLICATED_DDL = (CreateTable, DropTable, RenameTable, CreateIndex, DropIndex)
+
+# partitions of a spilling aggregate or hash join, and how often a spilled
+# aggregate partition may itself be partitioned again
+_SPILL_PARTITIONS = 16
+_MAX_PARTITIONS = 256
+_MAX_SPILL_DEPTH = 3
+
+# most keys an IN list (or several, on a composite key) expands into for
+# one multi-get; longer lists fall back to a shorter key prefix or a scan
+_MAX_MULTI_GET = 4096
+
+
+def _has_subqueries(where) -> bool:
+    return any(isinstance(w, Exists) or isinstance(w.value, Select) for w in conjuncts(where))
+
+
+def _key_values(terms: List[Where]) -> Dict[str, List[Any]]:
+    """The values each column is fixed to by an = or IN predicate."""
+    keyed: Dict[str, List[Any]] = {}
+    for w in terms:
+        if w.op == "=":
+            keyed[w.column] = [w.value]
+        elif w.op == "IN" and w.column not in keyed:
+            keyed[w.column] = list(w.value)
+    return keyed
+
+
+def _key_prefixes(cols: List[str], keyed: Dict[str, List[Any]]) -> List[List[Any]]:
+    """The key prefixes of `cols` to look up: every combination of the values
+    fixed for its leading columns, or [] when the first column is not fixed."""
+    prefixes: List[List[Any]] = [[]]
+    for c in cols:
+        vals = keyed.get(c)
+        if vals is None or len(prefixes) * len(vals) > _MAX_MULTI_GET:
+            break
+        prefixes = [p + [v] for p in prefixes for v in vals]
+    return prefixes if prefixes[0] else []
+
+
+_KINDS: Dict[type, str] = {}
+
+
+def _kind(stmt) -> str:
+    """Metric label for a statement: its class name in snake case (create_table)."""
+    cls = type(stmt)
+    kind = _KINDS.get(cls)
+    if kind is None:
+        kind = _KINDS[cls] = "".join("_" + c.lower() if c.isupper() and i else c.lower()
+                                     for i, c in enumerate(cls.__name__))
+    return kind
 
 
 class Executor:
@@ -13,14 +110,301 @@ class Executor:
     performance or full SQL compatibility.
     """
 
-    def __init__(self, base_dir: str = "data"):
+    def __init__(self, base_dir: str = "data", result_cache_bytes: int = 0,
+                 slow_query_ms: Optional[float] = None, slow_query_log: Optional[str] = None,
+                 changelog: Optional[str] = None, read_only: bool = False,
+                 memory_budget: int = 0, spill_dir: Optional[str] = None,
+                 statement_timeout: Optional[float] = None, max_heavy_queries: int = 0,
+                 heavy_cost: int = 10000):
         self.catalog = Catalog(base_dir=base_dir)
         self.parser = Parser()
+        # open tables, reused across statements while their files are unchanged
+        self._tables: Dict[str, Table] = {}
+        # background index builds started by CREATE INDEX CONCURRENTLY, keyed "table.index"
+        self.index_builds: Dict[str, IndexBuild] = {}
+        # per-table version counters, bumped on every change; used to invalidate cached results
+        self._versions: Dict[str, int] = {}
+        # optional SELECT result cache (disabled when result_cache_bytes is 0)
+        self.cache: Optional[ResultCache] = ResultCache(result_cache_bytes) if result_cache_bytes > 0 else None
+        # counters/histograms over every statement; `metrics.render()` is Prometheus text
+        self.metrics = metrics.StatementMetrics()
+        # working memory of hash joins, aggregates and result buffers; operators
+        # spill to temp files in spill_dir beyond it (unbounded when memory_budget is 0)
+        self.memory: Optional[memory.MemoryBudget] = (
+            memory.MemoryBudget(memory_budget, spill_dir) if memory_budget > 0 else None)
+        # default per-statement timeout in seconds (None: no limit); see `rdbms.control`
+        self.statement_timeout = statement_timeout
+        # at most max_heavy_queries statements estimated to touch heavy_cost rows or
+        # more run at once; the rest queue (no limit when max_heavy_queries is 0)
+        self.admission: Optional[control.AdmissionController] = (
+            control.AdmissionController(max_heavy_queries, heavy_cost) if max_heavy_queries > 0 else None)
+        # statements currently queued or running, by id, for `running` and `cancel`
+        self._statements: Dict[int, control.Statement] = {}
+        self._statements_lock = threading.Lock()
+        # statements slower than slow_query_ms, with their plans (optionally appended to slow_query_log)
+        self.slow_queries: Optional[metrics.SlowQueryLog] = (
+            metrics.SlowQueryLog(slow_query_ms, slow_query_log) if slow_query_ms is not None else None)
+        # profile of the most recent statement
+        self.last_profile: Optional[metrics.Profile] = None
+        # logical log of applied changes, for followers (see `rdbms.replication`)
+        self.changelog = None
+        if changelog is not None:
+            from .replication import ChangeLog
+
+            self.changelog = ChangeLog(changelog)
+        # followers reject statements that would change data
+        self.read_only = read_only
+        # materialized views by name and by source table, loaded on first use
+        self._views: Optional[Dict[str, views.View]] = None
+        self._view_deps: Dict[str, List[views.View]] = {}
+        # source-table row changes not yet applied to their views, as (+1/-1, row)
+        self._view_changes: Dict[str, List[views.Delta]] = {}
+        self._view_changes_lock = threading.Lock()
+        self._maintain_lock = threading.RLock()
+
+    def _open(self, name: str) -> Table:
+        """Return the open Table for `name`, reloading it if its files changed on disk."""
+        t = self._tables.get(name)
+        if t is None or t.is_stale():
+            if t is not None:
+                self._bump(name)
+            with metrics.current().phase("load"):
+                t = Table(name, catalog=self.catalog)
+            t.add_listener(lambda op, pk, old, new, name=name: self._bump(name))
+            if self.changelog is not None:
+                t.add_listener(lambda op, pk, old, new, name=name: self.changelog.row_change(name, op, pk, old, new))
+            if not self.read_only:
+                # followers receive view rows from the primary instead
+                t.add_listener(lambda op, pk, old, new, name=name: self._view_change(name, old, new))
+            self._tables[name] = t
+        return t
+
+    def table(self, name: str) -> Table:
+        """Return the open Table for `name`, for callers that page or inspect
+        rows directly (e.g. the webapp's table view)."""
+        return self._open(name)
+
+    def _grant(self, name: str) -> memory.Grant:
+        """Take a memory grant for operator `name`, released by the end of the statement."""
+        grant = memory.Grant(self.memory, name)
+        metrics.current().grants.append(grant)
+        return grant
+
+    def _bump(self, name: str):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _table_versions(self, tables: Sequence[str]) -> Tuple[int, ...]:
+        # opening revalidates each table against its files, bumping on outside changes
+        for name in tables:
+            self._open(name)
+        return tuple(self._versions.get(name, 0) for name in tables)
+
+    def _cached_versions(self, tables: Sequence[str]) -> Optional[Tuple[int, ...]]:
+        try:
+            return self._table_versions(tables)
+        except TableNotFound:
+            return None
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None, timeout: Optional[float] = None):
+        """Parse and run one statement; `params` fill its `?` placeholders in order.
+
+        Every statement is profiled (see `rdbms.metrics`): the profile is kept
+        as `last_profile`, folded into `metrics` and logged to `slow_queries`
+        when it ran longer than the slow-query threshold.
+
+        `timeout` (seconds, default `statement_timeout`) bounds the time spent
+        queueing and reading rows; past it the statement raises QueryTimeout.
+        """
+        return self._profiled(sql, params, lambda prof: self._execute(sql, params, prof), timeout)
+
+    def running(self) -> List[Dict[str, Any]]:
+        """Statements currently queued or running, oldest first."""
+        with self._statements_lock:
+            return [s.as_dict() for s in self._statements.values()]
+
+    def cancel(self, statement_id: int) -> bool:
+        """Ask statement `statement_id` to stop; it raises QueryCancelled at its
+        next check. Returns False if no such statement is running."""
+        with self._statements_lock:
+            st = self._statements.get(statement_id)
+        if st is None:
+            return False
+        st.cancel()
+        return True
+
+    def execute_many(self, sql: str, seq_of_params: Iterable[Sequence[Any]]):
+        """Run one INSERT, UPDATE or DELETE once per parameter list.
+
+        INSERTs are combined into a single batch (one append to the data file
+        and one write per index), and like any INSERT the batch is
+        all-or-nothing. Other statements run once per parameter list, in
+        order, stopping at the first error. Returns one status dict with the
+        inserted/updated/deleted counts summed.
+        """
+        seq = [list(p) for p in seq_of_params]
+        return self._profiled(sql, seq, lambda prof: self._execute_many(sql, seq, prof))
+
+    def _profiled(self, sql: str, params, run: Callable[[metrics.Profile], Any], timeout: Optional[float] = None):
+        prof = metrics.Profile(sql, params)
+        prev = metrics.activate(prof)
+        st = control.Statement(sql, timeout if timeout is not None else self.statement_timeout)
+        prev_st = control.activate(st)
+        with self._statements_lock:
+            self._statements[st.id] = st
+        result = None
+        try:
+            result = run(prof)
+            return result
+        except Exception as e:
+            prof.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # view maintenance must finish once the source rows are written
+            control.deactivate(prev_st)
+            with self._statements_lock:
+                self._statements.pop(st.id, None)
+            if self._view_changes:
+                self._maintain_views()
+            for grant in prof.grants:
+                grant.close()
+            metrics.deactivate(prev)
+            if self.changelog is not None:
+                self.changelog.flush()
+            prof.finish(result)
+            self.last_profile = prof
+            slow = self.slow_queries is not None and self.slow_queries.record(prof)
+            self.metrics.observe(prof, slow=slow)
+
+    def _execute(self, sql: str, params: Optional[Sequence[Any]], prof: metrics.Profile):
+        key = None
+        if self.cache is not None and sql.lstrip()[:6].upper() == "SELECT":
+            key = (normalize_sql(sql), tuple(params or ()))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+        if key is not None:
+            hit = self.cache.get(key, self._cached_versions)
+            if hit is not None:
+                prof.kind = "select"
+                prof.plan.append("result cache hit")
+                return [dict(r) for r in hit]
+        with prof.phase("parse"):
+            stmt = self.parser.parse(sql)
+            if stmt is not None and params is not None:
+                stmt = bind_params(stmt, list(params))
+        if stmt is None:
+            prof.kind = "empty"
+            return None
+        prof.kind = _kind(stmt)
+        if self.read_only:
+            self._check_read_only(stmt)
+        self._check_not_view(stmt)
+        tables = self._tables_of(stmt) if key is not None and isinstance(stmt, Select) else ()
+        if tables and not any(system.is_system(n) for n in tables):
+            versions = self._table_versions(tables)
+            res = self._admitted(stmt, lambda: self._exec_select(stmt))
+            if isinstance(res, list):
+                # a spilled result is larger than the memory budget; never cache it
+                self.cache.put(key, tables, versions, [dict(r) for r in res])
+            return res
+        return self._admitted(stmt, lambda: self._run(stmt))
+
+    def _admitted(self, stmt, run: Callable[[], Any]):
+        """Run `run()`, first waiting for a slot if admission control is on
+        and `stmt` is estimated to be heavy."""
+        if self.admission is None:
+            return run()
+        st = control.current()
+        with metrics.current().phase("admission"):
+            st.cost = self._estimate_cost(stmt)
+            heavy = self.admission.is_heavy(st.cost)
+            if heavy:
+                self.admission.acquire(st)
+        if not heavy:
+            return run()
+        try:
+            return run()
+        finally:
+            self.admission.release()
+
+    def _estimate_cost(self, stmt) -> int:
+        """Rough number of rows a SELECT, UPDATE or DELETE (or EXPLAIN ANALYZE
+        of one) reads: the sum of its plan's row estimates. Other statements cost 0."""
+        if isinstance(stmt, Explain):
+            if not stmt.analyze:
+                return 0
+            stmt = stmt.statement
+        if not isinstance(stmt, (Select, Update, Delete)):
+            return 0
+        total = 0
+        nodes = [self._plan(stmt)]
+        while nodes:
+            node = nodes.pop()
+            total += node.est_rows or 0
+            nodes.extend(node.children)
+        return total
 
-    def execute(self, sql: str):
-        stmt = self.parser.parse(sql)
+    def _execute_many(self, sql: str, seq: List[List[Any]], prof: metrics.Profile):
+        with prof.phase("parse"):
+            stmt = self.parser.parse(sql)
         if stmt is None:
+            prof.kind = "empty"
             return None
+        prof.kind = _kind(stmt)
+        if isinstance(stmt, (Select, Explain)):
+            raise ValueError("execute_many does not support SELECT or EXPLAIN")
+        if self.read_only:
+            self._check_read_only(stmt)
+        self._check_not_view(stmt)
+        if isinstance(stmt, Insert):
+            rows: List[Dict[str, Any]] = []
+            with prof.phase("parse"):
+                for params in seq:
+                    values = bind_params(stmt.values, params)
+                    rows.extend(values if isinstance(values, list) else [values])
+            return self._exec_insert(Insert(table=stmt.table, values=rows))
+        totals: Dict[str, Any] = {"status": "OK"}
+        for params in seq:
+            res = self._run(bind_params(stmt, params))
+            for k in ("inserted", "updated", "deleted"):
+                if isinstance(res, dict) and k in res:
+                    totals[k] = totals.get(k, 0) + res[k]
+        return totals
+
+    @staticmethod
+    def _check_read_only(stmt):
+        # SELECT, BACKUP, and EXPLAIN unless it would run an UPDATE or DELETE
+        if isinstance(stmt, Explain):
+            allowed = isinstance(stmt.statement, Select) or not stmt.analyze
+        else:
+            allowed = isinstance(stmt, (Select, Backup))
+        if not allowed:
+            raise ReadOnlyError(f"Read-only database: {_kind(stmt)} is not allowed")
+
+    def _check_not_view(self, stmt):
+        # materialized views only change through maintenance and REFRESH
+        if isinstance(stmt, (Insert, Update, Delete)) or (isinstance(stmt, Copy) and stmt.direction == "from"):
+            if stmt.table in self._view_registry():
+                raise SchemaError(f"'{stmt.table}' is a materialized view; use REFRESH MATERIALIZED VIEW")
+
+    def run_statement(self, stmt):
+        """Run an already-parsed statement without the read-only check; used
+        by `rdbms.replication.Follower` to apply DDL from the primary."""
+        def run(prof: metrics.Profile):
+            prof.kind = _kind(stmt)
+            return self._run(stmt)
+
+        return self._profiled(type(stmt).__name__, None, run)
+
+    def _run(self, stmt):
+        result = self._dispatch(stmt)
+        if self.changelog is not None and isinstance(stmt, _REPLICATED_DDL):
+            # row changes reach the log through table listeners; DDL is logged as the statement
+            self.changelog.statement(stmt)
+        return result
+
+    def _dispatch(self, stmt):
         if isinstance(stmt, CreateTable):
             return self._exec_create(stmt)
         if isinstance(stmt, Insert):
@@ -35,130 +419,1104 @@ class Executor:
             return self._exec_drop(stmt)
         if isinstance(stmt, RenameTable):
             return self._exec_rename(stmt)
+        if isinstance(stmt, CreateIndex):
+            return self._exec_create_index(stmt)
+        if isinstance(stmt, DropIndex):
+            return self._exec_drop_index(stmt)
+        if isinstance(stmt, Reindex):
+            return self._exec_reindex(stmt)
+        if isinstance(stmt, Checkpoint):
+            return self._exec_checkpoint(stmt)
+        if isinstance(stmt, Explain):
+            return self._exec_explain(stmt)
+        if isinstance(stmt, Copy):
+            return self._exec_copy(stmt)
+        if isinstance(stmt, Backup):
+            return self._exec_backup(stmt)
+        if isinstance(stmt, CreateMaterializedView):
+            return self._exec_create_view(stmt)
+        if isinstance(stmt, RefreshMaterializedView):
+            return self._exec_refresh(stmt)
         raise ValueError("Unsupported statement type")
 
     def _exec_create(self, stmt: CreateTable):
+        unknown = [f"{c['name']} {c['type']}" for c in stmt.columns if str(c["type"]).upper() not in PRIMITIVE_TYPES]
+        if unknown:
+            raise SchemaError(f"Unknown column type: {', '.join(unknown)}")
         schema = {
             "name": stmt.name,
             "columns": stmt.columns,
             "constraints": stmt.constraints,
-            # default: create indexes for UNIQUE constraints automatically
-            "indexes": [c[0] for c in stmt.constraints.get("unique", []) if c]
+            # default: create indexes for UNIQUE constraints automatically;
+            # multi-column UNIQUE constraints get a composite index
+            "indexes": [c[0] if len(c) == 1 else list(c) for c in stmt.constraints.get("unique", [])
+                        if c and not any(i["columns"] == c for i in stmt.indexes)] + stmt.indexes
         }
+        if stmt.options:
+            schema["storage"] = segments.check_options(stmt.options)
         self.catalog.create_table(schema)
+        self._tables.pop(stmt.name, None)
+        self._bump(stmt.name)
         return {"status": "OK", "table": stmt.name}
 
     def _exec_insert(self, stmt: Insert):
         try:
-            t = Table(stmt.table, catalog=self.catalog)
+            t = self._open(stmt.table)
         except TableNotFound:
             raise
-        inserted = 0
-        if isinstance(stmt.values, list):
-            for row in stmt.values:
-                t.insert(row)
-                inserted += 1
-        else:
-            t.insert(stmt.values)
-            inserted = 1
+        rows = stmt.values if isinstance(stmt.values, list) else [stmt.values]
+        with metrics.current().phase("write"):
+            inserted = t.insert_many(rows)
         return {"status": "OK", "inserted": inserted}
 
     def _exec_drop(self, stmt: DropTable):
+        self._check_no_dependent_views(stmt.name)
         # remove table files/directories
         self.catalog.drop_table(stmt.name)
+        self._tables.pop(stmt.name, None)
+        self._bump(stmt.name)
+        self._unregister_view(stmt.name)
         return {"status": "OK", "dropped": stmt.name}
 
     def _exec_rename(self, stmt: RenameTable):
+        # view definitions name their tables, so neither side may be renamed
+        self._check_no_dependent_views(stmt.old_name)
+        if stmt.old_name in self._view_registry():
+            raise SchemaError(f"Cannot rename materialized view '{stmt.old_name}'")
         self.catalog.rename_table(stmt.old_name, stmt.new_name)
+        self._tables.pop(stmt.old_name, None)
+        self._tables.pop(stmt.new_name, None)
+        self._bump(stmt.old_name)
+        self._bump(stmt.new_name)
         return {"status": "OK", "renamed": f"{stmt.old_name} -> {stmt.new_name}"}
 
-    def _exec_update(self, stmt: Update):
-        t = Table(stmt.table, catalog=self.catalog)
-        # find target PKs
-        targets = []
-        if stmt.where:
-            col = stmt.where.column.split('.')[-1]
-            if col == t.pk_column:
-                targets = [str(stmt.where.value)]
-            elif col in t.indexes:
-                targets = list(t.indexes[col].lookup(stmt.where.value))
+    def _coerce_terms(self, t: Table, where) -> Optional[List[Where]]:
+        """Return WHERE predicates with column prefixes stripped and literals
+        coerced to the column types of `t`.
+
+        Returns None when a literal can never match its column (e.g. 'abc'
+        compared with an INT column). IN lists become ordered sets of their
+        coerced values, dropping those that cannot match; None if none can.
+        """
+        terms = []
+        for w in conjuncts(where):
+            col = w.column.split('.')[-1]
+            val = w.value
+            typ = t.columns.get(col, {}).get("type")
+            if isinstance(val, ColumnRef):
+                raise ValueError(f"Column reference {val.name} is only supported as the correlation of EXISTS")
+            if w.op == "IN":
+                vals: Dict[Any, None] = {}
+                for v in val:
+                    if v is None:
+                        continue
+                    if typ is not None:
+                        try:
+                            v = column_converter(typ)(v)
+                        except (ValueError, TypeError):
+                            continue
+                    vals[v] = None
+                if not vals:
+                    return None
+                val = vals
+            elif typ is not None and val is not None:
+                try:
+                    val = column_converter(typ)(val)
+                except (ValueError, TypeError):
+                    return None
+            terms.append(Where(column=col, value=val, op=w.op))
+        return terms
+
+    def _access_path(self, t: Table, terms: List[Where]) -> Tuple[str, Optional[str], List[List[Any]]]:
+        """Choose how to find the rows of `t` matching `terms`.
+
+        Returns (kind, index name, key prefixes) where kind is "pk", "index",
+        "pk_prefix" or "scan". Uses the primary key or the index whose leading
+        columns are covered by the most = or IN predicates; composite keys
+        support lookups on a prefix. An IN list gives one key per value, all
+        looked up in a single multi-get.
+        """
+        keyed = _key_values(terms)
+        pk_keys = _key_prefixes(t.pk_columns, keyed)
+        width = len(pk_keys[0]) if pk_keys else 0
+        if pk_keys and width == len(t.pk_columns):
+            return "pk", None, pk_keys
+        best: Tuple[int, Any] = (width, None)
+        for name, idx in t.indexes.items():
+            keys = _key_prefixes(idx.columns, keyed)
+            if keys and len(keys[0]) > best[0]:
+                best = (len(keys[0]), (name, keys))
+        if best[1] is not None:
+            return ("index",) + best[1]
+        if pk_keys:
+            return "pk_prefix", None, pk_keys
+        return "scan", None, []
+
+    def _candidate_pks(self, t: Table, terms: List[Where]) -> Optional[List[str]]:
+        """Return candidate row keys for `terms`, or None for a full scan."""
+        kind, name, keys = self._access_path(t, terms)
+        plan = metrics.current().plan
+        many = f", {len(keys)} keys" if len(keys) > 1 else ""
+        if kind == "pk":
+            plan.append(f"{t.name}: primary key lookup ({', '.join(t.pk_columns)}{many})")
+            return [pk for vals in keys for pk in t.pk_prefix_lookup(vals)]
+        if kind == "index":
+            idx = t.indexes[name]
+            plan.append(f"{t.name}: index lookup {name} ({', '.join(idx.columns[:len(keys[0])])}{many})")
+            return [pk for vals in keys for pk in idx.lookup_prefix(vals)]
+        if kind == "pk_prefix":
+            plan.append(f"{t.name}: primary key prefix scan ({', '.join(t.pk_columns[:len(keys[0])])}{many})")
+            return [pk for vals in keys for pk in t.pk_prefix_lookup(vals)]
+        return None
+
+    def _matching(self, t: Table, where) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return (row key, row) pairs of `t` satisfying `where`."""
+        prof = metrics.current()
+        start = time.perf_counter()
+        terms = self._coerce_terms(t, where)
+        if terms is None:
+            prof.plan.append(f"{t.name}: no rows can match")
+            return []
+        with prof.phase("lookup"):
+            pks = self._candidate_pks(t, terms)
+        with prof.phase("scan"):
+            if pks is None:
+                # full scan, skipping blocks whose zone maps rule out the terms
+                kept, skipped = prof.blocks_scanned, prof.blocks_skipped
+                source = t.scan_items(terms)
+                kept, skipped = prof.blocks_scanned - kept, prof.blocks_skipped - skipped
+                prof.plan.append(f"{t.name}: full scan" + (f", {kept} of {kept + skipped} blocks" if terms else ""))
+                prof.rows_scanned += len(source)
             else:
-                for rpk, r in t._rows.items():
-                    if r.get(col) == stmt.where.value:
-                        targets.append(rpk)
+                source = ((pk, t.get(pk)) for pk in pks)
+                prof.rows_scanned += len(pks)
+            out = []
+            check = control.current().check
+            for i, (pk, r) in enumerate(source):
+                if not i & control.CHECK_MASK:
+                    check()
+                if r is not None and _satisfies(r, terms):
+                    out.append((pk, r))
+        if prof.actuals is not None:
+            prof.actuals["access"] = [len(out), time.perf_counter() - start, 1]
+        return out
+
+    def _covering_index(self, t: Table, stmt: Select,
+                        terms: Optional[List[Where]]) -> Optional[Tuple[str, List[List[Any]]]]:
+        """Return (index name, key prefixes) of an index that covers `stmt`, if any.
+
+        An index covers a single-table SELECT when every projected and filtered
+        column is an indexed, INCLUDE'd or primary-key column and the WHERE
+        clause fixes a leading prefix of its key.
+        """
+        projected = stmt.columns
+        if stmt.group_by or stmt.aggregates:
+            projected = stmt.group_by + [a.column for a in stmt.aggregates if a.column is not None]
+        if not terms or '*' in [c.strip() for c in projected]:
+            return None
+        keyed = _key_values(terms)
+        if t.pk_columns and all(c in keyed for c in t.pk_columns):
+            # a full primary-key lookup is already a single row read per key
+            return None
+        need = {c.strip().split('.')[-1] for c in projected} | {w.column for w in terms}
+        for name, idx in t.indexes.items():
+            if not need <= set(idx.columns) | set(idx.include) | set(t.pk_columns):
+                continue
+            keys = _key_prefixes(idx.columns, keyed)
+            if keys:
+                return name, keys
+        return None
+
+    def _index_only(self, t: Table, stmt: Select) -> Optional[List[Dict[str, Any]]]:
+        """Answer a single-table SELECT from index data alone, if possible.
+
+        Returns None when no index covers the statement and the row store
+        must be consulted.
+        """
+        terms = self._coerce_terms(t, stmt.where)
+        covering = self._covering_index(t, stmt, terms)
+        if covering is None:
+            return None
+        name, keys = covering
+        idx = t.indexes[name]
+        prof = metrics.current()
+        many = f", {len(keys)} keys" if len(keys) > 1 else ""
+        prof.plan.append(f"{t.name}: index-only lookup {name} ({', '.join(idx.columns[:len(keys[0])])}{many})")
+        start = time.perf_counter()
+        rows = []
+        with prof.phase("lookup"):
+            for vals in keys:
+                for key, pks in idx.lookup_entries(vals):
+                    base = idx.decode(key)
+                    prof.rows_scanned += len(pks)
+                    for pk in pks:
+                        r = {**base, **t.pk_values(pk), **idx.included(pk)}
+                        if _satisfies(r, terms):
+                            rows.append(r)
+        if prof.actuals is not None:
+            prof.actuals["access"] = [len(rows), time.perf_counter() - start, 1]
+        return rows
+
+    def _exec_create_index(self, stmt: CreateIndex):
+        t = self._open(stmt.table)
+        if stmt.concurrently:
+            build = t.create_index_online(stmt.name, stmt.columns, unique=stmt.unique, include=stmt.include)
+            self.index_builds[f"{stmt.table}.{stmt.name}"] = build
+            return {"status": "BUILDING", "index": stmt.name, "table": stmt.table}
+        t.create_index(stmt.name, stmt.columns, unique=stmt.unique, include=stmt.include)
+        return {"status": "OK", "index": stmt.name, "table": stmt.table}
+
+    def _find_index(self, index: str, table: Optional[str]) -> Table:
+        """Return the table owning `index`, searching the catalog if `table` is None."""
+        tables = [table] if table else self.catalog.list_tables()
+        for name in tables:
+            t = self._open(name)
+            if index in t.indexes:
+                return t
+        raise SchemaError(f"Index '{index}' not found")
+
+    def _exec_drop_index(self, stmt: DropIndex):
+        t = self._find_index(stmt.name, stmt.table)
+        t.drop_index(stmt.name)
+        return {"status": "OK", "dropped_index": stmt.name, "table": t.name}
+
+    def _exec_reindex(self, stmt: Reindex):
+        if stmt.index:
+            t = self._find_index(stmt.index, stmt.table)
+            t.reindex([stmt.index])
+            self._bump(t.name)
+            return {"status": "OK", "reindexed": [stmt.index], "table": t.name}
+        t = self._open(stmt.table)
+        t.reindex()
+        self._bump(t.name)
+        return {"status": "OK", "reindexed": list(t.indexes), "table": t.name}
+
+    def _exec_checkpoint(self, stmt: Checkpoint):
+        names = [stmt.table] if stmt.table else self.catalog.list_tables()
+        for name in names:
+            self._open(name).compact()
+        return {"status": "OK", "checkpointed": names}
+
+    def _exec_copy(self, stmt: Copy):
+        """Bulk-load a table from, or export it to, a CSV or JSONL file.
+
+        Both directions stream: the file is read or written in chunks (see
+        `rdbms.bulk`, and `rdbms.arrow` for Parquet), and a load runs through
+        `Table.copy_from`.
+        """
+        if not isinstance(stmt.path, str):
+            raise ValueError("COPY file name must be a string")
+        t = self._open(stmt.table)
+        options = bulk.check_options(stmt.path, stmt.options)
+        names = [c for c in t.columns if c not in views.hidden_columns(t.schema)]
+        columns = stmt.columns or names
+        unknown = [c for c in columns if c not in t.columns]
+        if unknown:
+            raise SchemaError(f"Unknown column(s) for {t.name}: {', '.join(unknown)}")
+        prof = metrics.current()
+        if stmt.direction == "from":
+            rows = bulk.read_rows(stmt.path, columns, names, options, explicit=stmt.columns is not None)
+            with prof.phase("write"):
+                n = t.copy_from(rows)
+            prof.plan.append(f"{t.name}: copy from {stmt.path} ({options['format']})")
+            return {"status": "OK", "inserted": n}
+        if options["format"] == "parquet":
+            from . import arrow
+
+            with prof.phase("write"):
+                n = arrow.write_parquet(t, stmt.path, columns)
+        else:
+            with prof.phase("scan"):
+                rows = [r for _, r in t.scan_items()]
+            prof.rows_scanned += len(rows)
+            with prof.phase("write"):
+                n = bulk.write_rows(stmt.path, columns, rows, options)
+        prof.plan.append(f"{t.name}: copy to {stmt.path} ({options['format']})")
+        return {"status": "OK", "exported": n}
+
+    def _exec_backup(self, stmt: Backup):
+        """Take a full backup into an empty directory, or ship the change log
+        written since the last backup into an existing one (see `rdbms.backup`)."""
+        from contextlib import ExitStack
+
+        from . import backup
+
+        if not isinstance(stmt.path, str):
+            raise ValueError("BACKUP directory must be a string")
+        manifest = backup.read_manifest(stmt.path)
+        kind = "incremental"
+        copied = 0
+        if manifest is None:
+            kind = "full"
+            os.makedirs(stmt.path, exist_ok=True)
+            tables = [self._open(name) for name in self.catalog.list_tables()]
+            # hold every table's lock (in name order) so the links match one LSN
+            with ExitStack() as stack:
+                for t in tables:
+                    stack.enter_context(t.lock)
+                lsn = self.changelog.lsn if self.changelog is not None else None
+                manifest = backup.link_base(stmt.path, tables, lsn)
+            copied = manifest["bytes_copied"]
+        elif self.changelog is None or manifest["lsn"] is None:
+            raise ValueError("Incremental backups need a change log (Executor(changelog=...)) "
+                             "when both backups are taken")
+        if self.changelog is not None:
+            self.changelog.flush()
+            copied += backup.ship_log(stmt.path, self.changelog.path, manifest)
+            manifest["shipped_lsn"] = self.changelog.lsn
+        manifest.setdefault("backups", []).append({"kind": kind, "time": time.time(), "bytes_copied": copied})
+        backup.write_manifest(stmt.path, manifest)
+        return {"status": "OK", "backup": stmt.path, "kind": kind, "lsn": manifest.get("shipped_lsn"),
+                "bytes_copied": copied}
+
+    # -- materialized views ------------------------------------------------------
+
+    def _view_registry(self) -> Dict[str, views.View]:
+        """Return the materialized views by name, reading their definitions
+        from the catalog the first time."""
+        if self._views is None:
+            found = {}
+            for name in self.catalog.list_tables():
+                try:
+                    schema = self.catalog.load_schema(name)
+                except TableNotFound:
+                    continue
+                if "view" in schema:
+                    query = schema["view"]["query"]
+                    found[name] = views.View(name, query, self.parser.parse(query))
+            self._views = {}
+            for view in found.values():
+                self._register_view(view)
+        return self._views
+
+    def _register_view(self, view: views.View):
+        self._views[view.name] = view
+        for source in view.sources:
+            self._view_deps.setdefault(source, []).append(view)
+
+    def _unregister_view(self, name: str):
+        view = self._views.pop(name, None) if self._views is not None else None
+        if view is not None:
+            for source in view.sources:
+                self._view_deps[source] = [v for v in self._view_deps.get(source, []) if v is not view]
+
+    def _check_no_dependent_views(self, table: str):
+        using = [v.name for v in self._view_registry().values() if table in v.sources]
+        if using:
+            raise SchemaError(f"Materialized view(s) {', '.join(using)} depend on '{table}'")
+
+    def _view_change(self, name: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        # table listener: buffer the change; it is applied when the statement ends
+        self._view_registry()
+        if name not in self._view_deps or not self._view_deps[name]:
+            return
+        with self._view_changes_lock:
+            changes = self._view_changes.setdefault(name, [])
+            if old is not None:
+                changes.append((-1, old))
+            if new is not None:
+                changes.append((1, new))
+
+    def _maintain_views(self):
+        """Apply buffered source-table changes to the materialized views over
+        them (repeating while views over views change)."""
+        with self._maintain_lock:
+            while True:
+                with self._view_changes_lock:
+                    changes, self._view_changes = self._view_changes, {}
+                if not changes:
+                    return
+                with metrics.current().phase("views"):
+                    for source, deltas in changes.items():
+                        for view in list(self._view_deps.get(source, ())):
+                            self._apply_view(view, source, deltas)
+
+    def _view_tables(self, view: views.View) -> Tuple[Table, Optional[Table], Table]:
+        left = self._open(view.stmt.table)
+        right = self._open(view.right) if view.right else None
+        vt = self._open(view.name)
+        if not view.outputs:
+            view.bind(vt)
+        return left, right, vt
+
+    def _apply_view(self, view: views.View, source: str, deltas: List[views.Delta]):
+        left, right, vt = self._view_tables(view)
+        if right is None:
+            terms = self._coerce_terms(left, view.stmt.where)
+            rows = [] if terms is None else [(sign, r) for sign, r in deltas if _satisfies(r, terms)]
+        else:
+            rows = self._join_deltas(view.stmt, source, deltas, left, right)
+        if rows:
+            n = view.apply(vt, rows, left, right, lambda key: self._group_source_rows(view, key))
+            metrics.current().plan.append(f"{view.name}: {n} view row(s) maintained")
+
+    def _join_deltas(self, stmt: Select, source: str, deltas: List[views.Delta],
+                     left: Table, right: Table) -> List[views.Delta]:
+        """Join changed rows of one side of `stmt`'s join with the current rows
+        of the other side, returning the deltas of the joined rows."""
+        left_where, right_where = self._join_where(stmt)
+        lterms = self._coerce_terms(left, left_where)
+        rterms = self._coerce_terms(right, right_where)
+        if lterms is None or rterms is None:
+            return []
+        lcol, rcol, rname = stmt.join.left_col, stmt.join.right_col, right.name
+        changed_left = source == left.name
+        col, terms = (lcol, lterms) if changed_left else (rcol, rterms)
+        keys = {r.get(col) for _, r in deltas if r.get(col) is not None and _satisfies(r, terms)}
+        other = self._rows_by(right, rcol, keys, rterms) if changed_left else self._rows_by(left, lcol, keys, lterms)
+        out: List[views.Delta] = []
+        for sign, r in deltas:
+            if r.get(col) is None or not _satisfies(r, terms):
+                continue
+            for o in other.get(r.get(col), ()):
+                lrow, rrow = (r, o) if changed_left else (o, r)
+                out.append((sign, {**lrow, **{f"{rname}.{k}": v for k, v in rrow.items()}}))
+        return out
+
+    def _rows_by(self, t: Table, col: str, keys: Iterable[Any], terms: List[Where]) -> Dict[Any, List[Dict[str, Any]]]:
+        """Return the rows of `t` whose `col` is in `keys` (and that satisfy
+        `terms`), grouped by that value."""
+        keys = set(keys)
+        out: Dict[Any, List[Dict[str, Any]]] = {}
+        if not keys:
+            return out
+        method, name = self._join_method(t, col)
+        if method == "pk":
+            found = (t.get(k) for k in keys)
+        elif method == "index":
+            idx = t.indexes[name]
+            found = (t.get(pk) for k in keys for pk in idx.lookup_prefix([k]))
         else:
-            targets = list(t._rows.keys())
-        updated = 0
-        for pk in targets:
-            t.update(pk, stmt.changes)
-            updated += 1
+            found = (r for r in t.scan() if r.get(col) in keys)
+        for r in found:
+            if r is not None and r.get(col) in keys and _satisfies(r, terms):
+                out.setdefault(r.get(col), []).append(r)
+        return out
+
+    def _group_source_rows(self, view: views.View, key: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        terms = conjuncts(view.stmt.where) + [Where(ref, v) for (ref, _), v in zip(view.outputs, key)]
+        return self._source_rows(Select(columns=view.stmt.columns, table=view.stmt.table,
+                                        where=And(terms), join=view.stmt.join))
+
+    def _refresh(self, view: views.View) -> int:
+        with self._maintain_lock:
+            # changes made before the rebuild must not be applied on top of it
+            self._maintain_views()
+            left, right, vt = self._view_tables(view)
+            view.bind(vt)
+            target: Dict[str, Optional[Dict[str, Any]]] = {pk: None for pk, _ in vt.scan_items()}
+            target.update(view.rebuild(self._source_rows(view.stmt), vt, left, right))
+            with metrics.current().phase("write"):
+                view.write(vt, target)
+            return len(vt)
+
+    def _exec_create_view(self, stmt: CreateMaterializedView):
+        """Create a materialized view: a table holding the query's result,
+        kept up to date as its source tables change (see `rdbms.views`)."""
+        if self.catalog.exists(stmt.name):
+            raise SchemaError(f"Table '{stmt.name}' already exists")
+        query = self.parser.parse(stmt.query)
+        if _has_subqueries(query.where):
+            raise SchemaError("A materialized view cannot use IN (SELECT ...) or EXISTS")
+        view = views.View(stmt.name, stmt.query, query)
+        left = self._open(query.table)
+        right = self._open(query.join.right_table) if query.join else None
+        self._view_registry()
+        self.catalog.create_table(view.schema(left, right))
+        self._tables.pop(stmt.name, None)
+        self._bump(stmt.name)
+        if self.changelog is not None:
+            # logged before the rows it is populated with, so followers create it first
+            self.changelog.statement(stmt)
+        self._register_view(view)
+        rows = self._refresh(view)
+        return {"status": "OK", "view": stmt.name, "rows": rows}
+
+    def _exec_refresh(self, stmt: RefreshMaterializedView):
+        view = self._view_registry().get(stmt.name)
+        if view is None:
+            raise SchemaError(f"'{stmt.name}' is not a materialized view")
+        return {"status": "OK", "refreshed": stmt.name, "rows": self._refresh(view)}
+
+    def _tables_of(self, stmt: Select) -> Tuple[str, ...]:
+        """The tables a SELECT reads, including those of its subqueries."""
+        tables = [stmt.table] + ([stmt.join.right_table] if stmt.join else [])
+        for w in conjuncts(stmt.where):
+            query = w.query if isinstance(w, Exists) else w.value
+            if isinstance(query, Select):
+                tables.extend(self._tables_of(query))
+        return tuple(dict.fromkeys(tables))
+
+    def _semi_join(self, stmt, query: Select) -> Optional[Tuple[str, Select]]:
+        """Split a correlated EXISTS into (outer column, query of inner values).
+
+        The subquery must be linked to the outer row by exactly one
+        `inner.col = outer.col` term; `WHERE EXISTS (SELECT * FROM o WHERE
+        o.uid = u.id AND o.total > 5)` gives ("u.id", SELECT o.uid FROM o
+        WHERE o.total > 5). Returns None for an uncorrelated EXISTS.
+        """
+        links = [w for w in conjuncts(query.where) if isinstance(w, Where) and isinstance(w.value, ColumnRef)]
+        if not links:
+            return None
+        if len(links) > 1 or links[0].op != "=":
+            raise ValueError("A correlated EXISTS must be linked to the outer query by one inner.col = outer.col term")
+        link = links[0]
+        outer = {stmt.table} | ({stmt.join.right_table} if getattr(stmt, "join", None) else set())
+        a, b = link.column, link.value.name
+        a_table = a.split(".")[0] if "." in a else query.table
+        b_table = b.split(".")[0]
+        if b_table in outer and (a_table == query.table or a_table not in outer):
+            inner_col, outer_col = a, b
+        elif a_table in outer and b_table == query.table:
+            inner_col, outer_col = b, a
+        else:
+            raise ValueError(f"EXISTS correlation {a} = {b} does not name a column of {', '.join(sorted(outer))}")
+        if query.group_by or query.aggregates:
+            raise ValueError("A correlated EXISTS subquery cannot use GROUP BY or aggregates")
+        rest = [w for w in conjuncts(query.where) if w is not link]
+        return outer_col, dataclasses.replace(query, columns=[inner_col], where=And(rest) if rest else None)
+
+    def _subquery_values(self, query: Select) -> List[Any]:
+        """The distinct non-NULL values of the one column `query` returns."""
+        col = query.columns[0].strip()
+        rows = self._exec_select(query)
+        vals: Dict[Any, None] = {}
+        for r in rows:
+            v = r.get(col) if col in r else next(iter(r.values()), None)
+            if v is not None:
+                vals[v] = None
+        if isinstance(rows, memory.RowBuffer):
+            rows.close()
+        return list(vals)
+
+    def _resolve_subqueries(self, stmt):
+        """Run the subqueries in `stmt`'s WHERE clause once, before the
+        statement itself, and return the statement with their results in place.
+
+        `col IN (SELECT c ...)` becomes `col IN (distinct values of c)`. An
+        uncorrelated EXISTS is dropped when its query returns a row, and
+        otherwise leaves a WHERE clause nothing satisfies. A correlated EXISTS
+        runs as a hash semi-join: the distinct inner values are collected
+        once and probed as `outer.col IN (...)`, through the primary key or an
+        index of the outer table when one covers the column.
+        """
+        if not _has_subqueries(stmt.where):
+            return stmt
+        prof = metrics.current()
+        # subqueries report their operators as the outer statement's SubPlans
+        actuals, prof.actuals = prof.actuals, None
+        terms: List[Where] = []
+        try:
+            n = 0
+            for w in conjuncts(stmt.where):
+                if not isinstance(w, Exists) and not isinstance(w.value, Select):
+                    terms.append(w)
+                    continue
+                n += 1
+                start = time.perf_counter()
+                if isinstance(w, Exists):
+                    semi = self._semi_join(stmt, w.query)
+                    if semi is not None:
+                        vals = self._subquery_values(semi[1])
+                        terms.append(Where(semi[0], vals, "IN"))
+                    else:
+                        rows = self._exec_select(w.query)
+                        vals = [True] if len(rows) else []
+                        if isinstance(rows, memory.RowBuffer):
+                            rows.close()
+                        if not vals:
+                            # an empty IN list matches no row
+                            terms.append(Where("", [], "IN"))
+                else:
+                    vals = self._subquery_values(w.value)
+                    terms.append(Where(w.column, vals, "IN"))
+                if actuals is not None:
+                    actuals[f"subplan {n}"] = [len(vals), time.perf_counter() - start, 1]
+        finally:
+            prof.actuals = actuals
+        return dataclasses.replace(stmt, where=And(terms) if terms else None)
+
+    def _exec_update(self, stmt: Update):
+        stmt = self._resolve_subqueries(stmt)
+        t = self._open(stmt.table)
+        with t.lock:
+            # find target PKs
+            targets = [pk for pk, _ in self._matching(t, stmt.where)]
+            prof = metrics.current()
+            start = time.perf_counter()
+            with prof.phase("write"):
+                updated = t.update_many(targets, stmt.changes)
+            if prof.actuals is not None:
+                prof.actuals["write"] = [updated, time.perf_counter() - start, 1]
         return {"status": "OK", "updated": updated}
 
     def _exec_delete(self, stmt: Delete):
-        t = Table(stmt.table, catalog=self.catalog)
-        targets = []
-        if stmt.where:
-            col = stmt.where.column.split('.')[-1]
-            if col == t.pk_column:
-                targets = [str(stmt.where.value)]
-            elif col in t.indexes:
-                targets = list(t.indexes[col].lookup(stmt.where.value))
-            else:
-                for rpk, r in t._rows.items():
-                    if r.get(col) == stmt.where.value:
-                        targets.append(rpk)
-        else:
-            targets = list(t._rows.keys())
-        deleted = 0
-        for pk in targets:
-            if t.delete(pk):
-                deleted += 1
+        stmt = self._resolve_subqueries(stmt)
+        t = self._open(stmt.table)
+        with t.lock:
+            targets = [pk for pk, _ in self._matching(t, stmt.where)]
+            prof = metrics.current()
+            start = time.perf_counter()
+            with prof.phase("write"):
+                deleted = t.delete_many(targets)
+            if prof.actuals is not None:
+                prof.actuals["write"] = [deleted, time.perf_counter() - start, 1]
         return {"status": "OK", "deleted": deleted}
 
+    def _join_method(self, right: Table, rcol: str) -> Tuple[str, Optional[str]]:
+        """How to find right rows for a join on `rcol`: ("pk", None), ("index",
+        index name) for an index nested-loop join, or ("hash", None)."""
+        if right.pk_column == rcol:
+            return "pk", None
+        name = next((n for n, i in right.indexes.items() if i.columns[0] == rcol), None)
+        if name is not None:
+            return "index", name
+        return "hash", None
+
+    def _join_where(self, stmt: Select) -> Tuple[And, And]:
+        """Split a join's WHERE clause into (left, right) table predicates.
+
+        Terms qualified with the right table filter right rows; the rest
+        (qualified with the left table or bare) filter left rows.
+        """
+        prefix = stmt.join.right_table + "."
+        terms = conjuncts(stmt.where)
+        return (And([w for w in terms if not w.column.startswith(prefix)]),
+                And([w for w in terms if w.column.startswith(prefix)]))
+
     def _exec_select(self, stmt: Select):
+        stmt = self._resolve_subqueries(stmt)
+        rows = self._source_rows(stmt)
+        prof = metrics.current()
+        start = time.perf_counter()
+        if stmt.group_by or stmt.aggregates:
+            with prof.phase("aggregate"):
+                out = self._aggregate(rows, stmt)
+            if prof.actuals is not None:
+                prof.actuals["aggregate"] = [len(out), time.perf_counter() - start, 1]
+            if isinstance(rows, memory.RowBuffer):
+                rows.close()
+            return out
+        # projection; `*` leaves out the hidden columns of a materialized view
+        hidden = self._hidden_columns(stmt)
+        if stmt.columns == ['*'] and not hidden:
+            return rows.result() if isinstance(rows, memory.RowBuffer) else rows
+        out = memory.RowBuffer(self._grant("project"))
+        check = control.current().check
+        with prof.phase("project"):
+            for i, r in enumerate(rows):
+                if not i & control.CHECK_MASK:
+                    check()
+                rec = {}
+                for c in stmt.columns:
+                    c = c.strip()
+                    if c == '*':
+                        rec.update(r if not hidden else {k: v for k, v in r.items() if k not in hidden})
+                    else:
+                        # allow table.column
+                        key = c.split('.')[-1]
+                        rec[c] = r.get(key)
+                out.append(rec)
+        if isinstance(rows, memory.RowBuffer):
+            rows.close()
+        if prof.actuals is not None:
+            prof.actuals["project"] = [len(out), time.perf_counter() - start, 1]
+        return out.result()
+
+    def _hidden_columns(self, stmt: Select) -> Set[str]:
+        """Columns `*` does not expand to: the bookkeeping columns of views."""
+        if system.is_system(stmt.table):
+            return set()
+        hidden = set(views.hidden_columns(self._open(stmt.table).schema))
+        if stmt.join:
+            rname = stmt.join.right_table
+            hidden.update(f"{rname}.{c}" for c in views.hidden_columns(self._open(rname).schema))
+        return hidden
+
+    def _aggregate(self, rows: Iterable[Dict[str, Any]], stmt: Select, depth: int = 0):
+        """Evaluate the GROUP BY of `stmt` over `rows` within the memory budget.
+
+        Groups are kept in memory while the budget allows. Rows of groups
+        that do not fit are partitioned by group key into temp files and each
+        partition is aggregated on its own afterwards (partitioned again, up
+        to _MAX_SPILL_DEPTH levels), so spilled groups come out last.
+        """
+        right = stmt.join.right_table if stmt.join else None
+        grant = self._grant("aggregate")
+        if not grant.limited or not stmt.group_by or depth >= _MAX_SPILL_DEPTH:
+            return views.aggregate(rows, stmt, right)
+        aggs = stmt.aggregates
+        state_size = estimate_size(views.new_state(aggs))
+        groups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        parts: Optional[List[memory.SpillFile]] = None
+        check = control.current().check
+        for i, r in enumerate(rows):
+            if not i & control.CHECK_MASK:
+                check()
+            key = tuple(views.value(r, g, right) for g in stmt.group_by)
+            state = groups.get(key)
+            if state is None:
+                if parts is None and grant.grow(state_size + estimate_size(key)):
+                    state = groups[key] = views.new_state(aggs)
+                else:
+                    if parts is None:
+                        parts = [memory.SpillFile(self.memory) for _ in range(_SPILL_PARTITIONS)]
+                        metrics.current().plan.append(f"aggregate: spilled to {len(parts)} partitions")
+                    parts[hash((depth, key)) % len(parts)].append(r)
+                    continue
+            views.fold(state, aggs, r, 1, right)
+        out = memory.RowBuffer(self._grant("aggregate output"))
+        out.extend(views.records(groups, stmt))
+        groups.clear()
+        grant.close()
+        for part in parts or ():
+            out.extend(self._aggregate(part, stmt, depth + 1))
+            part.close()
+        return out.result()
+
+    def _source_rows(self, stmt: Select) -> Sequence[Dict[str, Any]]:
+        """Return the rows a SELECT reads, filtered and joined but not yet
+        projected; the right table's columns of a joined row are "right.col".
+        Joined rows come in a `memory.RowBuffer`, which may have spilled."""
+        prof = metrics.current()
+        if system.is_system(stmt.table) or (stmt.join and system.is_system(stmt.join.right_table)):
+            if stmt.join:
+                raise ValueError("System tables cannot be joined")
+            terms = [Where(w.column.split('.')[-1], w.value, w.op) for w in conjuncts(stmt.where)]
+            start = time.perf_counter()
+            with prof.phase("scan"):
+                source = system.rows(self, stmt.table)
+            prof.rows_scanned += len(source)
+            prof.plan.append(f"{stmt.table}: system table scan")
+            out = [r for r in source if _satisfies(r, terms)]
+            if prof.actuals is not None:
+                prof.actuals["access"] = [len(out), time.perf_counter() - start, 1]
+            return out
         # single table or join
-        left = Table(stmt.table, catalog=self.catalog)
-        rows = []
+        left = self._open(stmt.table)
+        actuals = prof.actuals
         if stmt.join:
-            right = Table(stmt.join.right_table, catalog=self.catalog)
-            # nested-loop join: for each left row find matching right rows
-            for l in left.scan():
-                lkey = l.get(stmt.join.left_col)
-                for r in right.scan():
-                    if r.get(stmt.join.right_col) == lkey:
-                        merged = {**l, **{f"{stmt.join.right_table}.{k}": v for k, v in r.items()}}
-                        rows.append(merged)
+            right = self._open(stmt.join.right_table)
+            left_where, right_where = self._join_where(stmt)
+            right_terms = self._coerce_terms(right, right_where)
+            if right_terms is None:
+                return []
+            matches = self._matching(left, left_where)
+            rcol = stmt.join.right_col
+            rname = stmt.join.right_table
+            rows = memory.RowBuffer(self._grant("join"))
+            method, rindex = self._join_method(right, rcol)
+            if method == "pk":
+                prof.plan.append(f"{rname}: primary key probe per {stmt.table} row ({rcol})")
+
+                def probe(v):
+                    r = right.get(v)
+                    return [r] if r is not None else []
+            elif method == "index":
+                prof.plan.append(f"{rname}: index nested loop join on {rindex} ({rcol})")
+                ridx = right.indexes[rindex]
+
+                # index nested-loop join on the right table's index
+                def probe(v):
+                    return [r for r in (right.get(pk) for pk in ridx.lookup_prefix([v])) if r is not None]
+            else:
+                prof.plan.append(f"{rname}: hash join ({rcol})")
+                # hash join: build a hash table over the right table once
+                buckets = self._hash_build(right, rcol)
+                if buckets is None:
+                    # the hash table does not fit the memory budget
+                    self._partitioned_join(stmt, matches, left, right, right_terms, rows)
+                    return rows
+
+                def probe(v):
+                    return buckets.get(v, [])
+            if actuals is not None:
+                inner = actuals["inner"] = [0, 0.0, 0]
+                lookup = probe
+
+                def probe(v):
+                    start = time.perf_counter()
+                    found = lookup(v)
+                    inner[0] += len(found)
+                    inner[1] += time.perf_counter() - start
+                    inner[2] += 1
+                    return found
+            start = time.perf_counter()
+            check = control.current().check
+            with prof.phase("join"):
+                for i, (_, l) in enumerate(matches):
+                    if not i & control.CHECK_MASK:
+                        check()
+                    lkey = l.get(stmt.join.left_col)
+                    if lkey is None:
+                        continue
+                    for r in probe(lkey):
+                        prof.rows_scanned += 1
+                        if not prof.rows_scanned & control.CHECK_MASK:
+                            check()
+                        if r.get(rcol) == lkey and _satisfies(r, right_terms):
+                            merged = {**l, **{f"{rname}.{k}": v for k, v in r.items()}}
+                            rows.append(merged)
+            if actuals is not None:
+                actuals["join"] = [len(rows), time.perf_counter() - start, 1]
         else:
-            # try to use index if where column is simple and indexed
-            if stmt.where and '.' not in stmt.where.column and stmt.where.column in left.indexes:
-                pks = left.indexes[stmt.where.column].lookup(stmt.where.value)
-                for pk in pks:
-                    row = left.get(pk)
-                    if row is not None:
-                        rows.append(row)
+            # answer from a covering index if possible, else use the primary key
+            # or an index when the WHERE clause allows it
+            rows = self._index_only(left, stmt)
+            if rows is None:
+                rows = [r for _, r in self._matching(left, stmt.where)]
+        return rows
+
+    def _hash_build(self, right: Table, rcol: str) -> Optional[Dict[Any, List[Dict[str, Any]]]]:
+        """Hash the rows of `right` on `rcol`, or return None if the hash
+        table would exceed the memory budget."""
+        prof = metrics.current()
+        grant = self._grant("hash")
+        limited = grant.limited
+        buckets: Dict[Any, List[Dict[str, Any]]] = {}
+        start = time.perf_counter()
+        with prof.phase("join"):
+            right_rows = right.scan()
+            prof.rows_scanned += len(right_rows)
+            check = control.current().check
+            for i, r in enumerate(right_rows):
+                if not i & control.CHECK_MASK:
+                    check()
+                v = r.get(rcol)
+                if v is not None:
+                    if limited and not grant.grow(memory.entry_size(v)):
+                        grant.close()
+                        return None
+                    buckets.setdefault(v, []).append(r)
+        if prof.actuals is not None:
+            prof.actuals["hash"] = [len(right_rows), time.perf_counter() - start, 1]
+        return buckets
+
+    def _partitioned_join(self, stmt: Select, matches: List[Tuple[str, Dict[str, Any]]], left: Table,
+                          right: Table, right_terms: List[Where], out: memory.RowBuffer):
+        """Hash join whose build side is over the memory budget (a grace hash join).
+
+        Both sides are split by join key into temp-file partitions of
+        (key, row key) pairs; the rows themselves stay in their tables. Each
+        partition is then hashed and probed on its own, so only one
+        partition's hash table is in memory at a time. Joined rows come out
+        grouped by partition rather than in left-table order.
+        """
+        prof = metrics.current()
+        rcol, lcol, rname = stmt.join.right_col, stmt.join.left_col, right.name
+        start = time.perf_counter()
+        with prof.phase("join"):
+            items = [(pk, r.get(rcol)) for pk, r in right.scan_items()]
+            prof.rows_scanned += len(items)
+            items = [(pk, v) for pk, v in items if v is not None]
+            # enough partitions for each hash table to take about half the budget
+            need = 2 * sum(memory.entry_size(v) for _, v in items)
+            n = max(_SPILL_PARTITIONS, min(_MAX_PARTITIONS, need // self.memory.limit + 1))
+            rparts = [memory.SpillFile(self.memory) for _ in range(n)]
+            lparts = [memory.SpillFile(self.memory) for _ in range(n)]
+            for pk, v in items:
+                rparts[hash(v) % n].append((v, pk))
+            del items
+            for pk, l in matches:
+                v = l.get(lcol)
+                if v is not None:
+                    lparts[hash(v) % n].append((v, pk))
+        prof.plan.append(f"{rname}: hash join spilled to {n} partitions")
+        if prof.actuals is not None:
+            prof.actuals["hash"] = [sum(len(p) for p in rparts), time.perf_counter() - start, n]
+        start = time.perf_counter()
+        check = control.current().check
+        with prof.phase("join"):
+            for rpart, lpart in zip(rparts, lparts):
+                buckets: Dict[Any, List[str]] = {}
+                for v, pk in rpart:
+                    buckets.setdefault(v, []).append(pk)
+                rpart.close()
+                for v, lpk in lpart:
+                    found = buckets.get(v)
+                    if not found:
+                        continue
+                    l = left.get(lpk)
+                    for rpk in found:
+                        r = right.get(rpk)
+                        prof.rows_scanned += 1
+                        if not prof.rows_scanned & control.CHECK_MASK:
+                            check()
+                        if r is not None and r.get(rcol) == v and _satisfies(r, right_terms):
+                            out.append({**l, **{f"{rname}.{k}": x for k, x in r.items()}})
+                lpart.close()
+        if prof.actuals is not None:
+            prof.actuals["join"] = [len(out), time.perf_counter() - start, 1]
+
+    def _plan_access(self, t: Table, where) -> PlanNode:
+        """Describe how `_matching` finds the rows of `t` satisfying `where`."""
+        terms = self._coerce_terms(t, where)
+        if terms is None:
+            node = PlanNode("Result", est_rows=0, role="access")
+            node.info.append("One-Time Filter: false (a literal cannot match its column type)")
+            return node
+        kind, name, keys = self._access_path(t, terms)
+        if kind in ("pk", "pk_prefix"):
+            keyed = t.pk_columns[:len(keys[0])]
+            op = "Primary Key Lookup" if kind == "pk" else "Primary Key Prefix Scan"
+            node = PlanNode(op, f"on {t.name}", est_rows=sum(len(t.pk_prefix_lookup(v)) for v in keys),
+                            role="access")
+        elif kind == "index":
+            idx = t.indexes[name]
+            keyed = idx.columns[:len(keys[0])]
+            node = PlanNode("Index Lookup", f"on {t.name} using {name}",
+                            est_rows=sum(len(idx.lookup_prefix(v)) for v in keys), role="access")
+        else:
+            keyed = []
+            kept, total, rows = t.zone_estimate(terms)
+            node = PlanNode("Seq Scan", f"on {t.name}", est_rows=rows, role="access")
+            if terms:
+                node.info.append(f"Zone Maps: {kept} of {total} blocks may match")
+        if len(keys) > 1:
+            node.info.append(f"Multi-Get: {len(keys)} keys")
+        self._describe_filter(node, terms, keyed)
+        return node
+
+    @staticmethod
+    def _describe_filter(node: PlanNode, terms: List[Where], keyed: List[str]):
+        key = [w for w in terms if w.op in ("=", "IN") and w.column in keyed]
+        rest = [w for w in terms if w not in key]
+        if key:
+            node.info.insert(0, "Key: " + describe_terms(key))
+        if rest:
+            node.info.append("Filter: " + describe_terms(rest))
+
+    def _plan(self, stmt) -> PlanNode:
+        """Build the operator tree for a SELECT, UPDATE or DELETE.
+
+        Node roles name the measurements recorded under EXPLAIN ANALYZE:
+        "access" (finding rows of the first table), "inner"/"hash" (the right
+        side of a join), "join", "project", "write" and "subplan N" (the
+        Nth subquery, run once before the statement).
+        """
+        stmt, subplans, filters = self._plan_subqueries(stmt)
+        node = self._plan_statement(stmt)
+        if filters:
+            node.info.append("SubPlan Filter: " + " AND ".join(filters))
+        node.children.extend(subplans)
+        return node
+
+    def _plan_subqueries(self, stmt) -> Tuple[Any, List[PlanNode], List[str]]:
+        """Split the subqueries off `stmt`: returns the statement without
+        them, a "SubPlan N" node per subquery and the filters they become."""
+        if not _has_subqueries(stmt.where):
+            return stmt, [], []
+        terms, subplans, filters = [], [], []
+        for w in conjuncts(stmt.where):
+            if not isinstance(w, Exists) and not isinstance(w.value, Select):
+                terms.append(w)
+                continue
+            label = f"SubPlan {len(subplans) + 1}"
+            semi = self._semi_join(stmt, w.query) if isinstance(w, Exists) else None
+            if semi is not None:
+                node = PlanNode(label, f"(hash semi-join on {semi[1].columns[0]})", children=[self._plan(semi[1])])
+                filters.append(f"{semi[0]} IN ({label})")
+            elif isinstance(w, Exists):
+                node = PlanNode(label, children=[self._plan(w.query)])
+                filters.append(f"EXISTS ({label})")
             else:
-                # full scan + filter
-                for r in left.scan():
-                    if stmt.where:
-                        # support table.column or column
-                        col = stmt.where.column.split('.')[-1]
-                        if r.get(col) == stmt.where.value:
-                            rows.append(r)
-                    else:
-                        rows.append(r)
-        # projection
-        if stmt.columns == ['*'] or stmt.columns == ['*']:
-            return rows
-        out = []
-        for r in rows:
-            rec = {}
-            for c in stmt.columns:
-                c = c.strip()
-                if c == '*':
-                    rec.update(r)
+                node = PlanNode(label, children=[self._plan(w.value)])
+                filters.append(f"{w.column} IN ({label})")
+            # the subquery's own operators are not measured under ANALYZE
+            inner = list(node.children)
+            while inner:
+                n = inner.pop()
+                n.role = None
+                inner.extend(n.children)
+            node.role = label.lower()
+            subplans.append(node)
+        return dataclasses.replace(stmt, where=And(terms) if terms else None), subplans, filters
+
+    def _plan_statement(self, stmt) -> PlanNode:
+        t = None if system.is_system(stmt.table) else self._open(stmt.table)
+        if isinstance(stmt, (Update, Delete)):
+            node = PlanNode(type(stmt).__name__, f"on {t.name}", role="write",
+                            children=[self._plan_access(t, stmt.where)])
+            if isinstance(stmt, Update):
+                node.info.append("Set: " + ", ".join(f"{c} = {literal(v)}" for c, v in stmt.changes.items()))
+            return node
+        if system.is_system(stmt.table):
+            node = PlanNode("System Table Scan", f"on {stmt.table.lower()}", role="access")
+            if stmt.where is not None:
+                node.info.append("Filter: " + describe_terms(conjuncts(stmt.where)))
+        elif stmt.join:
+            right = self._open(stmt.join.right_table)
+            left_where, right_where = self._join_where(stmt)
+            outer = self._plan_access(t, left_where)
+            rname, rcol, lcol = right.name, stmt.join.right_col, stmt.join.left_col
+            method, rindex = self._join_method(right, rcol)
+            if method == "hash":
+                inner = PlanNode("Hash", f"on {rname}.{rcol}", role="hash",
+                                 children=[PlanNode("Seq Scan", f"on {rname}", est_rows=len(right))])
+                node = PlanNode("Hash Join", role="join", children=[outer, inner])
+            else:
+                if method == "pk":
+                    inner = PlanNode("Primary Key Lookup", f"on {rname}", role="inner")
                 else:
-                    # allow table.column
-                    key = c.split('.')[-1]
-                    rec[c] = r.get(key)
-            out.append(rec)
-        return out
+                    inner = PlanNode("Index Lookup", f"on {rname} using {rindex}", role="inner")
+                inner.info.append(f"Key: {rcol} = {t.name}.{lcol}")
+                # probes run inside the join loop; their time is part of the join's
+                inner.contained = True
+                node = PlanNode("Nested Loop", role="join", children=[outer, inner])
+            node.info.append(f"Join: {t.name}.{lcol} = {rname}.{rcol}")
+            right_terms = self._coerce_terms(right, right_where)
+            if right_terms is None:
+                node.info.append("One-Time Filter: false (a literal cannot match its column type)")
+            elif right_terms:
+                node.info.append("Join Filter: " + describe_terms(
+                    Where(f"{rname}.{w.column}", w.value, w.op) for w in right_terms))
+        else:
+            terms = self._coerce_terms(t, stmt.where)
+            covering = self._covering_index(t, stmt, terms)
+            if covering is not None:
+                name, keys = covering
+                idx = t.indexes[name]
+                node = PlanNode("Index Only Scan", f"on {t.name} using {name}",
+                                est_rows=sum(len(idx.lookup_prefix(v)) for v in keys), role="access")
+                if len(keys) > 1:
+                    node.info.append(f"Multi-Get: {len(keys)} keys")
+                self._describe_filter(node, terms, idx.columns[:len(keys[0])])
+            else:
+                node = self._plan_access(t, stmt.where)
+        if stmt.group_by or stmt.aggregates:
+            node = PlanNode("Aggregate", ", ".join(a.expr for a in stmt.aggregates), role="aggregate", children=[node])
+            if stmt.group_by:
+                node.info.append("Group Key: " + ", ".join(stmt.group_by))
+        elif stmt.columns != ['*']:
+            node = PlanNode("Project", ", ".join(c.strip() for c in stmt.columns), role="project", children=[node])
+        return node
+
+    def _exec_explain(self, stmt: Explain):
+        """Return the operator tree of a statement as "QUERY PLAN" rows.
+
+        EXPLAIN ANALYZE also runs the statement (including UPDATE and DELETE)
+        and reports actual rows and time per operator.
+        """
+        prof = metrics.current()
+        root = self._plan(stmt.statement)
+        if not stmt.analyze:
+            return [{"QUERY PLAN": line} for line in root.render()]
+        # the inner statement is run directly, so it needs the top-level guard
+        self._check_not_view(stmt.statement)
+        prof.actuals = {}
+        start = time.perf_counter()
+        self._run(stmt.statement)
+        elapsed = time.perf_counter() - start
+        root.annotate(prof.actuals)
+        lines = root.render()
+        lines.append(f"Parse Time: {prof.phases.get('parse', 0.0) * 1000:.3f} ms")
+        lines.append(f"Execution Time: {elapsed * 1000:.3f} ms")
+        lines.append(f"Rows Scanned: {prof.rows_scanned}")
+        if prof.blocks_scanned or prof.blocks_skipped:
+            lines.append(f"Zone Maps: {prof.blocks_scanned} blocks read, {prof.blocks_skipped} skipped")
+        if prof.bytes_read or prof.bytes_written:
+            lines.append(f"I/O: {prof.bytes_read} bytes read, {prof.bytes_written} bytes written"
+                         f" in {prof.files_written} files")
+        if prof.spill_files:
+            lines.append(f"Spilled: {prof.spilled_bytes} bytes in {prof.spill_files} temp files")
+        return [{"QUERY PLAN": line} for line in lines]
@@ -1,51 +1,245 @@
 import json
 import os
-from typing import Any, Dict, Set
+from bisect import bisect_left
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
-from .exceptions import IndexErrorRDB
+from . import codec, metrics
+from .exceptions import ConstraintViolation, IndexErrorRDB
+
+
+def encode_key(values: Sequence[Any]) -> str:
+    """Encode a tuple of column values as a composite primary key string.
+
+    Keys are JSON lists, so the encoding of a leading prefix of the values is
+    also a string prefix of the full key (see `prefix_of`).
+    """
+    return json.dumps(list(values), sort_keys=True)
+
+
+def prefix_of(values: Sequence[Any]) -> str:
+    """Return the string every composite key starting with `values` begins with."""
+    if not values:
+        return "["
+    return encode_key(values)[:-1] + ", "
+
+
+def scan_prefix(sorted_keys: List[str], prefix: str) -> Iterable[str]:
+    """Yield keys of `sorted_keys` starting with `prefix` using a binary search."""
+    i = bisect_left(sorted_keys, prefix)
+    while i < len(sorted_keys) and sorted_keys[i].startswith(prefix):
+        yield sorted_keys[i]
+        i += 1
 
 
 class Index:
-    """Simple hash-based index persisted as JSON: value->list of primary keys."""
+    """Simple hash-based index persisted as JSON: value->list of primary keys.
+
+    An index covers one or more columns. In memory, single-column indexes key
+    on the column value and multi-column indexes on the tuple of values, which
+    lets `lookup_prefix` answer lookups on a leading subset of the columns from
+    a sorted view of the keys. On disk keys are JSON-encoded values (lists for
+    multi-column indexes).
+
+    `include` names extra columns whose values are stored per primary key so
+    that queries touching only indexed and included columns can be answered
+    without reading the row (a covering index).
+    """
 
-    def __init__(self, path: str, column: str):
+    def __init__(self, path: str, columns: Union[str, List[str]], unique: bool = False,
+                 include: Optional[List[str]] = None, load: bool = True):
         self.path = path
-        self.column = column
-        self._map: Dict[str, Set[str]] = {}
+        self.columns: List[str] = [columns] if isinstance(columns, str) else list(columns)
+        self.column = self.columns[0]
+        self.unique = unique
+        self.include: List[str] = list(include or [])
+        self._map: Dict[Hashable, Set[str]] = {}
+        self._payload: Dict[str, List[Any]] = {}
+        self._sorted: Optional[List[Hashable]] = None
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        self._load()
+        if load:
+            self._load()
+
+    @property
+    def composite(self) -> bool:
+        return len(self.columns) > 1
 
     def _load(self):
         if not os.path.exists(self.path):
             self._map = {}
             return
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            self._map = {k: set(v) for k, v in raw.items()}
+            with open(self.path, "rb") as f:
+                data = f.read()
+            metrics.record_read(len(data))
+            raw = codec.loads(data)
+            # covering indexes are stored as {"map": ..., "include": ...}; map keys
+            # are JSON-encoded so a plain index can never contain the key "map"
+            if isinstance(raw.get("map"), dict):
+                self._payload = raw.get("include", {})
+                raw = raw["map"]
+            if self.composite:
+                self._map = {tuple(codec.loads(k)): set(v) for k, v in raw.items()}
+            else:
+                self._map = {codec.loads(k): set(v) for k, v in raw.items()}
         except Exception as e:
             raise IndexErrorRDB(f"Failed to load index {self.path}: {e}")
 
     def _persist(self):
-        # write as value -> list
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump({k: list(v) for k, v in self._map.items()}, f, indent=2)
+        # write as value -> list; keys use stdlib json so files stay byte-stable
+        # across codec backends
+        if self.composite:
+            data: Dict[str, Any] = {json.dumps(list(k)): list(v) for k, v in self._map.items()}
+        else:
+            data = {json.dumps(k): list(v) for k, v in self._map.items()}
+        if self.include:
+            data = {"map": data, "include": self._payload}
+        # write-then-rename so readers never see a half-written index
+        payload = codec.dumpb(data)
+        with open(self.path + ".tmp", "wb") as f:
+            f.write(payload)
+        metrics.record_write(len(payload))
+        os.replace(self.path + ".tmp", self.path)
+
+    def flush(self):
+        """Persist changes made with `persist=False`."""
+        self._persist()
+
+    def state(self) -> Dict[str, Any]:
+        """Return the in-memory index structures, for `rdbms.snapshot`."""
+        return {"columns": self.columns, "unique": self.unique, "include": self.include,
+                "map": self._map, "payload": self._payload}
+
+    def restore(self, state: Dict[str, Any]):
+        """Adopt structures returned by `state` instead of loading the index file."""
+        self._map = state["map"]
+        self._payload = state["payload"]
+        self._sorted = None
+
+    def key(self, value: Any) -> Hashable:
+        """Return the map key for `value` (a sequence of values for composite indexes)."""
+        if self.composite:
+            return tuple(value)
+        return value
+
+    def key_for_row(self, row: Dict[str, Any]) -> Optional[Hashable]:
+        """Return the key for `row`, or None if any indexed column is NULL."""
+        if not self.composite:
+            return row.get(self.column)
+        vals = tuple(row.get(c) for c in self.columns)
+        if None in vals:
+            return None
+        return vals
+
+    def build(self, rows: Iterable[Tuple[str, Dict[str, Any]]], persist: bool = True):
+        """Rebuild the index from (pk, row) pairs in a single pass, persisting once.
+
+        Raises ConstraintViolation if the index is unique and two rows share a key.
+        """
+        self._map = {}
+        self._payload = {}
+        self._sorted = None
+        for pk, row in rows:
+            key = self.key_for_row(row)
+            if key is None:
+                continue
+            if self.unique and key in self._map:
+                raise ConstraintViolation(f"Cannot build unique index on {self.columns}: duplicate key {key}")
+            self._add_key(key, pk)
+            if self.include:
+                self._payload[str(pk)] = [row.get(c) for c in self.include]
+        if persist:
+            self._persist()
 
     def add(self, value: Any, pk: str):
-        key = json.dumps(value, sort_keys=True)
+        self._add_key(self.key(value), pk)
+        self._persist()
+
+    def remove(self, value: Any, pk: str):
+        if self._remove_key(self.key(value), pk):
+            self._persist()
+
+    def add_row(self, row: Dict[str, Any], pk: str, persist: bool = True):
+        key = self.key_for_row(row)
+        if key is not None:
+            self._add_key(key, pk)
+            if self.include:
+                self._payload[str(pk)] = [row.get(c) for c in self.include]
+            if persist:
+                self._persist()
+
+    def remove_row(self, row: Dict[str, Any], pk: str, persist: bool = True):
+        key = self.key_for_row(row)
+        if key is not None and self._remove_key(key, pk):
+            self._payload.pop(str(pk), None)
+            if persist:
+                self._persist()
+
+    def _add_key(self, key: Hashable, pk: str):
         if key not in self._map:
             self._map[key] = set()
+            self._sorted = None
         self._map[key].add(str(pk))
-        self._persist()
 
-    def remove(self, value: Any, pk: str):
-        key = json.dumps(value, sort_keys=True)
+    def _remove_key(self, key: Hashable, pk: str) -> bool:
         if key in self._map and str(pk) in self._map[key]:
             self._map[key].remove(str(pk))
             if not self._map[key]:
                 del self._map[key]
-            self._persist()
+                self._sorted = None
+            return True
+        return False
 
     def lookup(self, value: Any) -> Set[str]:
-        key = json.dumps(value, sort_keys=True)
+        key = self.key(value)
         return set(self._map.get(key, set()))
+
+    def lookup_key(self, key: Hashable) -> Set[str]:
+        """Return primary keys stored under a key produced by `key`/`key_for_row`."""
+        return set(self._map.get(key, set()))
+
+    def lookup_prefix(self, values: Sequence[Any]) -> Set[str]:
+        """Return primary keys whose leading indexed columns equal `values`."""
+        out: Set[str] = set()
+        for _, pks in self.lookup_entries(values):
+            out |= pks
+        return out
+
+    def lookup_entries(self, values: Sequence[Any]) -> Iterable[Tuple[Hashable, Set[str]]]:
+        """Yield (key, primary keys) for keys whose leading columns equal `values`."""
+        # yield copies: the sets may be mutated by a writer while callers iterate
+        if not self.composite or len(values) == len(self.columns):
+            key = self.key(values if self.composite else values[0])
+            pks = self._map.get(key)
+            if pks:
+                yield key, set(pks)
+            return
+        prefix = tuple(values)
+        n = len(prefix)
+        sorted_keys = self._sorted
+        if sorted_keys is None:
+            try:
+                sorted_keys = self._sorted = sorted(self._map)
+            except TypeError:
+                # mixed value types in a column (legacy data): fall back to a scan
+                keys = [k for k in list(self._map) if k[:n] == prefix]
+                sorted_keys = None
+        if sorted_keys is not None:
+            keys = []
+            i = bisect_left(sorted_keys, prefix)
+            while i < len(sorted_keys) and sorted_keys[i][:n] == prefix:
+                keys.append(sorted_keys[i])
+                i += 1
+        for k in keys:
+            pks = self._map.get(k)
+            if pks:
+                yield k, set(pks)
+
+    def decode(self, key: Hashable) -> Dict[str, Any]:
+        """Return the indexed column values of `key`."""
+        if self.composite:
+            return dict(zip(self.columns, key))
+        return {self.column: key}
+
+    def included(self, pk: str) -> Dict[str, Any]:
+        """Return the INCLUDE column values stored for `pk`."""
+        return dict(zip(self.include, self._payload.get(str(pk), [])))
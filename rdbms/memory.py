@@ -0,0 +1,264 @@
+"""Memory budget for query operators, with spill-to-disk.
+
+`Executor(memory_budget=64 * 1024 * 1024)` shares one `MemoryBudget` among
+all statements. Operators that build state proportional to their input
+take a `Grant` from it and ask for more memory as they grow:
+
+- the hash join build side (key -> row keys of the right table),
+- join output and projected rows (`RowBuffer`),
+- GROUP BY state (one entry per group),
+- the result handed back to the caller (`RowBuffer`).
+
+When `Grant.grow` is refused the operator switches to a bounded plan
+instead of failing: a hash join partitions both inputs into temp files and
+joins one partition at a time, an aggregate keeps the groups it already
+holds and partitions the rows of new groups, and a row buffer writes later
+rows to a temp file. A SELECT whose result spilled returns its `RowBuffer`,
+a read-only sequence that streams the spilled rows back from disk.
+
+Sizes are estimates (`cache.estimate_size`), so the budget bounds the
+engine's working memory rather than the process size; table rows held by
+`Table` are not counted. With no budget (the default) grants never refuse
+and nothing is estimated.
+"""
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from . import metrics
+from .cache import estimate_size
+
+# rows written to a spill file per pickle frame
+SPILL_BATCH = 1000
+
+
+class MemoryBudget:
+    """Thread-safe accountant of the bytes held by running operators."""
+
+    def __init__(self, limit_bytes: int, spill_dir: Optional[str] = None):
+        self.limit = limit_bytes
+        self.spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.used = 0
+        self.peak = 0
+        # reservations refused, i.e. operators that switched to spilling
+        self.refusals = 0
+        self.spill_files = 0
+        self.spilled_bytes = 0
+
+    def reserve(self, nbytes: int) -> bool:
+        """Take `nbytes` from the budget; False (and nothing taken) if it would overflow."""
+        with self._lock:
+            if self.used + nbytes > self.limit:
+                self.refusals += 1
+                return False
+            self.used += nbytes
+            if self.used > self.peak:
+                self.peak = self.used
+            return True
+
+    def release(self, nbytes: int):
+        with self._lock:
+            self.used -= nbytes
+
+    def _spilled(self, nbytes: int, files: int = 0):
+        with self._lock:
+            self.spilled_bytes += nbytes
+            self.spill_files += files
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit_bytes": self.limit,
+            "used_bytes": self.used,
+            "peak_bytes": self.peak,
+            "refusals": self.refusals,
+            "spill_files": self.spill_files,
+            "spilled_bytes": self.spilled_bytes,
+        }
+
+
+class Grant:
+    """Memory held by one operator, returned to the budget by `close`.
+
+    A grant without a budget is unlimited: `grow` always succeeds and
+    `limited` tells callers they need not estimate sizes at all.
+    """
+
+    def __init__(self, budget: Optional[MemoryBudget], name: str):
+        self.budget = budget
+        self.name = name
+        self.bytes = 0
+
+    @property
+    def limited(self) -> bool:
+        return self.budget is not None
+
+    def grow(self, nbytes: int) -> bool:
+        """Account `nbytes` more to this operator; False if the budget is exhausted."""
+        if self.budget is None:
+            return True
+        if not self.budget.reserve(nbytes):
+            return False
+        self.bytes += nbytes
+        return True
+
+    def close(self):
+        if self.budget is not None and self.bytes:
+            self.budget.release(self.bytes)
+        self.bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def entry_size(key: Any) -> int:
+    """Estimated bytes of one hash-table entry: the key plus a list slot."""
+    return sys.getsizeof(key) + 8
+
+
+class SpillFile:
+    """Records appended to an anonymous temp file and read back in order.
+
+    Records are pickled in batches of SPILL_BATCH, so any row values
+    round-trip exactly. The file is deleted when closed or collected.
+    """
+
+    def __init__(self, budget: Optional[MemoryBudget]):
+        # imported on first spill: tempfile and pickle cost startup time
+        import tempfile
+
+        self.budget = budget
+        self._file = tempfile.TemporaryFile(dir=budget.spill_dir if budget is not None else None)
+        self._pending: List[Any] = []
+        self.count = 0
+        self.bytes = 0
+        if budget is not None:
+            budget._spilled(0, files=1)
+        metrics.current().spill_files += 1
+
+    def append(self, record: Any):
+        self._pending.append(record)
+        self.count += 1
+        if len(self._pending) >= SPILL_BATCH:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        import pickle
+
+        data = pickle.dumps(self._pending, pickle.HIGHEST_PROTOCOL)
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self._pending = []
+        self.bytes += len(data)
+        if self.budget is not None:
+            self.budget._spilled(len(data))
+        metrics.current().spilled_bytes += len(data)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Any]:
+        import pickle
+
+        self._flush()
+        f = self._file
+        pos = 0
+        while pos < self.bytes:
+            # re-seek each batch so concurrent iterators do not disturb each other
+            f.seek(pos)
+            batch = pickle.load(f)
+            pos = f.tell()
+            yield from batch
+
+    def close(self):
+        self._pending = []
+        self._file.close()
+
+
+class RowBuffer(Sequence):
+    """Rows kept in memory while the grant allows, later rows spilled to disk.
+
+    Iteration yields the in-memory rows followed by the spilled ones, in
+    the order they were appended.
+    """
+
+    def __init__(self, grant: Grant):
+        self.grant = grant
+        self.rows: List[Dict[str, Any]] = []
+        self.spill: Optional[SpillFile] = None
+        if not grant.limited:
+            # nothing to account: append straight to the list
+            self.append = self.rows.append
+
+    @property
+    def spilled(self) -> bool:
+        return self.spill is not None
+
+    def append(self, row: Dict[str, Any]):
+        if self.spill is None:
+            if self.grant.grow(estimate_size(row)):
+                self.rows.append(row)
+                return
+            self.spill = SpillFile(self.grant.budget)
+        self.spill.append(row)
+
+    def extend(self, rows):
+        for r in rows:
+            self.append(r)
+
+    def result(self) -> Sequence[Dict[str, Any]]:
+        """Hand the rows to the caller: the plain list unless some were spilled.
+
+        The caller owns the in-memory rows from here on, so their memory is
+        no longer counted against the budget.
+        """
+        self.grant.close()
+        return self if self.spill is not None else self.rows
+
+    def close(self):
+        self.grant.close()
+        self.rows = []
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+    def __len__(self) -> int:
+        return len(self.rows) + (len(self.spill) if self.spill is not None else 0)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        yield from self.rows
+        if self.spill is not None:
+            yield from self.spill
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("row index out of range")
+        if i < len(self.rows):
+            return self.rows[i]
+        i -= len(self.rows)
+        for j, r in enumerate(self.spill):
+            if j == i:
+                return r
+        raise IndexError("row index out of range")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, RowBuffer)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RowBuffer({len(self)} rows, {len(self.spill) if self.spill else 0} spilled)"
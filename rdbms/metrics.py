@@ -0,0 +1,338 @@
+"""Per-statement profiling and a small metrics registry.
+
+`Executor.execute` runs every statement under a `Profile` that collects
+per-phase timings (parse, load, lookup, scan, join, write, project), rows
+scanned vs. returned, bytes read/written, files written and a short
+description of the access path chosen for each table. Storage code reports
+I/O through `record_read`/`record_write`, which attribute it to the profile
+active on the calling thread (if any).
+
+Finished profiles are folded into a `Registry` of counters and histograms,
+which `Registry.render` exports in the Prometheus text format:
+
+    # TYPE rdbms_statements_total counter
+    rdbms_statements_total{type="select"} 42
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# seconds; covers sub-millisecond point lookups up to multi-second rewrites
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Local(threading.local):
+    profile: Optional["Profile"] = None
+
+
+_local = _Local()
+
+
+class _Phase:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: "Profile", name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        phases = self.profile.phases
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class Profile:
+    """Measurements for one statement."""
+
+    def __init__(self, sql: str = "", params: Optional[Sequence[Any]] = None):
+        self.sql = sql
+        self.params = params
+        self.kind = "unknown"
+        self.phases: Dict[str, float] = {}
+        self.plan: List[str] = []
+        self.rows_scanned = 0
+        self.rows_returned = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files_written = 0
+        # zone-map blocks read vs. skipped by full scans
+        self.blocks_scanned = 0
+        self.blocks_skipped = 0
+        # operator state written to temp files under a memory budget (see `rdbms.memory`)
+        self.spilled_bytes = 0
+        self.spill_files = 0
+        # memory grants taken by operators, released when the statement finishes
+        self.grants: List[Any] = []
+        # per-operator [rows, seconds, loops], recorded only for EXPLAIN ANALYZE
+        self.actuals: Optional[Dict[str, List[Any]]] = None
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self.seconds = 0.0
+
+    def phase(self, name: str) -> _Phase:
+        """Context manager adding the time spent in its body to phase `name`."""
+        return _Phase(self, name)
+
+    @property
+    def started(self) -> float:
+        """Wall-clock start time (seconds since the epoch)."""
+        return time.time() - (time.perf_counter() - self._start)
+
+    def finish(self, result: Any = None):
+        self.seconds = time.perf_counter() - self._start
+        if isinstance(result, Sequence) and not isinstance(result, str):
+            # a list, or a RowBuffer of a SELECT that spilled
+            self.rows_returned = len(result)
+        elif isinstance(result, dict):
+            self.rows_returned = next((v for k, v in result.items()
+                                       if k in ("inserted", "updated", "deleted", "exported") and isinstance(v, int)), 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "type": self.kind,
+            "started": self.started,
+            "ms": self.seconds * 1000,
+            "phases_ms": {k: v * 1000 for k, v in self.phases.items()},
+            "plan": list(self.plan),
+            "rows_scanned": self.rows_scanned,
+            "rows_returned": self.rows_returned,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "files_written": self.files_written,
+            "blocks_scanned": self.blocks_scanned,
+            "blocks_skipped": self.blocks_skipped,
+            "spilled_bytes": self.spilled_bytes,
+            "spill_files": self.spill_files,
+            "error": self.error,
+        }
+
+
+def activate(profile: Profile) -> Optional[Profile]:
+    """Make `profile` current on this thread; returns the one it replaces."""
+    prev = _local.profile
+    _local.profile = profile
+    return prev
+
+
+def deactivate(prev: Optional[Profile]):
+    _local.profile = prev
+
+
+def current() -> Profile:
+    """Return the active profile, or a throwaway one outside `Executor.execute`."""
+    p = _local.profile
+    return p if p is not None else Profile()
+
+
+def record_read(nbytes: int):
+    p = _local.profile
+    if p is not None:
+        p.bytes_read += nbytes
+
+
+def record_write(nbytes: int, files: int = 1):
+    p = _local.profile
+    if p is not None:
+        p.bytes_written += nbytes
+        p.files_written += files
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _escape(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        # unlabelled counters export 0 before their first increment
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labels else {(): 0}
+
+    def inc(self, amount: float = 1, *labels: str):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, _labels(self.labels, k), v) for k, v in sorted(self._values.items())]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {",".join(k): v for k, v in self._values.items()}
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values, optionally labelled."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts, sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str):
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        s[0][bisect_left(self.buckets, value)] += 1
+        s[1] += value
+        s[2] += 1
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        out = []
+        for key, (counts, total, n) in sorted(self._series.items()):
+            running = 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                out.append((self.name + "_bucket", _labels(self.labels + ("le",), key + (_number(bound),)), running))
+            out.append((self.name + "_sum", _labels(self.labels, key), total))
+            out.append((self.name + "_count", _labels(self.labels, key), n))
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {",".join(k): {"count": n, "sum": total} for k, (_, total, n) in self._series.items()}
+
+
+class Registry:
+    """Named counters and histograms with a Prometheus text exporter."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets)
+
+    def _get(self, cls, name, help, labels, *args):
+        m = self._metrics.get(name)
+        if m is None:
+            m = self._metrics[name] = cls(name, help, labels, *args)
+        elif not isinstance(m, cls):
+            raise ValueError(f"Metric '{name}' is already registered as a {m.kind}")
+        return m
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for m in self._metrics.values():
+                lines.append(f"# HELP {m.name} {m.help}")
+                lines.append(f"# TYPE {m.name} {m.kind}")
+                for name, labels, value in m.samples():
+                    lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: m.snapshot() for name, m in self._metrics.items()}
+
+
+class StatementMetrics:
+    """The executor's registry, fed one finished `Profile` at a time."""
+
+    def __init__(self, registry: Optional[Registry] = None):
+        self.registry = registry or Registry()
+        r = self.registry
+        self.statements = r.counter("rdbms_statements_total", "Statements executed.", ["type"])
+        self.errors = r.counter("rdbms_statement_errors_total", "Statements that raised an error.", ["type"])
+        self.latency = r.histogram("rdbms_statement_seconds", "Statement latency in seconds.", ["type"])
+        self.phases = r.histogram("rdbms_phase_seconds", "Time spent per execution phase in seconds.", ["phase"])
+        self.scanned = r.counter("rdbms_rows_scanned_total", "Rows examined by statements.")
+        self.returned = r.counter("rdbms_rows_returned_total", "Rows returned or affected by statements.")
+        self.read = r.counter("rdbms_bytes_read_total", "Bytes read from table files.")
+        self.written = r.counter("rdbms_bytes_written_total", "Bytes written to table files.")
+        self.files = r.counter("rdbms_files_written_total", "Table, index and segment files written.")
+        self.slow = r.counter("rdbms_slow_queries_total", "Statements slower than the slow-query threshold.")
+        self.spilled = r.counter("rdbms_spilled_bytes_total", "Bytes of operator state spilled to temp files.")
+
+    def observe(self, p: Profile, slow: bool = False):
+        with self.registry._lock:
+            self.statements.inc(1, p.kind)
+            if slow:
+                self.slow.inc()
+            if p.error is not None:
+                self.errors.inc(1, p.kind)
+            self.latency.observe(p.seconds, p.kind)
+            for name, seconds in p.phases.items():
+                self.phases.observe(seconds, name)
+            self.scanned.inc(p.rows_scanned)
+            self.returned.inc(p.rows_returned)
+            if p.bytes_read:
+                self.read.inc(p.bytes_read)
+            if p.files_written:
+                self.written.inc(p.bytes_written)
+                self.files.inc(p.files_written)
+            if p.spilled_bytes:
+                self.spilled.inc(p.spilled_bytes)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class SlowQueryLog:
+    """Keeps the most recent statements slower than `threshold_ms`, with
+    their plans, and optionally appends them as JSON lines to `path`."""
+
+    # longer statements (e.g. bulk INSERTs) are truncated in the log
+    MAX_SQL = 2000
+    MAX_PARAMS = 100
+
+    def __init__(self, threshold_ms: float, path: Optional[str] = None, keep: int = 100):
+        from collections import deque
+
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self.entries = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def record(self, p: Profile) -> bool:
+        """Log `p` if it exceeded the threshold; returns whether it did."""
+        if p.seconds * 1000 < self.threshold_ms:
+            return False
+        entry = p.as_dict()
+        if len(p.sql) > self.MAX_SQL:
+            entry["sql"] = p.sql[:self.MAX_SQL] + "..."
+        if p.params is not None:
+            # execute_many passes one parameter list per row; keep the log bounded
+            entry["params"] = [v if isinstance(v, (int, float, str, bool)) or v is None else str(v)[:200]
+                               for v in list(p.params)[:self.MAX_PARAMS]]
+        with self._lock:
+            self.entries.append(entry)
+            if self.path:
+                from . import codec
+
+                with open(self.path, "ab") as f:
+                    f.write(codec.dumpb(entry) + b"\n")
+        return True
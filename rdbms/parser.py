@@ -1,6 +1,8 @@
+import dataclasses
+import functools
 import re
-from dataclasses import dataclass
-from typing import List, Optional, Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 
 @dataclass
@@ -8,6 +10,10 @@ class CreateTable:
     name: str
     columns: List[dict]
     constraints: dict
+    # explicit index definitions: {"columns": [...], "unique": bool, "include": [...]}
+    indexes: List[dict] = field(default_factory=list)
+    # storage options from WITH (...), e.g. {"format": "segmented", "compression": "lzma"}
+    options: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -17,10 +23,75 @@ class Insert:
     values: Any
 
 
+@dataclass
+class Param:
+    # positional `?` placeholder, bound by `bind_params`
+    index: int
+
+
+def bind_params(node, params):
+    """Return a copy of a parsed statement with `Param` placeholders replaced by `params`."""
+    if isinstance(node, Param):
+        if node.index >= len(params):
+            raise ValueError(f"Missing value for parameter {node.index + 1}")
+        return params[node.index]
+    if dataclasses.is_dataclass(node) and not isinstance(node, type):
+        return dataclasses.replace(node, **{f.name: bind_params(getattr(node, f.name), params)
+                                            for f in dataclasses.fields(node)})
+    if isinstance(node, list):
+        return [bind_params(v, params) for v in node]
+    if isinstance(node, dict):
+        return {k: bind_params(v, params) for k, v in node.items()}
+    return node
+
+
+@functools.lru_cache(maxsize=None)
+def _rx(pattern: str, flags: int = 0) -> "re.Pattern":
+    """Compile `pattern` on first use, so importing the parser compiles nothing."""
+    return re.compile(pattern, flags)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside string literals and drop a trailing ';'."""
+    parts = re.split(r"('(?:[^']|'')*')", sql.strip().rstrip(";").strip())
+    return "".join(p if i % 2 else re.sub(r"\s+", " ", p) for i, p in enumerate(parts))
+
+
 @dataclass
 class Where:
     column: str
+    # a literal; for IN a list of literals or a one-column `Select` subquery
     value: Any
+    # comparison operator: =, !=, <, <=, >, >= or IN
+    op: str = "="
+
+
+@dataclass
+class ColumnRef:
+    # an unquoted table.column on the right of a predicate, e.g. the
+    # correlation `orders.user_id = users.id` inside EXISTS (SELECT ...)
+    name: str
+
+
+@dataclass
+class Exists:
+    # EXISTS (SELECT ...); correlated through one `col = outer.col` term
+    query: "Select"
+
+
+@dataclass
+class And:
+    # conjunction of simple predicates: a = 1 AND b >= 2
+    terms: List[Union[Where, Exists]]
+
+
+def conjuncts(where) -> List[Where]:
+    """Flatten a WHERE clause (None, Where or And) into a list of predicates."""
+    if where is None:
+        return []
+    if isinstance(where, And):
+        return list(where.terms)
+    return [where]
 
 
 @dataclass
@@ -30,25 +101,39 @@ class Join:
     right_col: str
 
 
+@dataclass
+class Aggregate:
+    # COUNT(*) | COUNT(col) | SUM(col) | MIN(col) | MAX(col) [AS alias]
+    func: str
+    # None for COUNT(*)
+    column: Optional[str]
+    # output column name: the alias, else count / sum_col / min_col / max_col
+    alias: str
+    # the select-list item as written, e.g. "SUM(o.total) AS spent"
+    expr: str
+
+
 @dataclass
 class Select:
     columns: List[str]
     table: str
-    where: Optional[Where] = None
+    where: Optional[Union[Where, And]] = None
     join: Optional[Join] = None
+    group_by: List[str] = field(default_factory=list)
+    aggregates: List[Aggregate] = field(default_factory=list)
 
 
 @dataclass
 class Update:
     table: str
     changes: Dict[str, Any]
-    where: Optional[Where] = None
+    where: Optional[Union[Where, And]] = None
 
 
 @dataclass
 class Delete:
     table: str
-    where: Optional[Where] = None
+    where: Optional[Union[Where, And]] = None
 
 
 @dataclass
@@ -56,6 +141,72 @@ class DropTable:
     name: str
 
 
+@dataclass
+class CreateIndex:
+    name: str
+    table: str
+    columns: List[str]
+    unique: bool = False
+    include: List[str] = field(default_factory=list)
+    # CREATE INDEX CONCURRENTLY: build in the background without blocking writes
+    concurrently: bool = False
+
+
+@dataclass
+class DropIndex:
+    name: str
+    # optional: DROP INDEX name ON table; otherwise the catalog is searched
+    table: Optional[str] = None
+
+
+@dataclass
+class Reindex:
+    # REINDEX [TABLE] t rebuilds every index of t; REINDEX INDEX name [ON t] one index
+    table: Optional[str] = None
+    index: Optional[str] = None
+
+
+@dataclass
+class Checkpoint:
+    # CHECKPOINT [t] compacts t (or every table) and writes its snapshot
+    table: Optional[str] = None
+
+
+@dataclass
+class Explain:
+    # EXPLAIN [ANALYZE] <SELECT | UPDATE | DELETE>; ANALYZE runs the statement
+    statement: Any
+    analyze: bool = False
+
+
+@dataclass
+class Copy:
+    # COPY t [(cols)] FROM | TO 'file' [WITH (format = csv | jsonl, header = true | false, delimiter = ',')]
+    table: str
+    path: Any
+    direction: str
+    columns: Optional[List[str]] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Backup:
+    # BACKUP TO 'dir': full the first time, then incremental (see rdbms.backup)
+    path: Any
+
+
+@dataclass
+class CreateMaterializedView:
+    name: str
+    # the defining SELECT, kept as text in the view's schema.json
+    query: str
+
+
+@dataclass
+class RefreshMaterializedView:
+    name: str
+
+
 @dataclass
 class RenameTable:
     old_name: str
@@ -67,17 +218,41 @@ class Parser:
 
     Supported examples:
     - CREATE TABLE users (id INT, name TEXT, PRIMARY KEY (id), UNIQUE (email))
+    - CREATE TABLE cart (user_id INT, item_id INT, PRIMARY KEY (user_id, item_id))
+    - CREATE TABLE users (id INT, email TEXT, name TEXT, PRIMARY KEY (id), UNIQUE (email) INCLUDE (name))
+    - CREATE TABLE events (id INT, ts TIMESTAMP, PRIMARY KEY (id)) WITH (format = segmented, compression = zlib)
     - INSERT INTO users (id, name) VALUES (1, 'alice')
     - SELECT id, name FROM users WHERE id = 1
+    - SELECT * FROM cart WHERE user_id = 1 AND item_id = 2
+    - SELECT * FROM events WHERE ts >= '2024-05-01T10:00:00' AND kind != 'debug'
+    - SELECT * FROM events WHERE ts BETWEEN '2024-05-01' AND '2024-05-02'
     - SELECT * FROM a INNER JOIN b ON a.x = b.y WHERE a.x = 5
+    - SELECT * FROM users WHERE id IN (1, 2, 3)
+    - SELECT * FROM users WHERE id IN (SELECT user_id FROM orders WHERE total > 100)
+    - SELECT * FROM users WHERE EXISTS (SELECT * FROM orders WHERE orders.user_id = users.id)
+    - SELECT user_id, COUNT(*), SUM(total) AS spent FROM orders GROUP BY user_id
+    - CREATE MATERIALIZED VIEW spend AS SELECT user_id, SUM(total) FROM orders GROUP BY user_id
+    - REFRESH MATERIALIZED VIEW spend / DROP MATERIALIZED VIEW spend
+    - CREATE [UNIQUE] INDEX idx_orders_user ON orders (user_id) [INCLUDE (total)]
+    - DROP INDEX idx_orders_user [ON orders]
+    - CREATE INDEX CONCURRENTLY idx_orders_user ON orders (user_id)
+    - REINDEX [TABLE] orders / REINDEX INDEX idx_orders_user [ON orders]
+    - CHECKPOINT [orders]
+    - EXPLAIN [ANALYZE] SELECT * FROM orders WHERE user_id = 1
+    - COPY orders FROM 'orders.csv' / COPY orders (id, total) TO 'orders.jsonl' WITH (format = jsonl)
+    - BACKUP TO 'backups/nightly'
+
+    Literal values may be written as `?` placeholders; they parse to `Param`
+    nodes that `bind_params` fills in.
     """
 
-    _ws_re = re.compile(r"\s+")
-
     def parse(self, sql: str):
         sql = sql.strip().rstrip(";")
         if not sql:
             return None
+        return self._dispatch(self._number_placeholders(sql))
+
+    def _dispatch(self, sql: str):
         head = sql.split(None, 1)[0].upper()
         if head == "CREATE":
             return self._parse_create(sql)
@@ -93,19 +268,51 @@ class Parser:
             return self._parse_drop(sql)
         if head == "RENAME":
             return self._parse_rename(sql)
+        if head == "REINDEX":
+            return self._parse_reindex(sql)
+        if head == "CHECKPOINT":
+            return self._parse_checkpoint(sql)
+        if head == "EXPLAIN":
+            return self._parse_explain(sql)
+        if head == "COPY":
+            return self._parse_copy(sql)
+        if head == "BACKUP":
+            return self._parse_backup(sql)
+        if head == "REFRESH":
+            return self._parse_refresh(sql)
         raise ValueError(f"Unsupported statement: {head}")
 
-    def _parse_create(self, sql: str) -> CreateTable:
-        m = re.match(r"CREATE\s+TABLE\s+(\w+)\s*\((.*)\)", sql, re.I | re.S)
+    def _parse_create(self, sql: str):
+        if re.match(r"CREATE\s+(UNIQUE\s+)?INDEX\b", sql, re.I):
+            return self._parse_create_index(sql)
+        if re.match(r"CREATE\s+MATERIALIZED\s+VIEW\b", sql, re.I):
+            return self._parse_create_view(sql)
+        m = re.match(r"CREATE\s+TABLE\s+(\w+)\s*\((.*?)\)(?:\s+WITH\s*\(([^()]*)\))?\s*$", sql, re.I | re.S)
         if not m:
             raise ValueError("Invalid CREATE TABLE syntax")
         name = m.group(1)
         body = m.group(2).strip()
+        options = self._parse_options(m.group(3) or "", "table")
         parts = [p.strip() for p in self._split_commas(body)]
         cols = []
         constraints = {"primary_key": None, "unique": []}
+        indexes = []
         for p in parts:
             up = p.upper()
+            if up.startswith("INDEX") or (up.startswith("UNIQUE") and "INCLUDE" in up):
+                # INDEX (a, b) [INCLUDE (c, d)] / UNIQUE (a) INCLUDE (c)
+                mi = re.match(r"(UNIQUE|INDEX)\s*\(([^)]+)\)(?:\s+INCLUDE\s*\(([^)]+)\))?\s*$", p, re.I)
+                if not mi:
+                    raise ValueError(f"Invalid index definition: {p}")
+                idx_cols = [c.strip() for c in mi.group(2).split(",")]
+                unique = mi.group(1).upper() == "UNIQUE"
+                if unique:
+                    constraints["unique"].append(idx_cols)
+                idx = {"columns": idx_cols, "unique": unique}
+                if mi.group(3):
+                    idx["include"] = [c.strip() for c in mi.group(3).split(",")]
+                indexes.append(idx)
+                continue
             if up.startswith("PRIMARY KEY"):
                 inner = re.search(r"\(([^)]+)\)", p)
                 if inner:
@@ -148,7 +355,53 @@ class Parser:
             if default is not None:
                 col["default"] = default
             cols.append(col)
-        return CreateTable(name=name, columns=cols, constraints=constraints)
+        return CreateTable(name=name, columns=cols, constraints=constraints, indexes=indexes, options=options)
+
+    def _parse_options(self, text: str, what: str) -> Dict[str, Any]:
+        # `key = value, ...` from a WITH (...) clause; values are lowercased
+        options = {}
+        for opt in self._split_commas(text):
+            if not opt.strip():
+                continue
+            mo = re.match(r"\s*(\w+)\s*=\s*(.+?)\s*$", opt, re.S)
+            if not mo:
+                raise ValueError(f"Invalid {what} option: {opt.strip()}")
+            val = mo.group(2)
+            if val.startswith("'") and val.endswith("'"):
+                val = val[1:-1]
+                # a quoted delimiter keeps its case and spacing
+                options[mo.group(1).lower()] = val if mo.group(1).lower() == "delimiter" else val.lower()
+                continue
+            if val.isdigit():
+                val = int(val)
+            options[mo.group(1).lower()] = val.lower() if isinstance(val, str) else val
+        return options
+
+    def _parse_create_index(self, sql: str) -> CreateIndex:
+        m = re.match(r"CREATE\s+(UNIQUE\s+)?INDEX\s+(CONCURRENTLY\s+)?(\w+)\s+ON\s+(\w+)\s*\(([^)]+)\)"
+                     r"(?:\s+INCLUDE\s*\(([^)]+)\))?\s*$", sql, re.I | re.S)
+        if not m:
+            raise ValueError("Invalid CREATE INDEX syntax")
+        include = [c.strip() for c in m.group(6).split(",")] if m.group(6) else []
+        return CreateIndex(name=m.group(3), table=m.group(4), columns=[c.strip() for c in m.group(5).split(",")],
+                           unique=bool(m.group(1)), include=include, concurrently=bool(m.group(2)))
+
+    def _parse_create_view(self, sql: str) -> CreateMaterializedView:
+        m = re.match(r"CREATE\s+MATERIALIZED\s+VIEW\s+(\w+)\s+AS\s+(SELECT\b.*)$", sql, re.I | re.S)
+        if not m:
+            raise ValueError("Invalid CREATE MATERIALIZED VIEW syntax")
+        query = m.group(2).strip()
+        if re.search(r"\?\d+", query):
+            raise ValueError("A materialized view cannot use ? parameters")
+        # parse now so a bad definition fails here rather than when it is first used
+        self._parse_select(query)
+        return CreateMaterializedView(name=m.group(1), query=query)
+
+    def _parse_refresh(self, sql: str) -> RefreshMaterializedView:
+        m = re.match(r"REFRESH\s+MATERIALIZED\s+VIEW\s+(\w+)\s*$", sql.strip(), re.I)
+        if not m:
+            raise ValueError("Invalid REFRESH syntax")
+        return RefreshMaterializedView(name=m.group(1))
 
     def _split_commas(self, s: str) -> List[str]:
         parts = []
@@ -203,7 +456,10 @@ class Parser:
         vals = []
         for p in parts:
             p = p.strip()
-            if p.startswith("'") and p.endswith("'"):
+            param = self._param(p)
+            if param is not None:
+                vals.append(param)
+            elif p.startswith("'") and p.endswith("'"):
                 vals.append(p[1:-1])
             elif p.upper() in ("TRUE", "FALSE"):
                 vals.append(p.upper() == "TRUE")
@@ -217,34 +473,176 @@ class Parser:
                     vals.append(p)
         return vals
 
+    def _number_placeholders(self, sql: str) -> str:
+        # rewrite each `?` outside string literals as `?N` so it parses like a literal
+        if "?" not in sql:
+            return sql
+        parts = re.split(r"('(?:[^']|'')*')", sql)
+        n = 0
+        for i in range(0, len(parts), 2):
+            pieces = parts[i].split("?")
+            out = pieces[0]
+            for piece in pieces[1:]:
+                out += f"?{n}" + piece
+                n += 1
+            parts[i] = out
+        return "".join(parts)
+
+    def _param(self, val: str) -> Optional[Param]:
+        m = re.match(r"\?(\d+)$", val)
+        return Param(int(m.group(1))) if m else None
+
+    def _parse_literal(self, val: str):
+        val = val.strip()
+        param = self._param(val)
+        if param is not None:
+            return param
+        if val.startswith("'") and val.endswith("'"):
+            return val[1:-1]
+        try:
+            return int(val)
+        except Exception:
+            try:
+                return float(val)
+            except Exception:
+                if val.upper() in ("TRUE", "FALSE"):
+                    return val.upper() == "TRUE"
+        return val
+
+    _BETWEEN = r"(\w+(?:\.\w+)?)\s+BETWEEN\s+('(?:[^']|'')*'|\S+)\s+AND\s+('(?:[^']|'')*'|\S+)"
+    _TERM = r"(\w+(?:\.\w+)?)\s*(<=|>=|<>|!=|=|<|>)\s*(.+)$"
+    _IN = r"(\w+(?:\.\w+)?)\s+IN\s*(\([^()]*\)|__subquery\d+__)$"
+    _EXISTS = r"EXISTS\s*__subquery(\d+)__$"
+    _NOT = r"(?:NOT\b|\w+(?:\.\w+)?\s+NOT\s+IN\b)"
+    _SUBQUERY = r"__subquery(\d+)__$"
+    _COLUMN_REF = r"[A-Za-z_]\w*\.[A-Za-z_]\w*$"
+
+    def _extract_subqueries(self, sql: str) -> Tuple[str, List["Select"]]:
+        """Replace each parenthesized `(SELECT ...)` with a `__subqueryN__`
+        marker and parse it, so the outer statement's clauses (WHERE, AND,
+        GROUP BY) are not split inside a subquery."""
+        if not _rx(r"\(\s*SELECT\b", re.I).search(sql):
+            return sql, []
+        out: List[str] = []
+        subs: List[Select] = []
+        i, n = 0, len(sql)
+        while i < n:
+            ch = sql[i]
+            if ch == "'":
+                j = sql.find("'", i + 1)
+                while j != -1 and sql[j + 1:j + 2] == "'":
+                    j = sql.find("'", j + 2)
+                j = n - 1 if j == -1 else j
+                out.append(sql[i:j + 1])
+                i = j + 1
+                continue
+            if ch == "(" and _rx(r"\(\s*SELECT\b", re.I).match(sql, i):
+                depth, j, quoted = 0, i, False
+                while j < n:
+                    c = sql[j]
+                    if c == "'":
+                        quoted = not quoted
+                    elif not quoted and c == "(":
+                        depth += 1
+                    elif not quoted and c == ")":
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    j += 1
+                if depth:
+                    raise ValueError("Unbalanced parentheses in subquery")
+                subs.append(self._parse_select(sql[i + 1:j].strip()))
+                out.append(f" __subquery{len(subs) - 1}__ ")
+                i = j + 1
+                continue
+            out.append(ch)
+            i += 1
+        return "".join(out), subs
+
+    def _parse_where(self, cond: str, subs: Sequence["Select"] = ()):
+        """Parse `col OP value [AND col OP value ...]` into a Where or And.
+
+        OP is one of =, !=, <>, <, <=, >, >=; `col BETWEEN a AND b` is
+        rewritten to `col >= a AND col <= b`. `col IN (v, ...)`,
+        `col IN (SELECT ...)` and `EXISTS (SELECT ...)` refer to the
+        subqueries in `subs` through their `__subqueryN__` markers.
+        """
+        # hide string literals so an AND (or BETWEEN) inside one is not split on
+        literals: List[str] = []
+
+        def hide(m):
+            literals.append(m.group(0))
+            return f"\x00{len(literals) - 1}\x00"
+
+        def unhide(text: str) -> str:
+            return _rx(r"\x00(\d+)\x00").sub(lambda m: literals[int(m.group(1))], text)
+
+        masked = _rx(r"'(?:[^']|'')*'").sub(hide, cond.strip())
+        masked = _rx(self._BETWEEN, re.I).sub(r"\1 >= \2 AND \1 <= \3", masked)
+        terms: List[Union[Where, Exists]] = []
+        for hidden in re.split(r"\s+AND\s+", masked, flags=re.I):
+            hidden = hidden.strip()
+            part = unhide(hidden)
+            mexists = _rx(self._EXISTS, re.I).match(part)
+            if mexists:
+                terms.append(Exists(query=subs[int(mexists.group(1))]))
+                continue
+            min_ = _rx(self._IN, re.I | re.S).match(hidden)
+            if min_:
+                value = self._parse_in(min_.group(2), subs, unhide)
+                terms.append(Where(column=min_.group(1), value=value, op="IN"))
+                continue
+            if _rx(self._NOT, re.I).match(hidden):
+                # an anti-join is not implemented; never drop the negation silently
+                raise ValueError(f"NOT, NOT IN and NOT EXISTS are not supported: {part}")
+            mwhere = _rx(self._TERM, re.S).match(hidden)
+            # the value must be one token: a quoted literal, number, word or ?
+            if not mwhere or re.search(r"\s", mwhere.group(3).strip()):
+                raise ValueError(f"Invalid WHERE condition: {part}")
+            op = "!=" if mwhere.group(2) == "<>" else mwhere.group(2)
+            text = unhide(mwhere.group(3)).strip()
+            value = ColumnRef(text) if _rx(self._COLUMN_REF).match(text) else self._parse_literal(text)
+            terms.append(Where(column=mwhere.group(1).strip(), value=value, op=op))
+        if len(terms) == 1 and isinstance(terms[0], Where):
+            return terms[0]
+        return And(terms=terms)
+
+    def _parse_in(self, body: str, subs: Sequence["Select"], unhide: Callable[[str], str]):
+        # `body` has its string literals hidden by _parse_where; `unhide` restores them
+        msub = _rx(self._SUBQUERY).match(body)
+        if msub:
+            sub = subs[int(msub.group(1))]
+            if len(sub.columns) != 1 or sub.columns[0].strip() == "*":
+                raise ValueError("An IN subquery must select exactly one column")
+            return sub
+        items = [x.strip() for x in body[1:-1].split(",")]
+        if not all(items):
+            raise ValueError("IN takes a non-empty list of values")
+        bad = next((x for x in items if re.search(r"\s", x)), None)
+        if bad is not None:
+            raise ValueError(f"Invalid value in IN list: {unhide(bad)}")
+        return [self._parse_literal(unhide(x)) for x in items]
+
     def _parse_select(self, sql: str) -> Select:
         # basic: SELECT cols FROM table [INNER JOIN other ON a.b = c.d] [WHERE expr]
         # This is intentionally simple and brittle—good enough for demo.
         where = None
         join = None
+        group_by: List[str] = []
+        sql, subs = self._extract_subqueries(sql)
+        mg = re.search(r"\s+GROUP\s+BY\s+(.+)$", sql, re.I | re.S)
+        if mg:
+            group_by = [c.strip() for c in mg.group(1).split(",")]
+            if not all(re.match(r"\w+(?:\.\w+)?$", c) for c in group_by):
+                raise ValueError("GROUP BY takes column names")
+            sql = sql[:mg.start()]
         # split WHERE
         parts = re.split(r"\bWHERE\b", sql, flags=re.I)
         main = parts[0].strip()
         if len(parts) > 1:
-            cond = parts[1].strip()
-            mwhere = re.match(r"(\w+(?:\.\w+)?)\s*=\s*(.+)$", cond)
-            if mwhere:
-                col = mwhere.group(1).strip()
-                val = mwhere.group(2).strip()
-                if val.startswith("'") and val.endswith("'"):
-                    val = val[1:-1]
-                else:
-                    try:
-                        val = int(val)
-                    except Exception:
-                        try:
-                            val = float(val)
-                        except Exception:
-                            if val.upper() in ("TRUE", "FALSE"):
-                                val = val.upper() == "TRUE"
-                where = Where(column=col, value=val)
-        # handle SELECT ... FROM ... [INNER JOIN]
-        m = re.match(r"SELECT\s+(.*?)\s+FROM\s+(\w+)(.*)$", main, re.I | re.S)
+            where = self._parse_where(parts[1], subs)
+        # handle SELECT ... FROM ... [INNER JOIN]; system tables are sys.<name>
+        m = re.match(r"SELECT\s+(.*?)\s+FROM\s+((?:sys\.)?\w+)(.*)$", main, re.I | re.S)
         if not m:
             raise ValueError("Invalid SELECT syntax")
         cols = [c.strip() for c in m.group(1).split(",")]
@@ -260,10 +658,35 @@ class Parser:
                 left_col_name = leftcol.split('.', 1)[1] if '.' in leftcol else leftcol
                 right_col_name = rightcol.split('.', 1)[1] if '.' in rightcol else rightcol
                 join = Join(right_table=right, left_col=left_col_name, right_col=right_col_name)
-        return Select(columns=cols, table=table, where=where, join=join)
+        aggregates = [a for a in (self._parse_aggregate(c) for c in cols) if a is not None]
+        if aggregates or group_by:
+            plain = [c for c in cols if c not in {a.expr for a in aggregates}]
+            if "*" in plain:
+                raise ValueError("SELECT * cannot be combined with GROUP BY or aggregates")
+            missing = [c for c in plain if c not in group_by]
+            if missing:
+                raise ValueError(f"Column(s) {', '.join(missing)} must appear in GROUP BY or an aggregate")
+            names = [a.alias for a in aggregates] + plain
+            if len(set(names)) != len(names):
+                raise ValueError("Aggregate output names must be unique (use AS)")
+        return Select(columns=cols, table=table, where=where, join=join, group_by=group_by, aggregates=aggregates)
+
+    def _parse_aggregate(self, item: str) -> Optional[Aggregate]:
+        m = _rx(r"(COUNT|SUM|MIN|MAX)\s*\(\s*(\*|\w+(?:\.\w+)?)\s*\)(?:\s+AS\s+(\w+))?$", re.I).match(item)
+        if not m:
+            if "(" in item:
+                raise ValueError(f"Unsupported select expression: {item}")
+            return None
+        func = m.group(1).upper()
+        column = None if m.group(2) == "*" else m.group(2)
+        if column is None and func != "COUNT":
+            raise ValueError(f"{func}(*) is not supported")
+        alias = m.group(3) or ("count" if column is None else f"{func.lower()}_{column.split('.')[-1]}")
+        return Aggregate(func=func, column=column, alias=alias, expr=item)
 
     def _parse_update(self, sql: str) -> Update:
         # UPDATE <table> SET col = val, ... WHERE col = val
+        sql, subs = self._extract_subqueries(sql)
         m = re.match(r"UPDATE\s+(\w+)\s+SET\s+(.*?)\s*(?:WHERE\s+(.*))?$", sql, re.I | re.S)
         if not m:
             raise ValueError("Invalid UPDATE syntax")
@@ -275,7 +698,9 @@ class Parser:
             left, right = part.split("=", 1)
             key = left.strip()
             val = right.strip()
-            if val.startswith("'") and val.endswith("'"):
+            if self._param(val) is not None:
+                val = self._param(val)
+            elif val.startswith("'") and val.endswith("'"):
                 val = val[1:-1]
             else:
                 try:
@@ -287,59 +712,70 @@ class Parser:
                     if val.upper() in ("TRUE", "FALSE"):
                         val = val.upper() == "TRUE"
             changes[key] = val
-        where = None
-        if where_clause:
-            mwhere = re.match(r"(\w+(?:\.\w+)?)\s*=\s*(.+)$", where_clause.strip())
-            if mwhere:
-                col = mwhere.group(1).strip()
-                val = mwhere.group(2).strip()
-                if val.startswith("'") and val.endswith("'"):
-                    val = val[1:-1]
-                else:
-                    try:
-                        val = int(val)
-                    except Exception:
-                        try:
-                            val = float(val)
-                        except Exception:
-                            if val.upper() in ("TRUE", "FALSE"):
-                                val = val.upper() == "TRUE"
-                where = Where(column=col, value=val)
+        where = self._parse_where(where_clause, subs) if where_clause else None
         return Update(table=table, changes=changes, where=where)
 
     def _parse_delete(self, sql: str) -> Delete:
         # DELETE FROM <table> [WHERE col = val]
+        sql, subs = self._extract_subqueries(sql)
         m = re.match(r"DELETE\s+FROM\s+(\w+)\s*(?:WHERE\s+(.*))?$", sql, re.I | re.S)
         if not m:
             raise ValueError("Invalid DELETE syntax")
         table = m.group(1)
         where_clause = m.group(2)
-        where = None
-        if where_clause:
-            mwhere = re.match(r"(\w+(?:\.\w+)?)\s*=\s*(.+)$", where_clause.strip())
-            if mwhere:
-                col = mwhere.group(1).strip()
-                val = mwhere.group(2).strip()
-                if val.startswith("'") and val.endswith("'"):
-                    val = val[1:-1]
-                else:
-                    try:
-                        val = int(val)
-                    except Exception:
-                        try:
-                            val = float(val)
-                        except Exception:
-                            if val.upper() in ("TRUE", "FALSE"):
-                                val = val.upper() == "TRUE"
-                where = Where(column=col, value=val)
+        where = self._parse_where(where_clause, subs) if where_clause else None
         return Delete(table=table, where=where)
 
-    def _parse_drop(self, sql: str) -> DropTable:
-        m = re.match(r"DROP\s+TABLE\s+(\w+)\s*;?$", sql.strip(), re.I)
+    def _parse_drop(self, sql: str):
+        mi = re.match(r"DROP\s+INDEX\s+(\w+)(?:\s+ON\s+(\w+))?\s*;?$", sql.strip(), re.I)
+        if mi:
+            return DropIndex(name=mi.group(1), table=mi.group(2))
+        # a materialized view is a table, and is dropped like one
+        m = re.match(r"DROP\s+(?:TABLE|MATERIALIZED\s+VIEW)\s+(\w+)\s*;?$", sql.strip(), re.I)
         if not m:
             raise ValueError("Invalid DROP TABLE syntax")
         return DropTable(name=m.group(1))
 
+    def _parse_reindex(self, sql: str) -> Reindex:
+        mi = re.match(r"REINDEX\s+INDEX\s+(\w+)(?:\s+ON\s+(\w+))?\s*$", sql.strip(), re.I)
+        if mi:
+            return Reindex(table=mi.group(2), index=mi.group(1))
+        m = re.match(r"REINDEX\s+(?:TABLE\s+)?(\w+)\s*$", sql.strip(), re.I)
+        if not m:
+            raise ValueError("Invalid REINDEX syntax")
+        return Reindex(table=m.group(1))
+
+    def _parse_checkpoint(self, sql: str) -> Checkpoint:
+        m = re.match(r"CHECKPOINT(?:\s+(\w+))?\s*$", sql.strip(), re.I)
+        if not m:
+            raise ValueError("Invalid CHECKPOINT syntax")
+        return Checkpoint(table=m.group(1))
+
+    def _parse_explain(self, sql: str) -> Explain:
+        m = re.match(r"EXPLAIN\s+(ANALYZE\s+)?(\S.*)$", sql.strip(), re.I | re.S)
+        if not m:
+            raise ValueError("Invalid EXPLAIN syntax")
+        stmt = self._dispatch(m.group(2))
+        if not isinstance(stmt, (Select, Update, Delete)):
+            raise ValueError("EXPLAIN supports SELECT, UPDATE and DELETE")
+        return Explain(statement=stmt, analyze=bool(m.group(1)))
+
+    def _parse_copy(self, sql: str) -> Copy:
+        m = re.match(r"COPY\s+(\w+)\s*(?:\(([^()]*)\))?\s*(FROM|TO)\s+('(?:[^']|'')*'|\?\d+)"
+                     r"(?:\s+WITH\s*\(([^()]*)\))?\s*$", sql.strip(), re.I | re.S)
+        if not m:
+            raise ValueError("Invalid COPY syntax")
+        path = self._param(m.group(4)) or m.group(4)[1:-1].replace("''", "'")
+        columns = [c.strip() for c in m.group(2).split(",")] if m.group(2) is not None else None
+        return Copy(table=m.group(1), path=path, direction=m.group(3).lower(), columns=columns,
+                    options=self._parse_options(m.group(5) or "", "COPY"))
+
+    def _parse_backup(self, sql: str) -> Backup:
+        m = re.match(r"BACKUP\s+TO\s+('(?:[^']|'')*'|\?\d+)\s*$", sql.strip(), re.I)
+        if not m:
+            raise ValueError("Invalid BACKUP syntax")
+        return Backup(path=self._param(m.group(1)) or m.group(1)[1:-1].replace("''", "'"))
+
     def _parse_rename(self, sql: str) -> RenameTable:
         # support: RENAME TABLE old TO new;
         m = re.match(r"RENAME\s+TABLE\s+(\w+)\s+TO\s+(\w+)\s*;?$", sql.strip(), re.I)
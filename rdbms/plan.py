@@ -0,0 +1,93 @@
+"""Operator trees for EXPLAIN and EXPLAIN ANALYZE.
+
+The executor describes how it will run a SELECT, UPDATE or DELETE as a tree
+of `PlanNode`s (scan vs. index lookup, join algorithm, filters, projection).
+Under ANALYZE the statement is run and every node is annotated with the rows
+it produced and the time spent in it. `render` formats the tree:
+
+    Nested Loop  (rows=20)  (actual rows=20 loops=1 time=0.215 ms)
+      Join: groups.gid = items.grp
+      ->  Primary Key Lookup on groups  (rows=1)  (actual rows=1 loops=1 time=0.012 ms)
+            Key: gid = 3
+      ->  Index Lookup on items using idx_grp  (actual rows=20 loops=1 time=0.101 ms)
+            Key: grp = groups.gid
+"""
+from typing import Any, Dict, List, Optional
+
+
+def literal(value: Any) -> str:
+    """Format a value the way it would be written in SQL."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+# values of an IN list shown before the rest are summarized
+_SHOWN_VALUES = 10
+
+
+def describe_term(w) -> str:
+    """Format one `Where` predicate, e.g. "id IN (1, 2, 3)"."""
+    if w.op == "IN":
+        vals = list(w.value)
+        shown = ", ".join(literal(v) for v in vals[:_SHOWN_VALUES])
+        if len(vals) > _SHOWN_VALUES:
+            shown += f", ... {len(vals) - _SHOWN_VALUES} more"
+        return f"{w.column} IN ({shown})"
+    return f"{w.column} {w.op} {literal(w.value)}"
+
+
+def describe_terms(terms) -> str:
+    return " AND ".join(describe_term(w) for w in terms)
+
+
+class PlanNode:
+    """One operator: its name, what it works on, and optional row estimate.
+
+    `role` ties the node to the measurements the executor records under
+    ANALYZE (see `Executor._plan`); `contained` marks nodes whose time is
+    already part of their parent's (the inner side of a nested loop).
+    """
+
+    def __init__(self, op: str, target: str = "", est_rows: Optional[int] = None,
+                 children: Optional[List["PlanNode"]] = None, role: Optional[str] = None):
+        self.op = op
+        self.target = target
+        self.est_rows = est_rows
+        self.children: List[PlanNode] = list(children or [])
+        self.role = role
+        self.contained = False
+        # detail lines shown under the node, e.g. "Filter: val < 0.5"
+        self.info: List[str] = []
+        # ANALYZE results: [rows, seconds, loops] or None when not executed
+        self.actual: Optional[List[Any]] = None
+
+    def total_seconds(self) -> float:
+        """Time spent in this node and its children."""
+        own = self.actual[1] if self.actual else 0.0
+        return own + sum(c.total_seconds() for c in self.children if not c.contained)
+
+    def annotate(self, actuals: Dict[str, List[Any]]):
+        """Attach ANALYZE measurements recorded under each node's role."""
+        if self.role is not None:
+            self.actual = actuals.get(self.role, [0, 0.0, 0])
+        for c in self.children:
+            c.annotate(actuals)
+
+    def render(self, depth: int = 0) -> List[str]:
+        """Format the subtree as text lines, children indented under "->"."""
+        line = self.op + (f" {self.target}" if self.target else "")
+        if self.est_rows is not None:
+            line += f"  (rows={self.est_rows})"
+        if self.actual is not None:
+            rows, _, loops = self.actual
+            line += f"  (actual rows={rows} loops={loops} time={self.total_seconds() * 1000:.3f} ms)"
+        lines = [(" " * (6 * depth - 4) + "->  " if depth else "") + line]
+        lines += [" " * (6 * depth + 2) + i for i in self.info]
+        for c in self.children:
+            lines += c.render(depth + 1)
+        return lines
@@ -4,7 +4,7 @@ from .executor import Executor
 def repl_loop(base_dir: str = "data"):
     exe = Executor(base_dir=base_dir)
     print("mini-rdbms REPL. Enter SQL statements terminated with ';'. Type .exit to quit.")
-    print("Commands: .exit, .tables, .schema <table>")
+    print("Commands: .exit, .tables, .schema <table>, .profile, .import <file> <table>, .export <table> <file>")
     buffer = []
     while True:
         try:
@@ -17,16 +17,33 @@ def repl_loop(base_dir: str = "data"):
         if stripped == ".exit":
             break
         if stripped == ".tables":
-            # list tables by scanning the catalog directory
+            # list tables from the catalog's cached table list
             try:
-                cats = exe.catalog.base_dir
-                import os
-
-                tables = [d for d in os.listdir(cats) if os.path.isdir(os.path.join(cats, d))]
-                print("Tables:", tables)
+                print("Tables:", exe.catalog.list_tables())
             except Exception as e:
                 print("Error listing tables:", e)
             continue
+        if stripped == ".profile":
+            # timings, rows and plan of the last statement
+            print(exe.last_profile.as_dict() if exe.last_profile else "No statement executed yet")
+            continue
+        if stripped.startswith((".import", ".export")):
+            # COPY shortcuts; the file format follows its extension (.csv, .jsonl)
+            parts = stripped.split()
+            if len(parts) != 3:
+                print("Usage: .import <file> <table> / .export <table> <file>")
+                continue
+            if parts[0] == ".import":
+                sql = f"COPY {parts[2]} FROM ?"
+                path = parts[1]
+            else:
+                sql = f"COPY {parts[1]} TO ?"
+                path = parts[2]
+            try:
+                print(exe.execute(sql, [path]))
+            except Exception as e:
+                print(f"Error: {e}")
+            continue
         if stripped.startswith(".schema"):
             parts = stripped.split(None, 1)
             if len(parts) == 2:
@@ -45,6 +62,10 @@ def repl_loop(base_dir: str = "data"):
             buffer = []
             try:
                 res = exe.execute(sql)
-                print(res)
+                if isinstance(res, list) and res and list(res[0]) == ["QUERY PLAN"]:
+                    # EXPLAIN output: one plan line per row
+                    print("\n".join(r["QUERY PLAN"] for r in res))
+                else:
+                    print(res)
             except Exception as e:
                 print(f"Error: {e}")
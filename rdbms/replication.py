@@ -0,0 +1,339 @@
+"""Logical change log and a read-only follower that applies it.
+
+A primary `Executor(changelog="wal/")` appends every change it applies to
+the log: row-level records for INSERT/UPDATE/DELETE (the full new row, so
+defaults such as CURRENT_TIMESTAMP replay exactly) and the parsed statement
+for DDL. Each record carries a log sequence number (LSN) and the primary's
+wall-clock time:
+
+    {"lsn": 42, "ts": 1717171717.5, "op": "insert", "table": "users", "pk": "7", "row": {...}}
+    {"lsn": 43, "ts": 1717171718.0, "op": "ddl", "table": null, "statement": "CreateIndex", "args": {...}}
+
+The log is a directory of JSONL segment files named after their first LSN
+(`00000000000000000001.log`); a new segment is started once the current one
+reaches `SEGMENT_BYTES`. Only the newest segment is ever appended to.
+
+A `Follower` tails the log from the directory, or over HTTP from the
+webapp's `/replication/log` endpoint, applies it to its own database and
+remembers the last applied LSN in `replica.json`, so it resumes where it
+stopped. Its executor is read-only: it answers SELECT and EXPLAIN while the
+follower reports how far it lags behind the primary.
+"""
+import dataclasses
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import codec, metrics
+from .exceptions import SchemaError, TableNotFound
+
+# start a new segment file once the current one is this large
+SEGMENT_BYTES = 4 * 1024 * 1024
+# buffered records are written out at the end of each statement, or sooner
+# once this many are pending
+FLUSH_RECORDS = 10000
+# records applied per `Follower.poll`
+POLL_RECORDS = 10000
+
+
+def segment_files(path: str) -> List[Tuple[int, str]]:
+    """Return (first LSN, file name) of every segment in `path`, oldest first."""
+    out = []
+    for name in os.listdir(path):
+        if name.endswith(".log") and name[:-4].isdigit():
+            out.append((int(name[:-4]), name))
+    return sorted(out)
+
+
+class ChangeLog:
+    """Append-only log of the changes applied by an `Executor`.
+
+    Records get their LSN when they are appended, which happens while the
+    changed table's lock is held, so per-row order in the log matches the
+    order the changes were applied. Records are buffered in memory and
+    written by `flush` (called by the executor after every statement).
+    """
+
+    def __init__(self, path: str, segment_bytes: int = SEGMENT_BYTES):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.lsn = 0
+        self._lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._segment: Optional[str] = None
+        self._size = 0
+        self._recover()
+
+    def _recover(self):
+        segs = segment_files(self.path)
+        if not segs:
+            return
+        first, name = segs[-1]
+        self._segment = os.path.join(self.path, name)
+        with open(self._segment, "rb") as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # drop a record torn by a crash mid-write
+            with open(self._segment, "r+b") as f:
+                f.truncate(end)
+        self._size = end
+        last = data[:end].rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        self.lsn = codec.loads(last)["lsn"] if last else first - 1
+
+    def append(self, op: str, table: Optional[str], **fields: Any) -> int:
+        """Buffer one record and return its LSN."""
+        with self._lock:
+            self.lsn += 1
+            record = {"lsn": self.lsn, "ts": time.time(), "op": op, "table": table}
+            record.update(fields)
+            self._pending.append(codec.dumpb(record) + b"\n")
+            if len(self._pending) >= FLUSH_RECORDS:
+                self._flush()
+            return self.lsn
+
+    def row_change(self, table: str, op: str, pk: str, old: Optional[Dict[str, Any]],
+                   new: Optional[Dict[str, Any]]):
+        """Table listener: log one inserted, updated or deleted row."""
+        if op == "delete":
+            self.append("delete", table, pk=pk)
+        else:
+            self.append(op, table, pk=pk, row=new)
+
+    def statement(self, stmt):
+        """Log a DDL statement as its class name and fields."""
+        self.append("ddl", None, statement=type(stmt).__name__, args=dataclasses.asdict(stmt))
+
+    def flush(self):
+        if self._pending:
+            with self._lock:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        if self._segment is None or self._size >= self.segment_bytes:
+            first = self.lsn - len(self._pending) + 1
+            self._segment = os.path.join(self.path, f"{first:020d}.log")
+            self._size = 0
+        payload = b"".join(self._pending)
+        with open(self._segment, "ab") as f:
+            f.write(payload)
+        metrics.record_write(len(payload))
+        self._size += len(payload)
+        self._pending = []
+
+
+class LogReader:
+    """Reads log records after a given LSN from a log directory.
+
+    The file position reached by each read is remembered (for the last few
+    LSNs handed out), so a follower polling with the LSN it last received
+    continues where the previous read stopped instead of rescanning its
+    segment. One reader can serve several followers.
+    """
+
+    # read segments in blocks of this many bytes
+    BLOCK_BYTES = 1 << 20
+    KEEP_POSITIONS = 64
+
+    def __init__(self, path: str):
+        self.path = path
+        # LSN -> (segment name, byte offset just past that record)
+        self._positions: "OrderedDict[int, Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, after: int, limit: int = POLL_RECORDS) -> List[Dict[str, Any]]:
+        segs = segment_files(self.path) if os.path.isdir(self.path) else []
+        if not segs:
+            return []
+        if after + 1 < segs[0][0]:
+            raise SchemaError(f"Change log no longer holds LSN {after + 1} (oldest is {segs[0][0]})")
+        with self._lock:
+            pos = self._positions.get(after)
+        if pos is not None:
+            name, offset = pos
+        else:
+            name = [n for first, n in segs if first <= after + 1][-1]
+            offset = 0
+        names = [n for _, n in segs]
+        out: List[Dict[str, Any]] = []
+        while len(out) < limit:
+            offset, done = self._read_segment(name, offset, after, limit, out)
+            i = names.index(name) if name in names else -1
+            # a segment is complete once a newer one exists
+            if not done or i < 0 or i + 1 >= len(names):
+                break
+            name, offset = names[i + 1], 0
+        if out:
+            with self._lock:
+                self._positions[out[-1]["lsn"]] = (name, offset)
+                while len(self._positions) > self.KEEP_POSITIONS:
+                    self._positions.popitem(last=False)
+        return out
+
+    def _read_segment(self, name: str, offset: int, after: int, limit: int,
+                      out: List[Dict[str, Any]]) -> Tuple[int, bool]:
+        """Append records after `after` from segment `name`, starting at byte
+        `offset`; returns the new offset and whether the end was reached."""
+        loads = codec.loads
+        with open(os.path.join(self.path, name), "rb") as f:
+            f.seek(offset)
+            size = self.BLOCK_BYTES
+            while len(out) < limit:
+                data = f.read(size)
+                end = data.rfind(b"\n") + 1
+                if not end:
+                    if len(data) < size:
+                        # nothing more, or only a record still being written
+                        return offset, True
+                    f.seek(offset)
+                    size *= 2
+                    continue
+                metrics.record_read(end)
+                start = 0
+                while start < end and len(out) < limit:
+                    stop = data.index(b"\n", start) + 1
+                    record = loads(data[start:stop])
+                    if record["lsn"] > after:
+                        out.append(record)
+                    start = stop
+                offset += start
+                f.seek(offset)
+                size = self.BLOCK_BYTES
+            return offset, False
+
+
+class Follower:
+    """Applies a primary's change log to a local, read-only database.
+
+    `source` is the primary's log directory or the URL of its webapp's
+    `/replication/log` endpoint. Queries go through `executor`, which
+    rejects writes; changes are applied to its tables directly.
+    """
+
+    def __init__(self, source: str, base_dir: str = "replica", executor=None):
+        from .executor import Executor
+
+        self.source = source
+        self.executor = executor or Executor(base_dir=base_dir, read_only=True)
+        self.state_file = os.path.join(self.executor.catalog.base_dir, "replica.json")
+        self.applied_lsn = 0
+        if os.path.exists(self.state_file):
+            with open(self.state_file, "rb") as f:
+                self.applied_lsn = codec.loads(f.read())["lsn"]
+        self._reader = None if source.startswith(("http://", "https://")) else LogReader(source)
+        # primary time of the last applied record, and seconds behind the primary
+        self.applied_ts: Optional[float] = None
+        self.lag_seconds = 0.0
+
+    def _fetch(self, limit: int) -> List[Dict[str, Any]]:
+        if self._reader is not None:
+            return self._reader.read(self.applied_lsn, limit)
+        from urllib.request import urlopen
+
+        sep = "&" if "?" in self.source else "?"
+        with urlopen(f"{self.source}{sep}after={self.applied_lsn}&limit={limit}") as resp:
+            return [codec.loads(line) for line in resp.read().splitlines() if line.strip()]
+
+    def poll(self, limit: int = POLL_RECORDS) -> int:
+        """Apply the records available from the source (at most `limit`);
+        returns how many were applied."""
+        records = self._fetch(limit)
+        self._commit(records)
+        # a full batch means more records are waiting: we are at least as far
+        # behind as the age of the last one applied
+        self.lag_seconds = max(0.0, time.time() - records[-1]["ts"]) if len(records) >= limit else 0.0
+        return len(records)
+
+    def catch_up(self, lsn: Optional[int] = None, until: Optional[float] = None) -> int:
+        """Apply every available record up to LSN `lsn` and/or primary time
+        `until`, then stop; returns how many were applied."""
+        total = 0
+        while True:
+            records = self._fetch(POLL_RECORDS)
+            full = len(records) >= POLL_RECORDS
+            stop = next((i for i, r in enumerate(records)
+                         if (lsn is not None and r["lsn"] > lsn) or (until is not None and r["ts"] > until)), None)
+            if stop is not None:
+                records = records[:stop]
+            self._commit(records)
+            total += len(records)
+            if stop is not None or not full:
+                return total
+
+    def _commit(self, records: List[Dict[str, Any]]):
+        # apply, then record the position so a restart resumes after these records
+        if not records:
+            return
+        self._apply(records)
+        self.applied_lsn = records[-1]["lsn"]
+        self.applied_ts = records[-1]["ts"]
+        with open(self.state_file + ".tmp", "wb") as f:
+            f.write(codec.dumpb({"lsn": self.applied_lsn, "ts": self.applied_ts}))
+        os.replace(self.state_file + ".tmp", self.state_file)
+
+    def run(self, interval: float = 0.5, stop: Optional[threading.Event] = None):
+        """Poll until `stop` is set, sleeping `interval` seconds when caught up."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if not self.poll():
+                stop.wait(interval)
+
+    def status(self) -> Dict[str, Any]:
+        return {"source": self.source, "applied_lsn": self.applied_lsn,
+                "applied_ts": self.applied_ts, "lag_seconds": self.lag_seconds}
+
+    def _apply(self, records: List[Dict[str, Any]]):
+        # consecutive row changes to the same table with the same op are applied as one batch
+        i = 0
+        while i < len(records):
+            r = records[i]
+            if r["op"] == "ddl":
+                self._apply_ddl(r["statement"], r["args"])
+                i += 1
+                continue
+            j = i + 1
+            while j < len(records) and records[j]["op"] == r["op"] and records[j]["table"] == r["table"]:
+                j += 1
+            self._apply_rows(r["table"], r["op"], records[i:j])
+            i = j
+
+    def _apply_rows(self, table: str, op: str, records: List[Dict[str, Any]]):
+        t = self.executor.table(table)
+        if op == "delete":
+            t.delete_many(r["pk"] for r in records)
+            return
+        # re-applying records after a crash must not fail: rows that already
+        # exist are updated, rows that do not are inserted
+        latest: Dict[str, Dict[str, Any]] = {}
+        for r in records:
+            latest[r["pk"]] = r["row"]
+        present = [(pk, row) for pk, row in latest.items() if t.get(pk) is not None]
+        missing = [row for pk, row in latest.items() if t.get(pk) is None]
+        if present:
+            t.update_rows(present)
+        if missing:
+            t.insert_many(missing)
+
+    def _apply_ddl(self, statement: str, args: Dict[str, Any]):
+        from . import parser
+
+        exe = self.executor
+        stmt = getattr(parser, statement)(**args)
+        try:
+            if isinstance(stmt, (parser.CreateTable, parser.CreateMaterializedView)) and os.path.exists(
+                    os.path.join(exe.catalog.table_path(stmt.name), "schema.json")):
+                return
+            if isinstance(stmt, parser.CreateIndex):
+                if stmt.name in exe.table(stmt.table).indexes:
+                    return
+                stmt.concurrently = False
+            exe.run_statement(stmt)
+        except (TableNotFound, SchemaError):
+            # already dropped, renamed or removed before a restart
+            if isinstance(stmt, (parser.CreateTable, parser.CreateIndex, parser.CreateMaterializedView)):
+                raise
@@ -0,0 +1,198 @@
+"""Zone maps and compressed, immutable row segments.
+
+Every table groups its rows into blocks (`Block`) that carry a zone map:
+the min/max of each column over the block's rows. Scans skip blocks whose
+zone map rules out the WHERE predicates (`may_match`).
+
+Tables using the `segmented` storage format also seal cold rows into
+compressed segment files.
+
+A segment file holds one JSON header line followed by a compressed JSONL
+payload. The header records the row count, the compression codec and the
+min/max of every column (a zone map), so a scan can decide whether a
+segment can contain matching rows without decompressing it.
+
+    {"format": 1, "rows": 5000, "compression": "zlib", "min": {...}, "max": {...}}\\n
+    <zlib/lzma-compressed JSONL rows>
+"""
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import codec, metrics
+from .exceptions import SchemaError
+
+
+def _zlib():
+    import zlib
+
+    return (lambda b: zlib.compress(b, 6)), zlib.decompress
+
+
+def _lzma():
+    import lzma
+
+    return lzma.compress, lzma.decompress
+
+
+# name -> factory returning (compress, decompress); compression modules are
+# imported only when a segment is actually written or read
+COMPRESSORS = {
+    "zlib": _zlib,
+    "lzma": _lzma,
+    "none": lambda: (bytes, bytes),
+}
+
+
+DEFAULT_SEGMENT_ROWS = 10000
+# rows per in-memory zone-map block for rows not sealed in a segment
+ZONE_ROWS = 1024
+
+
+def check_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate table storage options from CREATE TABLE ... WITH (...)."""
+    for key in options:
+        if key not in ("format", "compression", "segment_rows"):
+            raise SchemaError(f"Unknown table option '{key}'")
+    if options.get("format", "jsonl") not in ("jsonl", "segmented"):
+        raise SchemaError(f"Unknown storage format '{options['format']}' (expected jsonl or segmented)")
+    if options.get("compression", "zlib") not in COMPRESSORS:
+        raise SchemaError(f"Unknown compression '{options['compression']}' (expected {', '.join(COMPRESSORS)})")
+    rows = options.get("segment_rows", DEFAULT_SEGMENT_ROWS)
+    if not isinstance(rows, int) or rows <= 0:
+        raise SchemaError("segment_rows must be a positive integer")
+    return dict(options)
+
+
+def zone_of(rows: Iterable[Dict[str, Any]], columns: Iterable[str]) -> Tuple[Dict[str, Any], Dict[str, Any], set]:
+    """Return per-column min, max over non-NULL values of `rows`, and the set
+    of columns whose values cannot be ordered (mixed types).
+
+    Columns missing from min/max are "unknown" to `may_match`.
+    """
+    zmin: Dict[str, Any] = {}
+    zmax: Dict[str, Any] = {}
+    unordered = set()
+    rows = list(rows)
+    for c in columns:
+        vals = [r.get(c) for r in rows]
+        vals = [v for v in vals if v is not None]
+        if not vals:
+            continue
+        try:
+            zmin[c] = min(vals)
+            zmax[c] = max(vals)
+        except TypeError:
+            unordered.add(c)
+    return zmin, zmax, unordered
+
+
+def may_match(zmin: Dict[str, Any], zmax: Dict[str, Any], terms) -> bool:
+    """False only if the zone proves no row can satisfy every term.
+
+    Terms are `Where` predicates with op =, !=, <, <=, >, >= or IN.
+    """
+    for w in terms:
+        lo = zmin.get(w.column)
+        hi = zmax.get(w.column)
+        v = w.value
+        if lo is None or hi is None or v is None:
+            continue
+        op = w.op
+        try:
+            if op == "=":
+                ok = lo <= v <= hi
+            elif op == "<":
+                ok = lo < v
+            elif op == "<=":
+                ok = lo <= v
+            elif op == ">":
+                ok = hi > v
+            elif op == ">=":
+                ok = hi >= v
+            elif op == "IN":
+                ok = any(lo <= x <= hi for x in v if x is not None)
+            else:
+                # !=: only a block holding nothing but `v` is ruled out
+                ok = not (lo == hi == v)
+        except TypeError:
+            continue
+        if not ok:
+            return False
+    return True
+
+
+def write_segment(path: str, rows: List[Dict[str, Any]], columns: Iterable[str],
+                  compression: str = "zlib") -> Dict[str, Any]:
+    """Write `rows` as a compressed segment and return its header."""
+    compress, _ = COMPRESSORS[compression]()
+    zmin, zmax, _ = zone_of(rows, columns)
+    header = {"format": 1, "rows": len(rows), "compression": compression, "min": zmin, "max": zmax}
+    payload = compress(b"".join(codec.dumpb(r) + b"\n" for r in rows))
+    with open(path + ".tmp", "wb") as f:
+        head = codec.dumpb(header) + b"\n"
+        f.write(head)
+        f.write(payload)
+    metrics.record_write(len(head) + len(payload))
+    os.replace(path + ".tmp", path)
+    return header
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return codec.loads(f.readline())
+
+
+def read_segment(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    with open(path, "rb") as f:
+        head = f.readline()
+        header = codec.loads(head)
+        payload = f.read()
+    metrics.record_read(len(head) + len(payload))
+    _, decompress = COMPRESSORS[header.get("compression", "zlib")]()
+    return header, codec.load_lines(decompress(payload))
+
+
+class Block:
+    """In-memory view of a run of rows in storage order with its zone map.
+
+    Open blocks grow with `add` and widen with `widen`; the zone map is kept
+    conservative (deleting a row never narrows it).
+    """
+
+    def __init__(self, pks: List[str], zmin: Dict[str, Any], zmax: Dict[str, Any],
+                 segment: Optional[str] = None, unordered: Optional[set] = None):
+        self.pks = pks
+        self.zmin = zmin
+        self.zmax = zmax
+        # file name of the backing segment, if sealed
+        self.segment = segment
+        # columns whose values cannot be ordered; never tracked in zmin/zmax
+        self.unordered = unordered if unordered is not None else set()
+
+    @classmethod
+    def of_rows(cls, pks: List[str], rows: List[Dict[str, Any]], columns: Iterable[str]) -> "Block":
+        zmin, zmax, unordered = zone_of(rows, columns)
+        return cls(pks, zmin, zmax, unordered=unordered)
+
+    def add(self, pk: str, row: Dict[str, Any]):
+        self.pks.append(pk)
+        self.widen(row)
+
+    def widen(self, row: Dict[str, Any]):
+        zmin, zmax = self.zmin, self.zmax
+        for c, v in row.items():
+            if v is None or c in self.unordered:
+                continue
+            lo = zmin.get(c)
+            try:
+                if lo is None:
+                    zmax[c] = v
+                    zmin[c] = v
+                elif v < lo:
+                    zmin[c] = v
+                elif v > zmax[c]:
+                    zmax[c] = v
+            except TypeError:
+                self.unordered.add(c)
+                zmin.pop(c, None)
+                zmax.pop(c, None)
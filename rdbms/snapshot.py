@@ -0,0 +1,57 @@
+"""Binary per-table checkpoints for fast startup.
+
+A snapshot holds a table's in-memory state (row store, zone maps, segment
+blocks and index structures) plus the inode and length of `data.jsonl` at
+the time it was written. Opening a table reads the snapshot in one call and
+replays only the rows appended to `data.jsonl` since then, instead of
+decoding every row and index file.
+
+The state is encoded with `marshal`, which only handles builtin types and is
+faster to load than pickle. Its format is specific to the Python version, so
+the header records it and snapshots from another version are ignored (the
+table is then loaded from its JSON files and re-snapshotted).
+"""
+import gc
+import marshal
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from . import metrics
+
+MAGIC = f"MINIRDBMS-SNAPSHOT-1 py{sys.version_info[0]}.{sys.version_info[1]} m{marshal.version}\n".encode()
+FILE_NAME = "snapshot.bin"
+
+
+def write(path: str, state: Dict[str, Any]):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    payload = marshal.dumps(state)
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(payload)
+    metrics.record_write(len(MAGIC) + len(payload))
+    os.replace(tmp, path)
+
+
+def read(path: str) -> Optional[Dict[str, Any]]:
+    """Return the snapshot stored at `path`, or None if missing, unreadable or
+    written by another Python version."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    metrics.record_read(len(data))
+    if not data.startswith(MAGIC):
+        return None
+    # decoding allocates millions of containers; pausing the cyclic GC avoids
+    # repeated collections that would dominate the load time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return marshal.loads(memoryview(data)[len(MAGIC):])
+    except (ValueError, EOFError, TypeError):
+        return None
+    finally:
+        if enabled:
+            gc.enable()
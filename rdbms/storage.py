@@ -1,12 +1,56 @@
 import json
 import os
-from typing import Dict, Any, Optional, List
-from datetime import date, datetime
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Any, Iterable, Optional, List, Tuple
 
+from . import codec, metrics, segments, snapshot
 from .catalog import Catalog
-from .exceptions import ConstraintViolation, TableNotFound
-from .index import Index
-from .types import coerce_value
+from .exceptions import ConstraintViolation, IndexErrorRDB, SchemaError, TableNotFound
+from .index import Index, encode_key, prefix_of, scan_prefix
+from .segments import Block
+from .types import column_converter, statement_tokens
+
+
+# tables at least this large write a snapshot after being loaded from JSON
+SNAPSHOT_MIN_ROWS = 10000
+# rows coerced and checked per step of `Table.copy_from`
+COPY_CHUNK_ROWS = 10000
+
+
+def _describe(columns: List[str]) -> str:
+    if len(columns) == 1:
+        return f"column '{columns[0]}'"
+    return f"columns ({', '.join(columns)})"
+
+
+def _index_name(spec: Any) -> str:
+    """Return the name of a schema index entry (str, list or dict)."""
+    if isinstance(spec, dict):
+        return spec.get("name") or "_".join(spec["columns"])
+    return spec if isinstance(spec, str) else "_".join(spec)
+
+
+def index_specs(schema: Dict[str, Any]) -> List[Tuple[str, List[str], bool, List[str]]]:
+    """Return (name, columns, unique, include) for each index in `schema`.
+
+    Index entries are a plain column name, a list of column names for a
+    composite index, or a dict {"columns": [...], "unique": bool, "include": [...]}.
+    """
+    unique_sets = [list(u) for u in schema.get("constraints", {}).get("unique", []) if u]
+    out = []
+    for spec in schema.get("indexes", []):
+        if isinstance(spec, dict):
+            cols = list(spec["columns"])
+            unique = bool(spec.get("unique"))
+            include = spec.get("include", [])
+        else:
+            cols = [spec] if isinstance(spec, str) else list(spec)
+            # plain specs are unique only when they back a UNIQUE constraint
+            unique = cols in unique_sets
+            include = []
+        out.append((_index_name(spec), cols, unique, include))
+    return out
 
 
 class Table:
@@ -14,6 +58,25 @@ class Table:
 
     Data is stored in JSONL where each line is a JSON row. A primary-key index
     is kept in memory for quick lookups; other indexes are persisted via `Index`.
+
+    Rows are grouped into blocks in storage order, each with a zone map
+    (per-column min/max) maintained as rows are appended, so `scan_items`
+    can skip blocks that cannot match a predicate.
+
+    Tables created with the `segmented` storage format keep cold rows in
+    immutable compressed files under `segments/` (see `rdbms.segments`),
+    listed in `segments/manifest.json`; `data.jsonl` only holds the
+    uncompressed tail and is sealed into a new segment every `segment_rows`
+    rows. All rows are still loaded into memory.
+
+    `checkpoint` (also run by `compact`) writes a binary snapshot of the
+    in-memory state (see `rdbms.snapshot`); opening the table then loads the
+    snapshot and replays only the rows appended to data.jsonl since.
+
+    Stored row dicts are never mutated in place (updates swap in a new dict),
+    so readers can work from `list(...)` snapshots without locking. Writers
+    serialize on `lock`, and listeners registered with `add_listener` are
+    called with (op, pk, old_row, new_row) for every change while it is held.
     """
 
     def __init__(self, name: str, catalog: Optional[Catalog] = None):
@@ -24,127 +87,949 @@ class Table:
             raise TableNotFound(f"Table '{name}' not found")
         self.schema = self.catalog.load_schema(name)
         self.data_file = os.path.join(self.path, "data.jsonl")
+        storage = self.schema.get("storage") or {}
+        self.segmented = storage.get("format") == "segmented"
+        self.compression = storage.get("compression", "zlib")
+        self.segment_rows = int(storage.get("segment_rows", segments.DEFAULT_SEGMENT_ROWS))
+        self.segment_dir = os.path.join(self.path, "segments")
+        self.manifest_file = os.path.join(self.segment_dir, "manifest.json")
+        self.snapshot_file = os.path.join(self.path, snapshot.FILE_NAME)
+        # segmented format: sealed blocks in storage order, the row key -> block
+        # map, and the keys of rows in the uncompressed data.jsonl tail
+        self._blocks: List[Block] = []
+        self._block_of: Dict[str, Block] = {}
+        self._tail: List[str] = []
+        self._next_segment = 1
+        # zone maps over rows not sealed in a segment (the whole table for the
+        # jsonl format), in blocks of segments.ZONE_ROWS rows
+        self._zones: List[Block] = []
+        self._zone_of: Dict[str, Block] = {}
+        self.lock = threading.RLock()
+        self._listeners: List[Callable[[str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]] = []
         self.pk_column = None
+        self.pk_columns: List[str] = []
         self.columns = {c["name"]: c for c in self.schema.get("columns", [])}
-        # determine primary key
+        # per-column converters, resolved once instead of per value
+        self._conv: Dict[str, Callable[[Any], Any]] = {n: column_converter(c["type"])
+                                                      for n, c in self.columns.items()}
+        # (name, converter, default) with constant defaults pre-coerced; the
+        # CURRENT_DATE/CURRENT_TIMESTAMP tokens are kept and resolved per statement
+        self._defaults: Tuple[Tuple[str, Callable[[Any], Any], Any], ...] = tuple(
+            (n, self._conv[n], self._resolve_default(c.get("default"), self._conv[n]))
+            for n, c in self.columns.items())
+        # determine primary key; composite keys are stored as JSON-encoded lists
         pk = self.schema.get("constraints", {}).get("primary_key")
         if pk:
-            if len(pk) != 1:
-                raise ValueError("Only single-column primary keys supported in this demo")
-            self.pk_column = pk[0]
-        # load data into memory structures
+            self.pk_columns = list(pk)
+            if len(pk) == 1:
+                self.pk_column = pk[0]
+        self._pk_sorted: Optional[List[str]] = None
+        # sort column -> ([(sort key, pk), ...] ascending, loose), for `page`
+        self._views: Dict[Optional[str], Tuple[List[Tuple[Any, str]], bool]] = {}
+        # load data into memory structures, from the snapshot when it is current
         self._rows: Dict[str, Dict[str, Any]] = {}
-        self._load_data()
-        # indexes
+        snap, appended = self._open_snapshot()
+        if snap is not None:
+            self._restore(snap)
+        else:
+            self._load_data()
+        snap_indexes = snap["indexes"] if snap is not None else {}
         self.indexes: Dict[str, Index] = {}
-        for col in self.schema.get("indexes", []):
-            idx_path = os.path.join(self.path, f"index_{col}.json")
-            self.indexes[col] = Index(idx_path, col)
+        for name, cols, unique, include in index_specs(self.schema):
+            idx_path = os.path.join(self.path, f"index_{name}.json")
+            state = snap_indexes.get(name)
+            if state is not None and (state["columns"], state["unique"], state["include"]) == (cols, unique, include):
+                idx = Index(idx_path, cols, unique=unique, include=include, load=False)
+                idx.restore(state)
+                self.indexes[name] = idx
+                continue
+            try:
+                self.indexes[name] = Index(idx_path, cols, unique=unique, include=include)
+            except IndexErrorRDB:
+                # unreadable index file: rebuild it from the row data
+                idx = Index(idx_path, cols, unique=unique, include=include, load=False)
+                idx.build(self._rows.items())
+                self.indexes[name] = idx
+        if snap is not None:
+            self._replay(appended)
+        elif len(self._rows) >= SNAPSHOT_MIN_ROWS:
+            try:
+                self.checkpoint()
+            except OSError:
+                pass
+        self._sig = self._stat()
+
+    def _stat(self):
+        sig = []
+        paths = [os.path.join(self.path, "schema.json"), self.data_file]
+        if self.segmented:
+            paths.append(self.manifest_file)
+        for p in paths:
+            try:
+                st = os.stat(p)
+                sig.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def is_stale(self) -> bool:
+        """True if schema.json, data.jsonl or the segment manifest changed on disk
+        since this object last wrote them."""
+        return self._stat() != self._sig
+
+    def add_listener(self, fn: Callable[[str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]):
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def _notify(self, op: str, pk: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        for fn in list(self._listeners):
+            fn(op, pk, old, new)
+
+    @staticmethod
+    def _resolve_default(default: Any, conv: Callable[[Any], Any]) -> Any:
+        if default is None or default in ("CURRENT_DATE", "CURRENT_TIMESTAMP"):
+            return default
+        return conv(default)
+
+    def encode_row(self, row: Dict[str, Any], tokens: Dict[str, str]) -> Dict[str, Any]:
+        """Coerce an input row to a stored record using the precompiled converters.
+
+        `tokens` (from `statement_tokens`) supplies the CURRENT_DATE and
+        CURRENT_TIMESTAMP values for the running statement.
+        """
+        record: Dict[str, Any] = {}
+        for name, conv, default in self._defaults:
+            if name in row:
+                val = row[name]
+                if val is None:
+                    record[name] = None
+                    continue
+                if val.__class__ is str and val in tokens:
+                    val = tokens[val]
+                record[name] = conv(val)
+            else:
+                record[name] = tokens.get(default, default) if default.__class__ is str else default
+        return record
+
+    def pk_key(self, value: Any) -> str:
+        """Return the internal row key for a primary-key value.
+
+        Composite keys take a list/tuple of values in primary-key column order.
+        """
+        if len(self.pk_columns) > 1:
+            vals = [self._conv[c](v) for c, v in zip(self.pk_columns, value)]
+            return encode_key(vals)
+        return str(value)
+
+    def pk_values(self, pk: str) -> Dict[str, Any]:
+        """Decode an internal row key back into its primary-key column values."""
+        if len(self.pk_columns) > 1:
+            return dict(zip(self.pk_columns, json.loads(pk)))
+        return {self.pk_column: self._conv[self.pk_column](pk)}
+
+    def _pk_of(self, row: Dict[str, Any]) -> str:
+        if len(self.pk_columns) > 1:
+            return encode_key([row.get(c) for c in self.pk_columns])
+        return str(row.get(self.pk_column))
+
+    def pk_prefix_lookup(self, values: List[Any]) -> List[str]:
+        """Return row keys whose leading primary-key columns equal `values`."""
+        if len(values) >= len(self.pk_columns):
+            pk = self.pk_key(values if len(self.pk_columns) > 1 else values[0])
+            return [pk] if pk in self._rows else []
+        if self._pk_sorted is None:
+            self._pk_sorted = sorted(self._rows)
+        vals = [self._conv[c](v) for c, v in zip(self.pk_columns, values)]
+        return list(scan_prefix(self._pk_sorted, prefix_of(vals)))
+
+    def _sort_key(self, row: Dict[str, Any], column: Optional[str]) -> Tuple[Any, ...]:
+        if column is None:
+            return tuple(row.get(c) for c in self.pk_columns)
+        v = row.get(column)
+        # NULLs sort last
+        return (v is None, v)
+
+    @staticmethod
+    def _loose_key(key: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        return tuple((type(v).__name__, str(v)) for v in key)
+
+    def _view(self, column: Optional[str]) -> Tuple[List[Tuple[Any, str]], bool]:
+        """Return (sort key, pk) pairs of every row ordered by `column` (the
+        primary key if None), ties broken by primary key, and whether the keys
+        are "loose" (mixed value types compared by type name and text).
+
+        The view is built once and reused until the rows change.
+        """
+        cached = self._views.get(column)
+        if cached is None:
+            key = self._sort_key
+            view = [(key(row, column), pk) for pk, row in self._rows.items()]
+            loose = False
+            try:
+                view.sort()
+            except TypeError:
+                # mixed value types in the column (legacy data)
+                view = sorted((self._loose_key(k), pk) for k, pk in view)
+                loose = True
+            cached = self._views[column] = (view, loose)
+        return cached
+
+    def page(self, column: Optional[str] = None, descending: bool = False,
+             after: Optional[Tuple[str, Any]] = None, before: Optional[Tuple[str, Any]] = None,
+             limit: int = 50) -> Dict[str, Any]:
+        """Return one page of rows ordered by `column` (keyset pagination).
+
+        `after`/`before` are (row key, `column` value) cursors of the last/first
+        row of the neighbouring page; the value is ignored when ordering by
+        primary key. Cursors stay valid if that row is deleted. Finding the
+        page is a binary search in a sorted view cached until the next write,
+        so its cost does not grow with the page number.
+
+        Returns {"rows": [(pk, row), ...], "offset", "total", "has_prev", "has_next"}.
+        """
+        if column is not None and column not in self.columns:
+            raise SchemaError(f"Unknown column '{column}'")
+        with self.lock:
+            view, loose = self._view(column)
+            rows = self._rows
+            n = len(view)
+
+            def position(cursor: Tuple[str, Any], right: bool) -> int:
+                pk, value = str(cursor[0]), cursor[1]
+                if column is None:
+                    key = self._sort_key(self.pk_values(pk), None)
+                else:
+                    if value is not None and not loose:
+                        value = self._conv[column](value)
+                    key = (value is None, value)
+                if loose:
+                    key = self._loose_key(key)
+                return (bisect_right if right else bisect_left)(view, (key, pk))
+
+            # [lo, hi) of the ascending view, walked backwards when descending
+            if after is not None:
+                if descending:
+                    hi = position(after, False)
+                    lo = max(0, hi - limit)
+                else:
+                    lo = position(after, True)
+                    hi = min(n, lo + limit)
+            elif before is not None:
+                if descending:
+                    lo = position(before, True)
+                    hi = min(n, lo + limit)
+                else:
+                    hi = position(before, False)
+                    lo = max(0, hi - limit)
+            elif descending:
+                hi, lo = n, max(0, n - limit)
+            else:
+                lo, hi = 0, min(n, limit)
+            chunk = view[lo:hi]
+            if descending:
+                chunk.reverse()
+            return {
+                "rows": [(pk, rows[pk]) for _, pk in chunk],
+                "offset": n - hi if descending else lo,
+                "total": n,
+                "has_prev": hi < n if descending else lo > 0,
+                "has_next": lo > 0 if descending else hi < n,
+            }
 
     def _load_data(self):
-        if not os.path.exists(self.data_file):
+        if self.segmented:
+            self._load_segments()
+        elif not os.path.exists(self.data_file):
             self._rows = {}
-            return
+        else:
+            if not self.pk_columns:
+                # assign synthetic pk by line number (not ideal)
+                raise ValueError("Tables must have a primary key for this storage layer")
+            with open(self.data_file, "rb") as f:
+                raw = f.read()
+            metrics.record_read(len(raw))
+            objs = codec.load_lines(raw)
+            # later lines win, matching the append-only write path
+            pk_of = self._pk_of
+            self._rows = {pk_of(obj): obj for obj in objs}
+        self._rebuild_zones()
+
+    def _snapshot_schema(self) -> Dict[str, Any]:
+        return {k: self.schema.get(k) for k in ("columns", "constraints", "storage")}
+
+    def _open_snapshot(self) -> Tuple[Optional[Dict[str, Any]], bytes]:
+        """Return the table snapshot and the data.jsonl bytes appended after it,
+        or (None, b"") if there is no snapshot or the files were rewritten since."""
+        snap = snapshot.read(self.snapshot_file)
+        if snap is None or snap.get("schema") != self._snapshot_schema():
+            return None, b""
+        if self.segmented and snap["manifest"] != self._stat()[2]:
+            return None, b""
+        data = snap["data"]
+        try:
+            with open(self.data_file, "rb") as f:
+                st = os.fstat(f.fileno())
+                if data is None or st.st_ino != data["ino"] or st.st_size < data["offset"]:
+                    return None, b""
+                # guard against inode reuse by a rewritten file
+                f.seek(data["offset"] - len(data["check"]))
+                if f.read(len(data["check"])) != data["check"]:
+                    return None, b""
+                appended = f.read()
+                metrics.record_read(len(appended))
+                return snap, appended
+        except FileNotFoundError:
+            return (snap, b"") if data is None else (None, b"")
+
+    def _restore(self, snap: Dict[str, Any]):
+        self._rows = snap["rows"]
+        self._blocks = [Block(pks, zmin, zmax, seg) for pks, zmin, zmax, seg in snap["blocks"]]
+        self._block_of = {pk: b for b in self._blocks for pk in b.pks}
+        self._zones = [Block(pks, zmin, zmax, unordered=u) for pks, zmin, zmax, u in snap["zones"]]
+        self._zone_of = {pk: z for z in self._zones for pk in z.pks}
+        self._tail = snap["tail"]
+        self._next_segment = snap["next_segment"]
+
+    def _replay(self, appended: bytes):
+        """Apply rows appended to data.jsonl after the snapshot was taken."""
+        for obj in codec.load_lines(appended):
+            pk = self._pk_of(obj)
+            old = self._rows.get(pk)
+            for idx in self.indexes.values():
+                if old is not None:
+                    idx.remove_row(old, pk, persist=False)
+                idx.add_row(obj, pk, persist=False)
+            self._rows[pk] = obj
+            if old is None:
+                self._zone_add(pk, obj)
+                if self.segmented:
+                    self._tail.append(pk)
+            elif pk in self._zone_of:
+                self._zone_of[pk].widen(obj)
+
+    def checkpoint(self):
+        """Write a binary snapshot of the rows, zone maps and indexes."""
+        with self.lock:
+            data = None
+            if os.path.exists(self.data_file):
+                with open(self.data_file, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    f.seek(max(0, st.st_size - 64))
+                    data = {"ino": st.st_ino, "offset": st.st_size, "check": f.read()}
+            snapshot.write(self.snapshot_file, {
+                "schema": self._snapshot_schema(),
+                "data": data,
+                "manifest": self._stat()[2] if self.segmented else None,
+                "rows": self._rows,
+                "blocks": [(b.pks, b.zmin, b.zmax, b.segment) for b in self._blocks],
+                "zones": [(z.pks, z.zmin, z.zmax, z.unordered) for z in self._zones],
+                "tail": self._tail,
+                "next_segment": self._next_segment,
+                "indexes": {name: idx.state() for name, idx in self.indexes.items()},
+            })
+
+    def _rebuild_zones(self):
+        """Regroup the rows not sealed in segments into zone-map blocks."""
+        rows = self._rows
+        pks = self._tail if self.segmented else list(rows)
+        size = segments.ZONE_ROWS
+        zones = [Block.of_rows(pks[i:i + size], [rows[pk] for pk in pks[i:i + size]], self.columns)
+                 for i in range(0, len(pks), size)]
+        self._zone_of = {pk: z for z in zones for pk in z.pks}
+        self._zones = zones
+
+    def _zone_add(self, pk: str, row: Dict[str, Any]):
+        zone = self._zones[-1] if self._zones else None
+        if zone is None or len(zone.pks) >= segments.ZONE_ROWS:
+            zone = Block([], {}, {})
+            self._zones.append(zone)
+        zone.add(pk, row)
+        self._zone_of[pk] = zone
+
+    def _zones_remove(self, pks: Iterable[str]):
+        gone: Dict[int, Tuple[Block, set]] = {}
+        for pk in pks:
+            zone = self._zone_of.pop(pk, None)
+            if zone is not None:
+                gone.setdefault(id(zone), (zone, set()))[1].add(pk)
+        for zone, keys in gone.values():
+            # swap in a new list so concurrent scans keep a consistent view
+            zone.pks = [pk for pk in zone.pks if pk not in keys]
+
+    def _load_segments(self):
+        pk_of = self._pk_of
         rows: Dict[str, Dict[str, Any]] = {}
-        with open(self.data_file, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                obj = json.loads(line)
-                if self.pk_column is None:
-                    # assign synthetic pk by line number (not ideal)
-                    raise ValueError("Tables must have a primary key for this storage layer")
-                pk = str(obj.get(self.pk_column))
-                rows[pk] = obj
+        self._blocks, self._block_of, self._tail = [], {}, []
+        manifest: Dict[str, Any] = {"segments": []}
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, "rb") as f:
+                raw = f.read()
+            metrics.record_read(len(raw))
+            manifest = codec.loads(raw)
+        for name in manifest["segments"]:
+            header, objs = segments.read_segment(os.path.join(self.segment_dir, name))
+            block = Block([pk_of(obj) for obj in objs], header["min"], header["max"], name)
+            rows.update(zip(block.pks, objs))
+            self._blocks.append(block)
+            self._block_of.update(dict.fromkeys(block.pks, block))
+            self._next_segment = max(self._next_segment, int(name[4:-4]) + 1)
+        objs = []
+        if os.path.exists(self.data_file):
+            with open(self.data_file, "rb") as f:
+                raw = f.read()
+            metrics.record_read(len(raw))
+            objs = codec.load_lines(raw)
+            # rows the manifest says were sealed but not yet cut from the tail
+            skip = manifest.get("tail")
+            if skip and skip["ino"] == os.stat(self.data_file).st_ino:
+                objs = objs[skip["rows"]:]
+        tail: Dict[str, None] = {}
+        for obj in objs:
+            pk = pk_of(obj)
+            block = self._block_of.pop(pk, None)
+            if block is not None:
+                block.pks.remove(pk)
+            rows[pk] = obj
+            tail[pk] = None
+        self._tail = list(tail)
         self._rows = rows
 
-    def _persist_all(self):
+    def _persist_all(self, changed: Optional[Iterable[str]] = None):
+        """Write the in-memory rows back to disk.
+
+        `changed` lists the keys of updated or deleted rows; segmented tables
+        use it to rewrite only the segments holding them.
+        """
+        if self.segmented:
+            if changed is None:
+                self.compact()
+            else:
+                self._persist_segments(list(changed))
+            return
         # rewrite entire data file from in-memory rows
-        with open(self.data_file + ".tmp", "w", encoding="utf-8") as f:
-            for row in self._rows.values():
-                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        dumpb = codec.dumpb
+        payload = b"".join(dumpb(row) + b"\n" for row in list(self._rows.values()))
+        with open(self.data_file + ".tmp", "wb") as f:
+            f.write(payload)
+        metrics.record_write(len(payload))
         os.replace(self.data_file + ".tmp", self.data_file)
+        self._sig = self._stat()
+
+    def _write_block(self, pks: List[str]) -> Block:
+        name = f"seg_{self._next_segment:08d}.seg"
+        self._next_segment += 1
+        os.makedirs(self.segment_dir, exist_ok=True)
+        header = segments.write_segment(os.path.join(self.segment_dir, name), [self._rows[pk] for pk in pks],
+                                        self.columns, self.compression)
+        block = Block(pks, header["min"], header["max"], name)
+        for pk in pks:
+            self._block_of[pk] = block
+        return block
+
+    def _write_tail(self):
+        dumpb = codec.dumpb
+        rows = self._rows
+        payload = b"".join(dumpb(rows[pk]) + b"\n" for pk in self._tail)
+        with open(self.data_file + ".tmp", "wb") as f:
+            f.write(payload)
+        metrics.record_write(len(payload))
+        os.replace(self.data_file + ".tmp", self.data_file)
+
+    def _write_manifest(self, sealed_tail_rows: int = 0):
+        # sealed_tail_rows: leading data.jsonl rows already copied into segments,
+        # skipped on load if a crash happens before the tail is rewritten
+        manifest: Dict[str, Any] = {"segments": [b.segment for b in self._blocks]}
+        if sealed_tail_rows and os.path.exists(self.data_file):
+            manifest["tail"] = {"ino": os.stat(self.data_file).st_ino, "rows": sealed_tail_rows}
+        os.makedirs(self.segment_dir, exist_ok=True)
+        payload = codec.dumpb(manifest)
+        with open(self.manifest_file + ".tmp", "wb") as f:
+            f.write(payload)
+        metrics.record_write(len(payload))
+        os.replace(self.manifest_file + ".tmp", self.manifest_file)
+
+    def _replace_blocks(self, blocks: List[Block], old: List[Block], sealed_tail_rows: int = 0):
+        """Publish a new block list, then cut the sealed rows from the tail and
+        delete the segment files of `old` blocks."""
+        self._blocks = blocks
+        self._write_manifest(sealed_tail_rows)
+        if sealed_tail_rows:
+            self._write_tail()
+            self._write_manifest()
+        for b in old:
+            try:
+                os.remove(os.path.join(self.segment_dir, b.segment))
+            except FileNotFoundError:
+                pass
+        self._sig = self._stat()
+
+    def _seal(self):
+        """Move full `segment_rows` chunks from the front of the tail into new segments."""
+        size = self.segment_rows
+        n = len(self._tail) - len(self._tail) % size
+        if not n:
+            return
+        new = [self._write_block(self._tail[i:i + size]) for i in range(0, n, size)]
+        self._tail = self._tail[n:]
+        self._rebuild_zones()
+        self._replace_blocks(self._blocks + new, [], sealed_tail_rows=n)
+
+    def _persist_segments(self, changed: List[str]):
+        rows = self._rows
+        dirty = {id(self._block_of[pk]) for pk in changed if pk in self._block_of}
+        blocks: List[Block] = []
+        old: List[Block] = []
+        for b in self._blocks:
+            if id(b) not in dirty:
+                blocks.append(b)
+                continue
+            old.append(b)
+            live = [pk for pk in b.pks if pk in rows]
+            if live:
+                blocks.append(self._write_block(live))
+        for pk in changed:
+            if pk not in rows:
+                self._block_of.pop(pk, None)
+        if any(pk not in self._block_of for pk in changed):
+            self._tail = [pk for pk in self._tail if pk in rows]
+            self._write_tail()
+            self._rebuild_zones()
+        self._replace_blocks(blocks, old)
+
+    def compact(self):
+        """Rewrite the table's data files and write a snapshot.
+
+        Segmented tables are repacked as full segments with the tail folded
+        in; the last segment may hold fewer than `segment_rows` rows.
+        """
+        with self.lock:
+            if not self.segmented:
+                self._persist_all()
+                self.checkpoint()
+                return
+            size = self.segment_rows
+            pks = list(self._rows)
+            old, tail_rows = self._blocks, len(self._tail)
+            self._block_of = {}
+            new = [self._write_block(pks[i:i + size]) for i in range(0, len(pks), size)]
+            self._tail = []
+            self._rebuild_zones()
+            if tail_rows:
+                self._replace_blocks(new, old, sealed_tail_rows=tail_rows)
+            else:
+                self._replace_blocks(new, old)
+            self.checkpoint()
 
     def insert(self, row: Dict[str, Any]):
-        # coerce types and validate
-        if self.pk_column is None:
+        self.insert_many([row])
+
+    def insert_many(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Validate and insert rows as one batch: one append to the data file
+        and one persist per index. Nothing is written if any row is rejected.
+        """
+        if not self.pk_columns:
             raise ValueError("Table has no primary key defined")
-        pk_val = row.get(self.pk_column)
-        if pk_val is None:
-            raise ConstraintViolation(f"Primary key '{self.pk_column}' must be provided")
-        pk = str(coerce_value(pk_val, self.columns[self.pk_column]["type"]))
-        if pk in self._rows:
-            raise ConstraintViolation(f"PRIMARY KEY violation: {pk} already exists")
-        # check uniqueness for indexed columns (single-column UNIQUE support)
-        for col, idx in self.indexes.items():
-            v = row.get(col, self.columns[col].get("default"))
-            # support CURRENT_DATE / CURRENT_TIMESTAMP default tokens
-            if v == "CURRENT_DATE":
-                v = date.today().isoformat()
-            elif v == "CURRENT_TIMESTAMP":
-                v = datetime.now().replace(microsecond=0).isoformat()
-            if v is not None:
-                try:
-                    if idx.lookup(v):
-                        raise ConstraintViolation(f"UNIQUE constraint violation on column '{col}': {v}")
-                except Exception:
-                    pass
-        # coerce other columns
-        record: Dict[str, Any] = {}
-        for name, col in self.columns.items():
-            val = row.get(name, col.get("default"))
-            # support CURRENT_DATE / CURRENT_TIMESTAMP default tokens
-            if val == "CURRENT_DATE":
-                val = date.today().isoformat()
-            elif val == "CURRENT_TIMESTAMP":
-                val = datetime.now().replace(microsecond=0).isoformat()
-            if val is None:
-                record[name] = None
-            else:
-                record[name] = coerce_value(val, col["type"])
-        # persist append
-        with open(self.data_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-        self._rows[pk] = record
-        # update indexes
-        for col, idx in self.indexes.items():
-            idx.add(record.get(col), pk)
+        with self.lock:
+            records = self._check_batch(rows, statement_tokens())
+            if not records:
+                return 0
+            self._append(records)
+            for idx in self.indexes.values():
+                idx.flush()
+            self._sig = self._stat()
+            return len(records)
+
+    def copy_from(self, rows: Iterable[Dict[str, Any]], chunk_rows: int = COPY_CHUNK_ROWS) -> int:
+        """Bulk-load `rows` (e.g. streamed from a file) in chunks of `chunk_rows`.
+
+        Each chunk is coerced and checked against the table and the rows
+        loaded before it, then appended to the data file; indexes are written
+        once at the end. Only one chunk of input is held at a time besides the
+        table itself. If a row is rejected, the rows already loaded are
+        deleted again, so the load is all-or-nothing.
+        """
+        if not self.pk_columns:
+            raise ValueError("Table has no primary key defined")
+        with self.lock:
+            tokens = statement_tokens()
+            loaded: List[str] = []
+            chunk: List[Dict[str, Any]] = []
+            try:
+                for row in rows:
+                    chunk.append(row)
+                    if len(chunk) >= chunk_rows:
+                        loaded.extend(self._copy_chunk(chunk, tokens, len(loaded)))
+                        chunk = []
+                if chunk:
+                    loaded.extend(self._copy_chunk(chunk, tokens, len(loaded)))
+            except Exception:
+                if loaded:
+                    self.delete_many(loaded)
+                raise
+            if loaded:
+                for idx in self.indexes.values():
+                    idx.flush()
+                self._sig = self._stat()
+            return len(loaded)
+
+    def _copy_chunk(self, chunk: List[Dict[str, Any]], tokens: Dict[str, str], done: int) -> List[str]:
+        seen = 0
+
+        def counted():
+            nonlocal seen
+            for row in chunk:
+                seen += 1
+                yield row
+
+        try:
+            records = self._check_batch(counted(), tokens)
+        except (ConstraintViolation, ValueError, TypeError) as e:
+            # the check stops at the offending row, so `seen` is its position in the chunk
+            raise type(e)(f"row {done + seen}: {e}") from e
+        self._append(records)
+        return [pk for pk, _ in records]
+
+    def _check_batch(self, rows: Iterable[Dict[str, Any]], tokens: Dict[str, str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Coerce rows to records and check PRIMARY KEY and UNIQUE constraints
+        against the table and the rest of the batch; returns (pk, record) pairs."""
+        unique = [(name, idx) for name, idx in self.indexes.items() if idx.unique]
+        batch_keys: Dict[str, set] = {name: set() for name, _ in unique}
+        records: List[Tuple[str, Dict[str, Any]]] = []
+        batch_pks = set()
+        for row in rows:
+            for c in self.pk_columns:
+                if row.get(c) is None:
+                    raise ConstraintViolation(f"Primary key '{c}' must be provided")
+            record = self.encode_row(row, tokens)
+            pk = self._pk_of(record)
+            if pk in self._rows or pk in batch_pks:
+                raise ConstraintViolation(f"PRIMARY KEY violation: {pk} already exists")
+            batch_pks.add(pk)
+            # check uniqueness for UNIQUE indexes (single or multi-column)
+            for name, idx in unique:
+                key = idx.key_for_row(record)
+                if key is None:
+                    continue
+                if key in batch_keys[name] or idx.lookup_key(key):
+                    raise ConstraintViolation(f"UNIQUE constraint violation on {_describe(idx.columns)}: {key}")
+                batch_keys[name].add(key)
+            records.append((pk, record))
+        return records
+
+    def _append(self, records: List[Tuple[str, Dict[str, Any]]]):
+        """Append checked records to the data file and apply them in memory.
+
+        Indexes are updated in memory only; callers flush them.
+        """
+        dumpb = codec.dumpb
+        payload = b"".join(dumpb(r) + b"\n" for _, r in records)
+        with open(self.data_file, "ab") as f:
+            f.write(payload)
+        metrics.record_write(len(payload))
+        for pk, record in records:
+            self._rows[pk] = record
+            self._zone_add(pk, record)
+        self._pk_sorted = None
+        self._views = {}
+        if self.segmented:
+            self._tail.extend(pk for pk, _ in records)
+            self._seal()
+        for idx in self.indexes.values():
+            for pk, record in records:
+                idx.add_row(record, pk, persist=False)
+        for pk, record in records:
+            self._notify("insert", pk, None, record)
+
+    def create_index(self, name: str, columns: List[str], unique: bool = False,
+                     include: Optional[List[str]] = None):
+        """Build a secondary index over existing rows and register it in the schema.
+
+        The index is built in one pass over the rows and persisted once.
+        """
+        with self.lock:
+            idx = self._new_index(name, columns, unique, include)
+            try:
+                idx.build(self._rows.items())
+            except ConstraintViolation:
+                if os.path.exists(idx.path):
+                    os.remove(idx.path)
+                raise
+            self._install_index(name, idx)
+
+    def create_index_online(self, name: str, columns: List[str], unique: bool = False,
+                            include: Optional[List[str]] = None) -> "IndexBuild":
+        """Build an index in a background thread without blocking writers.
+
+        The build works from a snapshot of the rows taken under the lock while a
+        listener records concurrent changes; the change log is replayed under
+        the lock before the index is persisted and registered.
+        """
+        with self.lock:
+            idx = self._new_index(name, columns, unique, include)
+            build = IndexBuild(self.name, name)
+            changes: List[tuple] = []
+
+            def record(op, pk, old, new):
+                changes.append((pk, old, new))
+
+            self.add_listener(record)
+            snapshot = list(self._rows.items())
+
+        def run():
+            try:
+                idx.build(snapshot, persist=False)
+                with self.lock:
+                    self.remove_listener(record)
+                    for pk, old, new in changes:
+                        if old is not None:
+                            idx.remove_row(old, pk, persist=False)
+                        if new is not None:
+                            key = idx.key_for_row(new)
+                            if idx.unique and key is not None and idx.lookup_key(key) - {pk}:
+                                raise ConstraintViolation(
+                                    f"Cannot build unique index on {idx.columns}: duplicate key {key}")
+                            idx.add_row(new, pk, persist=False)
+                    idx.flush()
+                    self._install_index(name, idx)
+                build.state = "ready"
+            except Exception as e:
+                self.remove_listener(record)
+                build.state = "failed"
+                build.error = str(e)
+
+        build.thread = threading.Thread(target=run, name=f"index-build-{self.name}-{name}", daemon=True)
+        build.thread.start()
+        return build
+
+    def _new_index(self, name: str, columns: List[str], unique: bool, include: Optional[List[str]]) -> Index:
+        if name in self.indexes:
+            raise SchemaError(f"Index '{name}' already exists on table '{self.name}'")
+        for c in list(columns) + list(include or []):
+            if c not in self.columns:
+                raise SchemaError(f"Unknown column '{c}' in index '{name}'")
+        idx_path = os.path.join(self.path, f"index_{name}.json")
+        return Index(idx_path, columns, unique=unique, include=include, load=False)
+
+    def _install_index(self, name: str, idx: Index):
+        spec: Dict[str, Any] = {"name": name, "columns": list(idx.columns), "unique": idx.unique}
+        if idx.include:
+            spec["include"] = list(idx.include)
+        # the catalog shares its cached schema: replace it, never modify it in place
+        self.schema = {**self.schema, "indexes": list(self.schema.get("indexes", [])) + [spec]}
+        self.catalog.save_schema(self.name, self.schema)
+        self.indexes[name] = idx
+        self._sig = self._stat()
+
+    def drop_index(self, name: str):
+        with self.lock:
+            if name not in self.indexes:
+                raise SchemaError(f"Index '{name}' not found on table '{self.name}'")
+            idx = self.indexes.pop(name)
+            self.schema = {**self.schema,
+                           "indexes": [s for s in self.schema.get("indexes", []) if _index_name(s) != name]}
+            self.catalog.save_schema(self.name, self.schema)
+            self._sig = self._stat()
+            if os.path.exists(idx.path):
+                os.remove(idx.path)
+
+    def reindex(self, names: Optional[List[str]] = None):
+        """Rebuild indexes (all, or those in `names`) from data.jsonl.
+
+        Each index is built into a fresh object and its file is replaced
+        atomically, so a failed rebuild leaves the previous index in place.
+        """
+        with self.lock:
+            names = list(self.indexes) if names is None else names
+            for name in names:
+                if name not in self.indexes:
+                    raise SchemaError(f"Index '{name}' not found on table '{self.name}'")
+            self._load_data()
+            self._pk_sorted = None
+            self._views = {}
+            self._sig = self._stat()
+            for name in names:
+                old = self.indexes[name]
+                idx = Index(old.path, old.columns, unique=old.unique, include=old.include, load=False)
+                idx.build(self._rows.items())
+                self.indexes[name] = idx
 
     def get(self, pk: Any) -> Optional[Dict[str, Any]]:
+        if isinstance(pk, (list, tuple)):
+            pk = self.pk_key(pk)
         return self._rows.get(str(pk))
 
     def scan(self) -> List[Dict[str, Any]]:
         return list(self._rows.values())
 
+    def scan_items(self, terms=None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return (row key, row) pairs for a full scan filtered by `terms`.
+
+        Blocks (sealed segments and in-memory zones) whose min/max cannot
+        satisfy `terms` are skipped; callers must still check every returned row.
+        """
+        rows = self._rows
+        if not terms:
+            return list(rows.items())
+        out: List[Tuple[str, Dict[str, Any]]] = []
+        blocks = list(self._blocks) + list(self._zones)
+        kept = 0
+        for b in blocks:
+            if segments.may_match(b.zmin, b.zmax, terms):
+                kept += 1
+                out.extend((pk, rows[pk]) for pk in b.pks if pk in rows)
+        prof = metrics.current()
+        prof.blocks_scanned += kept
+        prof.blocks_skipped += len(blocks) - kept
+        return out
+
+    def zone_estimate(self, terms) -> Tuple[int, int, int]:
+        """Return (blocks that may match `terms`, total blocks, rows in the
+        matching blocks) for a full scan, without reading any rows."""
+        blocks = list(self._blocks) + list(self._zones)
+        kept = [b for b in blocks if not terms or segments.may_match(b.zmin, b.zmax, terms)]
+        return len(kept), len(blocks), sum(len(b.pks) for b in kept)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
     def delete(self, pk: Any):
-        pk = str(pk)
-        if pk not in self._rows:
-            return False
-        row = self._rows.pop(pk)
-        # update indexes
-        for col, idx in self.indexes.items():
-            idx.remove(row.get(col), pk)
-        self._persist_all()
-        return True
+        return self.delete_many([pk]) == 1
+
+    def delete_many(self, pks: Iterable[Any]) -> int:
+        """Delete rows by key, writing the data file and each index once."""
+        with self.lock:
+            removed: List[Tuple[str, Dict[str, Any]]] = []
+            for pk in pks:
+                pk = str(pk)
+                row = self._rows.pop(pk, None)
+                if row is None:
+                    continue
+                removed.append((pk, row))
+                for idx in self.indexes.values():
+                    idx.remove_row(row, pk, persist=False)
+            if not removed:
+                return 0
+            self._pk_sorted = None
+            self._views = {}
+            self._zones_remove(pk for pk, _ in removed)
+            for idx in self.indexes.values():
+                idx.flush()
+            self._persist_all([pk for pk, _ in removed])
+            for pk, row in removed:
+                self._notify("delete", pk, row, None)
+            return len(removed)
 
     def update(self, pk: Any, changes: Dict[str, Any]):
-        pk = str(pk)
+        self.update_many([pk], changes)
+
+    def update_many(self, pks: Iterable[Any], changes: Dict[str, Any]) -> int:
+        """Apply the same `changes` to every row in `pks`.
+
+        Changes are coerced once for the statement, and the data file and
+        touched indexes are written once at the end.
+        """
+        with self.lock:
+            tokens = statement_tokens()
+            values: Dict[str, Any] = {}
+            for name, val in changes.items():
+                if name not in self.columns:
+                    raise KeyError(f"Unknown column {name}")
+                if val.__class__ is str and val in tokens:
+                    val = tokens[val]
+                values[name] = None if val is None else self._conv[name](val)
+            keyed = [c for c in self.pk_columns if c in values]
+            if keyed:
+                # rows are stored, indexed, zoned and logged under their key, so
+                # the key of a row never changes; checked before anything is applied
+                pks = [str(pk) for pk in pks]
+                for pk in pks:
+                    row = self._rows.get(pk)
+                    if row is not None and any(row.get(c) != values[c] for c in keyed):
+                        raise ConstraintViolation(f"Cannot update primary key {_describe(keyed)}; "
+                                                  "delete the row and insert it again")
+            touched = [idx for idx in self.indexes.values()
+                       if any(c in values for c in idx.columns + idx.include)]
+            done: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+            try:
+                for pk in pks:
+                    pk = str(pk)
+                    old, new = self._apply_update(pk, values, touched)
+                    done.append((pk, old, new))
+            finally:
+                # persist whatever was applied, even if a later row was rejected
+                self._finish_update(done, touched, values)
+            return len(done)
+
+    def update_rows(self, changes: Iterable[Tuple[Any, Dict[str, Any]]]) -> int:
+        """Apply per-row `(pk, values)` changes whose values are already in
+        stored form (e.g. rows from a replication log), writing the data file
+        and indexes once."""
+        with self.lock:
+            touched = list(self.indexes.values())
+            done: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+            columns = set()
+            try:
+                for pk, values in changes:
+                    pk = str(pk)
+                    old, new = self._apply_update(pk, values, touched)
+                    done.append((pk, old, new))
+                    columns.update(values)
+            finally:
+                self._finish_update(done, touched, columns)
+            return len(done)
+
+    def _finish_update(self, done: List[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+                       touched: List[Index], columns: Iterable[str]):
+        if not done:
+            return
+        for col in columns:
+            self._views.pop(col, None)
+        for idx in touched:
+            idx.flush()
+        self._persist_all([pk for pk, _, _ in done])
+        for pk, old, new in done:
+            self._notify("update", pk, old, new)
+
+    def _apply_update(self, pk: str, values: Dict[str, Any], touched: List[Index]):
         if pk not in self._rows:
             raise KeyError(f"Row with pk={pk} not found")
         row = self._rows[pk]
-        # apply changes with coercion
-        for name, val in changes.items():
-            if name not in self.columns:
-                raise KeyError(f"Unknown column {name}")
-            newv = None if val is None else coerce_value(val, self.columns[name]["type"])
-            # enforce uniqueness on indexed columns
-            if name in self.indexes:
-                existing = self.indexes[name].lookup(newv)
-                # if there's any other pk with this value, violation
-                if existing and not (len(existing) == 1 and pk in existing):
-                    raise ConstraintViolation(f"UNIQUE constraint violation on column '{name}': {newv}")
-                self.indexes[name].remove(row.get(name), pk)
-                self.indexes[name].add(newv, pk)
-            row[name] = newv
-        self._persist_all()
+        new_row = dict(row)
+        new_row.update(values)
+        # enforce uniqueness on indexes covering changed columns
+        for idx in touched:
+            if not idx.unique:
+                continue
+            key = idx.key_for_row(new_row)
+            existing = idx.lookup_key(key) if key is not None else set()
+            # if there's any other pk with this value, violation
+            if existing and not (len(existing) == 1 and pk in existing):
+                raise ConstraintViolation(f"UNIQUE constraint violation on {_describe(idx.columns)}: {key}")
+        for idx in touched:
+            idx.remove_row(row, pk, persist=False)
+            idx.add_row(new_row, pk, persist=False)
+        # swap in a new dict so snapshots held by readers stay consistent
+        self._rows[pk] = new_row
+        zone = self._zone_of.get(pk)
+        if zone is not None:
+            zone.widen(new_row)
+        return row, new_row
+
+
+class IndexBuild:
+    """Handle for a background index build started by `Table.create_index_online`."""
+
+    def __init__(self, table: str, index: str):
+        self.table = table
+        self.index = index
+        self.state = "building"
+        self.error: Optional[str] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return self.state
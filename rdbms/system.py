@@ -0,0 +1,104 @@
+"""Read-only system tables describing the catalog.
+
+    SELECT * FROM sys.tables
+    SELECT table_name, column_name, type FROM sys.columns WHERE table_name = 'orders'
+    SELECT * FROM sys.indexes
+    SELECT table_name, rows, total_bytes FROM sys.table_stats WHERE total_bytes > 1000000
+
+sys.tables, sys.columns and sys.indexes come from the catalog's cached
+schemas. sys.table_stats reports row counts (opening each table) and the
+on-disk size of its data, index and snapshot files (total_bytes also
+counts schema.json).
+"""
+import os
+from typing import Any, Dict, List
+
+from .storage import index_specs
+from .views import hidden_columns
+
+TABLES = ("sys.tables", "sys.columns", "sys.indexes", "sys.table_stats")
+
+
+def is_system(name: str) -> bool:
+    return name.lower() in TABLES
+
+
+def rows(executor, name: str) -> List[Dict[str, Any]]:
+    """Return the rows of system table `name`."""
+    catalog = executor.catalog
+    kind = name.lower()
+    out: List[Dict[str, Any]] = []
+    for table in catalog.list_tables():
+        try:
+            schema = catalog.load_schema(table)
+        except Exception:
+            # dropped while we were listing
+            continue
+        if kind == "sys.tables":
+            out.append(_table_row(table, schema))
+        elif kind == "sys.columns":
+            pk = schema.get("constraints", {}).get("primary_key") or []
+            for i, c in enumerate(_visible_columns(schema), 1):
+                out.append({"table_name": table, "column_name": c["name"], "ordinal": i, "type": c["type"].upper(),
+                            "default": c.get("default"), "primary_key": c["name"] in pk})
+        elif kind == "sys.indexes":
+            for index, cols, unique, include in index_specs(schema):
+                out.append({"table_name": table, "index_name": index, "columns": ", ".join(cols),
+                            "unique": unique, "include": ", ".join(include) or None})
+        elif kind == "sys.table_stats":
+            out.append(_stats_row(executor, table))
+        else:
+            raise ValueError(f"Unknown system table {name}")
+    return out
+
+
+def _visible_columns(schema: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The columns of a table, without the hidden bookkeeping columns of a view."""
+    hidden = hidden_columns(schema)
+    return [c for c in schema.get("columns", []) if c["name"] not in hidden]
+
+
+def _table_row(table: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    storage = schema.get("storage") or {}
+    hidden = hidden_columns(schema)
+    pk = [c for c in schema.get("constraints", {}).get("primary_key") or [] if c not in hidden]
+    return {
+        "table_name": table,
+        "format": storage.get("format", "jsonl"),
+        "columns": len(_visible_columns(schema)),
+        "primary_key": ", ".join(pk) or None,
+        "indexes": len(schema.get("indexes", [])),
+        "materialized_view": "view" in schema,
+    }
+
+
+def _stats_row(executor, table: str) -> Dict[str, Any]:
+    t = executor.table(table)
+    sizes = {"data": 0, "index": 0, "snapshot": 0}
+    files = total = 0
+    for root, _, names in os.walk(t.path):
+        for n in names:
+            if n.endswith(".tmp"):
+                continue
+            try:
+                size = os.path.getsize(os.path.join(root, n))
+            except FileNotFoundError:
+                continue
+            files += 1
+            total += size
+            if n.startswith("index_"):
+                sizes["index"] += size
+            elif n == os.path.basename(t.snapshot_file):
+                sizes["snapshot"] += size
+            elif n != "schema.json":
+                # data.jsonl, segment files and the segment manifest
+                sizes["data"] += size
+    return {
+        "table_name": table,
+        "rows": len(t),
+        "data_bytes": sizes["data"],
+        "index_bytes": sizes["index"],
+        "snapshot_bytes": sizes["snapshot"],
+        "total_bytes": total,
+        "files": files,
+    }
@@ -1,9 +1,103 @@
-from typing import Any
+from typing import Any, Callable, Dict
 from datetime import date, datetime
 
 PRIMITIVE_TYPES = {"INT", "TEXT", "FLOAT", "BOOL", "DATE", "TIMESTAMP"}
 
 
+def _to_bool(value: Any):
+    if isinstance(value, bool):
+        return value
+    v = str(value).strip().lower()
+    if v in ("1", "true", "t", "yes"):
+        return True
+    if v in ("0", "false", "f", "no"):
+        return False
+    raise ValueError(f"Cannot coerce {value!r} to BOOL")
+
+
+def _to_date(value: Any):
+    # accept date/datetime or ISO date string
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    s = str(value).strip()
+    if not s:
+        return None
+    try:
+        # accept ISO format YYYY-MM-DD
+        d = date.fromisoformat(s)
+        return d.isoformat()
+    except Exception:
+        raise ValueError(f"Cannot coerce {value!r} to DATE (expected YYYY-MM-DD)")
+
+
+def _to_timestamp(value: Any):
+    # accept datetime/date or ISO datetime string; store ISO 8601 full datetime
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0).isoformat()
+    if isinstance(value, date) and not isinstance(value, datetime):
+        dt = datetime.combine(value, datetime.min.time())
+        return dt.replace(microsecond=0).isoformat()
+    s = str(value).strip()
+    if not s:
+        return None
+    try:
+        dt = datetime.fromisoformat(s)
+        return dt.replace(microsecond=0).isoformat()
+    except Exception:
+        # try common space-separated format
+        try:
+            dt = datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
+            return dt.replace(microsecond=0).isoformat()
+        except Exception:
+            raise ValueError(f"Cannot coerce {value!r} to TIMESTAMP (expected ISO datetime)")
+
+
+def _to_int(value: Any):
+    # INT is a signed 64-bit integer: the fast codec backends cannot encode
+    # anything wider, so reject it here rather than when the row is written
+    v = int(value)
+    if not -(1 << 63) <= v < (1 << 63):
+        raise ValueError(f"Cannot coerce {value!r} to INT (out of 64-bit range)")
+    return v
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "INT": _to_int,
+    "TEXT": str,
+    "FLOAT": float,
+    "BOOL": _to_bool,
+    "DATE": _to_date,
+    "TIMESTAMP": _to_timestamp,
+}
+
+
+def converter(typ: str) -> Callable[[Any], Any]:
+    """Return the coercion function for column type `typ` (not None-safe).
+
+    Resolving the type name once and calling the result avoids re-dispatching
+    on the type string for every value.
+    """
+    try:
+        return _CONVERTERS[typ.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown type: {typ}")
+
+
+def _identity(value: Any):
+    return value
+
+
+def column_converter(typ: str) -> Callable[[Any], Any]:
+    """Like `converter`, but values of an unknown type pass through unchanged.
+
+    CREATE TABLE rejects unknown types; this keeps a table whose schema.json
+    names one (written by hand or by another version) readable.
+    """
+    return _CONVERTERS.get(str(typ).upper(), _identity)
+
+
 def coerce_value(value: Any, typ: str):
     """Coerce a Python value to the column type. Raises ValueError on failure.
 
@@ -11,58 +105,13 @@ def coerce_value(value: Any, typ: str):
     """
     if value is None:
         return None
-    typ = typ.upper()
-    if typ == "INT":
-        return int(value)
-    if typ == "TEXT":
-        return str(value)
-    if typ == "FLOAT":
-        return float(value)
-    if typ == "BOOL":
-        if isinstance(value, bool):
-            return value
-        v = str(value).strip().lower()
-        if v in ("1", "true", "t", "yes"):
-            return True
-        if v in ("0", "false", "f", "no"):
-            return False
-        raise ValueError(f"Cannot coerce {value!r} to BOOL")
-    if typ == "DATE":
-        # accept date/datetime or ISO date string
-        if isinstance(value, date) and not isinstance(value, datetime):
-            return value.isoformat()
-        if isinstance(value, datetime):
-            return value.date().isoformat()
-        s = str(value).strip()
-        if not s:
-            return None
-        try:
-            # accept ISO format YYYY-MM-DD
-            d = date.fromisoformat(s)
-            return d.isoformat()
-        except Exception:
-            raise ValueError(f"Cannot coerce {value!r} to DATE (expected YYYY-MM-DD)")
-    if typ == "TIMESTAMP":
-        # accept datetime/date or ISO datetime string; store ISO 8601 full datetime
-        if isinstance(value, datetime):
-            return value.replace(microsecond=0).isoformat()
-        if isinstance(value, date) and not isinstance(value, datetime):
-            dt = datetime.combine(value, datetime.min.time())
-            return dt.replace(microsecond=0).isoformat()
-        s = str(value).strip()
-        if not s:
-            return None
-        try:
-            dt = datetime.fromisoformat(s)
-            return dt.replace(microsecond=0).isoformat()
-        except Exception:
-            # try common space-separated format
-            try:
-                dt = datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
-                return dt.replace(microsecond=0).isoformat()
-            except Exception:
-                raise ValueError(f"Cannot coerce {value!r} to TIMESTAMP (expected ISO datetime)")
-    raise ValueError(f"Unknown type: {typ}")
+    return converter(typ)(value)
+
+
+def statement_tokens() -> Dict[str, str]:
+    """Evaluate the CURRENT_DATE / CURRENT_TIMESTAMP tokens once for a statement."""
+    now = datetime.now().replace(microsecond=0)
+    return {"CURRENT_DATE": now.date().isoformat(), "CURRENT_TIMESTAMP": now.isoformat()}
 
 
 def validate_type_name(name: str) -> bool:
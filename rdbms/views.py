@@ -0,0 +1,304 @@
+"""GROUP BY aggregation and incrementally maintained materialized views.
+
+`CREATE MATERIALIZED VIEW name AS SELECT ...` stores the query result as an
+ordinary table whose schema.json also records the defining query:
+
+    CREATE MATERIALIZED VIEW spend AS
+        SELECT user_id, COUNT(*) AS orders, SUM(total) AS spent FROM orders GROUP BY user_id
+    SELECT * FROM spend WHERE user_id = 7          -- a primary-key lookup
+
+A view with GROUP BY is keyed by its group columns; one without is keyed
+by `_key`, the encoded primary keys of the source row(s) it came from (or
+"[]" for its single aggregate row). Aggregate views carry a `_rows` count
+per group. Both are hidden: `SELECT *`, COPY TO, `sys.columns` and the
+webapp leave them out, though naming them explicitly still reads them. The executor hands the view every row change of its
+source tables as (+1, row) / (-1, row) deltas, joined with the other side
+for a join, and `View.apply` folds them into the affected view rows:
+COUNT and SUM add and subtract, MIN and MAX only grow. A group whose MIN or
+MAX row was removed (or whose SUM drops to 0, which might mean all NULL) is
+recomputed from the source tables. `REFRESH MATERIALIZED VIEW` rebuilds the
+whole view. Rows whose group key has a NULL are left out of a view.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import control
+from .exceptions import SchemaError
+from .index import encode_key
+from .parser import Aggregate, Select
+
+# hidden per-group row count of an aggregate view
+ROWS = "_rows"
+# row key column of a view without GROUP BY
+KEY = "_key"
+
+Delta = Tuple[int, Dict[str, Any]]
+
+
+def hidden_columns(schema: Dict[str, Any]) -> Tuple[str, ...]:
+    """The bookkeeping columns of a view table's schema; () for other tables."""
+    if "view" not in schema:
+        return ()
+    return tuple(c["name"] for c in schema.get("columns", []) if c["name"] in (ROWS, KEY))
+
+
+def value(row: Dict[str, Any], ref: str, right: Optional[str]) -> Any:
+    """Return column `ref` of a (possibly joined) row.
+
+    Joined rows hold the right table's columns as "right.col"; other refs
+    name the left table's columns, with or without a table prefix.
+    """
+    if right is not None and ref.startswith(right + "."):
+        return row.get(ref)
+    return row.get(ref.split(".")[-1])
+
+
+def new_state(aggs: List[Aggregate]) -> Dict[str, Any]:
+    state: Dict[str, Any] = {ROWS: 0}
+    for a in aggs:
+        state[a.alias] = 0 if a.func == "COUNT" else None
+    return state
+
+
+def fold(state: Dict[str, Any], aggs: List[Aggregate], row: Dict[str, Any], sign: int,
+         right: Optional[str]) -> bool:
+    """Add (sign 1) or remove (sign -1) `row` from a group's aggregate state.
+
+    Returns False when the new state cannot be known without rescanning
+    the group (a removed row held its MIN or MAX, or a SUM dropped to 0).
+    """
+    state[ROWS] += sign
+    exact = True
+    for a in aggs:
+        v = None if a.column is None else value(row, a.column, right)
+        cur = state[a.alias]
+        if a.func == "COUNT":
+            if a.column is None or v is not None:
+                state[a.alias] = cur + sign
+        elif v is None:
+            continue
+        elif a.func == "SUM":
+            if sign > 0:
+                state[a.alias] = v if cur is None else cur + v
+            elif cur is None:
+                exact = False
+            else:
+                state[a.alias] = cur - v
+                exact = exact and state[a.alias] != 0
+        elif sign > 0:
+            if cur is None or (v < cur if a.func == "MIN" else v > cur):
+                state[a.alias] = v
+        elif v == cur:
+            exact = False
+    return exact
+
+
+def aggregate(rows: Iterable[Dict[str, Any]], stmt: Select, right: Optional[str]) -> List[Dict[str, Any]]:
+    """Evaluate the GROUP BY and aggregates of `stmt` over its source rows,
+    returning one row per group keyed like the select list."""
+    groups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    check = control.current().check
+    for i, r in enumerate(rows):
+        if not i & control.CHECK_MASK:
+            check()
+        key = tuple(value(r, g, right) for g in stmt.group_by)
+        state = groups.get(key)
+        if state is None:
+            state = groups[key] = new_state(stmt.aggregates)
+        fold(state, stmt.aggregates, r, 1, right)
+    if not groups and not stmt.group_by:
+        # aggregates over no rows: one row of COUNT 0 and NULLs
+        groups[()] = new_state(stmt.aggregates)
+    return records(groups, stmt)
+
+
+def records(groups: Dict[Tuple[Any, ...], Dict[str, Any]], stmt: Select) -> List[Dict[str, Any]]:
+    """Return the output row of each (group key, aggregate state), keyed like the select list."""
+    by_expr = {a.expr: a for a in stmt.aggregates}
+    out = []
+    for key, state in groups.items():
+        rec = {}
+        for c in stmt.columns:
+            a = by_expr.get(c)
+            if a is not None:
+                rec[a.alias] = state[a.alias]
+            else:
+                rec[c] = key[stmt.group_by.index(c)]
+        out.append(rec)
+    return out
+
+
+class View:
+    """A materialized view's definition and its delta maintenance.
+
+    `left` and `right` are the open source tables (right only for a join);
+    they are passed in on each call because the executor reopens tables
+    whose files changed.
+    """
+
+    def __init__(self, name: str, query: str, stmt: Select):
+        self.name = name
+        self.query = query
+        self.stmt = stmt
+        self.right = stmt.join.right_table if stmt.join else None
+        self.sources = (stmt.table,) + ((self.right,) if self.right else ())
+        self.grouped = bool(stmt.group_by or stmt.aggregates)
+        # (source ref, view column) of the group or projected columns; see `bind`
+        self.outputs: List[Tuple[str, str]] = []
+
+    def _type_of(self, ref: str, left, right) -> Dict[str, Any]:
+        col = ref.split(".")[-1]
+        t = right if right is not None and ref.startswith(right.name + ".") else left
+        if col not in t.columns:
+            raise SchemaError(f"Unknown column {ref} in materialized view {self.name}")
+        return t.columns[col]
+
+    def schema(self, left, right) -> Dict[str, Any]:
+        """Return the view table's schema, derived from the source tables."""
+        stmt = self.stmt
+        if stmt.table == self.right:
+            raise SchemaError("A materialized view cannot join a table to itself")
+        refs = stmt.group_by if self.grouped else stmt.columns
+        if refs == ["*"]:
+            if right is not None:
+                raise SchemaError("A materialized view over a join must list its columns")
+            refs = list(left.columns)
+        columns = [{"name": ref.split(".")[-1], "type": self._type_of(ref, left, right)["type"]} for ref in refs]
+        for a in stmt.aggregates:
+            typ = "INT" if a.func == "COUNT" else self._type_of(a.column, left, right)["type"]
+            columns.append({"name": a.alias, "type": typ})
+        if self.grouped:
+            columns.append({"name": ROWS, "type": "INT"})
+        elif not all(t.pk_columns for t in (left, right) if t is not None):
+            raise SchemaError("A materialized view without GROUP BY needs source tables with a primary key")
+        if stmt.group_by:
+            key = [c["name"] for c in columns[:len(refs)]]
+        else:
+            key = [KEY]
+            columns.append({"name": KEY, "type": "TEXT"})
+        names = [c["name"] for c in columns]
+        dup = sorted({n for n in names if names.count(n) > 1})
+        if dup:
+            raise SchemaError(f"Duplicate column(s) in materialized view {self.name}: {', '.join(dup)}")
+        return {"name": self.name, "columns": columns, "constraints": {"primary_key": key, "unique": []},
+                "indexes": [], "view": {"query": self.query}}
+
+    def bind(self, table):
+        """Pair the query's group or projected columns with the view table's
+        columns (SELECT * was expanded when the view was created)."""
+        names = [c for c in table.columns if c not in (ROWS, KEY) and
+                 c not in {a.alias for a in self.stmt.aggregates}]
+        refs = self.stmt.group_by if self.grouped else (
+            list(names) if self.stmt.columns == ["*"] else self.stmt.columns)
+        self.outputs = list(zip(refs, names))
+
+    # -- rows of the view ------------------------------------------------------
+
+    def _group_key(self, row: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        key = tuple(value(row, ref, self.right) for ref, _ in self.outputs)
+        return None if None in key else key
+
+    def _row_key(self, table, key: Tuple[Any, ...]) -> str:
+        if not self.stmt.group_by:
+            return encode_key([])
+        return table.pk_key(list(key) if len(key) > 1 else key[0])
+
+    def _source_key(self, row: Dict[str, Any], left, right) -> str:
+        vals = [row.get(c) for c in left.pk_columns]
+        if right is not None:
+            vals += [row.get(f"{right.name}.{c}") for c in right.pk_columns]
+        return encode_key(vals)
+
+    def _project(self, row: Dict[str, Any], left, right) -> Dict[str, Any]:
+        rec = {name: value(row, ref, self.right) for ref, name in self.outputs}
+        rec[KEY] = self._source_key(row, left, right)
+        return rec
+
+    def _group_row(self, key: Tuple[Any, ...], state: Dict[str, Any]) -> Dict[str, Any]:
+        rec = {name: v for (_, name), v in zip(self.outputs, key)}
+        rec.update(state)
+        if not self.stmt.group_by:
+            rec[KEY] = encode_key([])
+        return rec
+
+    def rebuild(self, rows: Iterable[Dict[str, Any]], table, left, right) -> Dict[str, Dict[str, Any]]:
+        """Return the full contents of the view (row key -> row) computed from
+        the joined and filtered source `rows`."""
+        if not self.grouped:
+            out = {}
+            for r in rows:
+                rec = self._project(r, left, right)
+                out[rec[KEY]] = rec
+            return out
+        groups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for r in rows:
+            key = self._group_key(r)
+            if key is None:
+                continue
+            state = groups.get(key)
+            if state is None:
+                state = groups[key] = new_state(self.stmt.aggregates)
+            fold(state, self.stmt.aggregates, r, 1, self.right)
+        if not self.stmt.group_by and not groups:
+            groups[()] = new_state(self.stmt.aggregates)
+        return {self._row_key(table, key): self._group_row(key, state) for key, state in groups.items()}
+
+    # -- maintenance -----------------------------------------------------------
+
+    def apply(self, table, deltas: List[Delta], left, right,
+              recompute: Callable[[Tuple[Any, ...]], List[Dict[str, Any]]]) -> int:
+        """Fold `deltas` into the view table; `recompute(group key)` returns
+        the source rows of one group. Returns the number of view rows written."""
+        if not self.grouped:
+            target: Dict[str, Optional[Dict[str, Any]]] = {}
+            for sign, r in deltas:
+                rec = self._project(r, left, right)
+                target[rec[KEY]] = rec if sign > 0 else None
+            return self.write(table, target)
+        groups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        dirty = set()
+        for sign, r in deltas:
+            key = self._group_key(r)
+            if key is None:
+                continue
+            state = groups.get(key)
+            if state is None:
+                cur = table.get(self._row_key(table, key))
+                state = new_state(self.stmt.aggregates)
+                if cur is not None:
+                    state = {k: cur.get(k) for k in state}
+                groups[key] = state
+            if not fold(state, self.stmt.aggregates, r, sign, self.right):
+                dirty.add(key)
+        target = {}
+        for key, state in groups.items():
+            if key in dirty:
+                state = new_state(self.stmt.aggregates)
+                for r in recompute(key):
+                    fold(state, self.stmt.aggregates, r, 1, self.right)
+            if self.stmt.group_by and state[ROWS] <= 0:
+                target[self._row_key(table, key)] = None
+            else:
+                target[self._row_key(table, key)] = self._group_row(key, state)
+        return self.write(table, target)
+
+    @staticmethod
+    def write(table, target: Dict[str, Optional[Dict[str, Any]]]) -> int:
+        """Make the view table's rows for the keys of `target` match it
+        (None deletes), writing only rows that changed."""
+        deletes, updates, inserts = [], [], []
+        for pk, rec in target.items():
+            cur = table.get(pk)
+            if rec is None:
+                if cur is not None:
+                    deletes.append(pk)
+            elif cur is None:
+                inserts.append(rec)
+            elif any(cur.get(k) != v for k, v in rec.items()):
+                updates.append((pk, rec))
+        if deletes:
+            table.delete_many(deletes)
+        if updates:
+            table.update_rows(updates)
+        if inserts:
+            table.insert_many(inserts)
+        return len(deletes) + len(updates) + len(inserts)
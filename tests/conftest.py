@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rdbms.executor import Executor  # noqa: E402
+
+
+@pytest.fixture
+def exe(tmp_path):
+    return Executor(base_dir=str(tmp_path / "data"))
+
+
+@pytest.fixture
+def users(exe):
+    exe.execute("CREATE TABLE u (id INT, name TEXT, PRIMARY KEY (id))")
+    exe.execute("INSERT INTO u (id, name) VALUES (1, 'rock AND roll'), (2, 'rock'), (3, 'roll')")
+    return exe
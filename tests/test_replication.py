@@ -0,0 +1,40 @@
+import pytest
+
+from rdbms.exceptions import ReadOnlyError
+from rdbms.executor import Executor
+from rdbms.replication import Follower
+
+
+@pytest.fixture
+def primary(tmp_path):
+    return Executor(base_dir=str(tmp_path / "primary"), changelog=str(tmp_path / "wal"))
+
+
+def rows(exe, sql):
+    return sorted(tuple(sorted(r.items())) for r in exe.execute(sql))
+
+
+def test_follower_round_trip(primary, tmp_path):
+    primary.execute("CREATE TABLE p (a INT, b INT, v TEXT, PRIMARY KEY (a, b))")
+    primary.execute("CREATE INDEX idx_v ON p (v)")
+    primary.execute("INSERT INTO p (a, b, v) VALUES (1, 1, 'x'), (1, 2, 'y'), (2, 1, 'z')")
+    primary.execute("CREATE MATERIALIZED VIEW per_a AS SELECT a, COUNT(*) AS n FROM p GROUP BY a")
+    primary.execute("UPDATE p SET v = 'w' WHERE a = 2 AND b = 1")
+    primary.execute("DELETE FROM p WHERE a = 1 AND b = 1")
+
+    follower = Follower(str(tmp_path / "wal"), base_dir=str(tmp_path / "replica"))
+    assert follower.catch_up() > 0
+    replica = follower.executor
+    for sql in ("SELECT * FROM p", "SELECT * FROM per_a", "SELECT v FROM p WHERE v = 'w'"):
+        assert rows(replica, sql) == rows(primary, sql)
+    with pytest.raises(ReadOnlyError):
+        replica.execute("DELETE FROM p")
+
+    # a new follower over the same directory resumes after the last applied record
+    primary.execute("INSERT INTO p (a, b, v) VALUES (3, 1, 'q')")
+    resumed = Follower(str(tmp_path / "wal"), base_dir=str(tmp_path / "replica"))
+    assert resumed.applied_lsn == follower.applied_lsn
+    # the inserted row and the view row it adds
+    assert resumed.catch_up() == 2
+    for sql in ("SELECT * FROM p", "SELECT * FROM per_a"):
+        assert rows(resumed.executor, sql) == rows(primary, sql)
@@ -0,0 +1,70 @@
+import json
+import os
+
+import pytest
+
+from rdbms.exceptions import ConstraintViolation, SchemaError
+from rdbms.storage import index_specs
+
+
+def test_create_table_rejects_unknown_type(exe):
+    with pytest.raises(SchemaError, match="Unknown column type"):
+        exe.execute("CREATE TABLE t (id INT, v WEIRD, PRIMARY KEY (id))")
+
+
+def test_table_with_unknown_type_in_schema_still_opens(exe, tmp_path):
+    exe.execute("CREATE TABLE t (id INT, v TEXT, PRIMARY KEY (id))")
+    exe.execute("INSERT INTO t (id, v) VALUES (1, 'a'), (2, 'b')")
+    path = os.path.join(str(tmp_path / "data"), "t", "schema.json")
+    with open(path) as f:
+        schema = json.load(f)
+    schema["columns"][1]["type"] = "VARCHAR"
+    with open(path, "w") as f:
+        json.dump(schema, f)
+    exe._tables.clear()
+    assert exe.execute("SELECT v FROM t WHERE v = 'b'") == [{"v": "b"}]
+    assert len(exe.execute("SELECT * FROM t")) == 2
+
+
+def test_composite_primary_key(exe):
+    exe.execute("CREATE TABLE p (a INT, b INT, v TEXT, PRIMARY KEY (a, b))")
+    exe.execute("INSERT INTO p (a, b, v) VALUES (1, 1, 'x'), (1, 2, 'y'), (2, 1, 'z')")
+    with pytest.raises(Exception):
+        exe.execute("INSERT INTO p (a, b, v) VALUES (1, 2, 'dup')")
+    assert exe.execute("DELETE FROM p WHERE a = 1 AND b = 1")["deleted"] == 1
+    assert sorted(r["v"] for r in exe.execute("SELECT v FROM p WHERE a = 1")) == ["y"]
+
+
+def test_primary_key_update_is_rejected(exe):
+    exe.execute("CREATE TABLE u (id INT, name TEXT, PRIMARY KEY (id))")
+    exe.execute("INSERT INTO u (id, name) VALUES (1, 'a'), (2, 'b')")
+    for sql in ("UPDATE u SET id = 10 WHERE id = 1", "UPDATE u SET id = 2 WHERE id = 1",
+                "UPDATE u SET id = 3, name = 'c'"):
+        with pytest.raises(ConstraintViolation):
+            exe.execute(sql)
+    assert exe.execute("SELECT * FROM u WHERE id = 1") == [{"id": 1, "name": "a"}]
+    assert sorted(r["id"] for r in exe.execute("SELECT id FROM u")) == [1, 2]
+    # setting the key to its current value is not a change
+    assert exe.execute("UPDATE u SET id = 1, name = 'z' WHERE id = 1")["updated"] == 1
+    assert exe.execute("SELECT name FROM u WHERE id = 1") == [{"name": "z"}]
+
+
+def test_composite_primary_key_update_is_rejected(exe):
+    exe.execute("CREATE TABLE p (a INT, b INT, v TEXT, PRIMARY KEY (a, b))")
+    exe.execute("INSERT INTO p (a, b, v) VALUES (1, 1, 'x')")
+    with pytest.raises(ConstraintViolation):
+        exe.execute("UPDATE p SET b = 2 WHERE a = 1")
+    assert exe.execute("SELECT b FROM p") == [{"b": 1}]
+
+
+def test_plain_index_spec_is_unique_only_for_unique_constraints():
+    schema = {"indexes": ["tag", "email"], "constraints": {"unique": [["email"]]}}
+    assert [(n, u) for n, _, u, _ in index_specs(schema)] == [("tag", False), ("email", True)]
+
+
+def test_int_outside_64_bit_range_is_rejected(exe):
+    exe.execute("CREATE TABLE t (id INT, n INT, PRIMARY KEY (id))")
+    with pytest.raises(ValueError, match="out of 64-bit range"):
+        exe.execute(f"INSERT INTO t (id, n) VALUES (1, {1 << 63})")
+    exe.execute(f"INSERT INTO t (id, n) VALUES (1, {(1 << 63) - 1})")
+    assert exe.execute("SELECT n FROM t") == [{"n": (1 << 63) - 1}]
@@ -0,0 +1,52 @@
+import pytest
+
+from rdbms.exceptions import SchemaError
+
+
+@pytest.fixture
+def view(exe):
+    exe.execute("CREATE TABLE o (oid INT, uid INT, total INT, PRIMARY KEY (oid))")
+    exe.execute("INSERT INTO o (oid, uid, total) VALUES (1, 1, 10), (2, 1, 5), (3, 2, 7)")
+    exe.execute("CREATE MATERIALIZED VIEW per_user AS SELECT uid, COUNT(*) AS n, SUM(total) AS s FROM o GROUP BY uid")
+    return exe
+
+
+def rows(exe):
+    return sorted((r["uid"], r["n"], r["s"]) for r in exe.execute("SELECT * FROM per_user"))
+
+
+@pytest.mark.parametrize("sql", [
+    "INSERT INTO per_user (uid, n, s) VALUES (9, 1, 1)",
+    "UPDATE per_user SET n = 99 WHERE uid = 1",
+    "DELETE FROM per_user WHERE uid = 1",
+    "EXPLAIN ANALYZE UPDATE per_user SET n = 99 WHERE uid = 1",
+    "EXPLAIN ANALYZE DELETE FROM per_user WHERE uid = 1",
+])
+def test_view_rejects_writes(view, sql):
+    before = rows(view)
+    with pytest.raises(SchemaError):
+        view.execute(sql)
+    assert rows(view) == before
+
+
+def test_explain_without_analyze_is_allowed(view):
+    assert view.execute("EXPLAIN DELETE FROM per_user WHERE uid = 1")
+    assert len(rows(view)) == 2
+
+
+def test_view_is_maintained(view):
+    view.execute("INSERT INTO o (oid, uid, total) VALUES (4, 2, 1)")
+    view.execute("DELETE FROM o WHERE oid = 1")
+    assert rows(view) == [(1, 1, 5), (2, 2, 8)]
+
+
+def test_hidden_columns_are_not_visible(view):
+    view.execute("CREATE MATERIALIZED VIEW big AS SELECT oid, total FROM o WHERE total > 6")
+    for name in ("per_user", "big"):
+        for r in view.execute(f"SELECT * FROM {name}"):
+            assert "_rows" not in r and "_key" not in r
+        cols = [r["column_name"] for r in view.execute(f"SELECT * FROM sys.columns WHERE table_name = '{name}'")]
+        assert "_rows" not in cols and "_key" not in cols
+    assert sorted(r["oid"] for r in view.execute("SELECT * FROM big")) == [1, 3]
+    # naming a hidden column still reads it
+    assert {r["_rows"] for r in view.execute("SELECT uid, _rows FROM per_user")} == {1, 2}
@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("flask")
+
+from webapp import app as webapp  # noqa: E402
+
+
+@pytest.fixture
+def client(exe, monkeypatch):
+    monkeypatch.setattr(webapp, "_exe", exe)
+    exe.execute("CREATE TABLE pairs (a INT, b INT, v TEXT, PRIMARY KEY (a, b))")
+    exe.execute("INSERT INTO pairs (a, b, v) VALUES (1, 1, 'x'), (1, 2, 'y'), (2, 1, 'z')")
+    return webapp.app.test_client()
+
+
+def test_table_links_carry_the_full_row_key(client, exe):
+    key = exe.table("pairs").pk_key([1, 1])
+    page = client.get("/table/pairs").get_data(as_text=True)
+    assert "/table/pairs/delete/" in page
+    with webapp.app.test_request_context():
+        assert webapp.url_for("delete_row", table="pairs", pk=key) in page
+
+
+def test_delete_composite_key_row(client, exe):
+    key = exe.table("pairs").pk_key([1, 1])
+    client.post(f"/table/pairs/delete/{key}")
+    rows = exe.execute("SELECT a, b FROM pairs")
+    assert sorted((r["a"], r["b"]) for r in rows) == [(1, 2), (2, 1)]
+
+
+def test_edit_composite_key_row(client, exe):
+    key = exe.table("pairs").pk_key([1, 2])
+    assert client.get(f"/table/pairs/edit/{key}").status_code == 200
+    client.post(f"/table/pairs/edit/{key}", data={"a": "1", "b": "2", "v": "new"})
+    rows = {(r["a"], r["b"]): r["v"] for r in exe.execute("SELECT * FROM pairs")}
+    assert rows == {(1, 1): "x", (1, 2): "new", (2, 1): "z"}
+
+
+def test_bad_row_key_is_not_found(client):
+    assert client.post("/table/pairs/delete/not-a-key").status_code == 404
+
+
+def test_delete_single_key_row(client, exe):
+    exe.execute("CREATE TABLE u (id INT, name TEXT, PRIMARY KEY (id))")
+    exe.execute("INSERT INTO u (id, name) VALUES (1, 'a'), (2, 'b')")
+    client.post("/table/u/delete/2")
+    assert exe.execute("SELECT id FROM u") == [{"id": 1}]
+
+
+def test_view_page_hides_bookkeeping_columns(client, exe):
+    exe.execute("CREATE MATERIALIZED VIEW per_a AS SELECT a, COUNT(*) AS n FROM pairs GROUP BY a")
+    page = client.get("/table/per_a").get_data(as_text=True)
+    assert ">n</a>" in page and "_rows" not in page
+
+
+def test_form_index_allows_duplicate_values(client, exe):
+    client.post("/table/create", data={
+        "table_name": "tags", "pk_col": "0",
+        "col_name_0": "id", "col_type_0": "INT",
+        "col_name_1": "tag", "col_type_1": "TEXT", "col_index_1": "on",
+    })
+    exe.execute("INSERT INTO tags (id, tag) VALUES (1, 'red'), (2, 'red')")
+    assert exe.execute("SELECT id FROM tags WHERE tag = 'red'") == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,56 @@
+import pytest
+
+from rdbms.parser import Parser, Where
+
+
+def test_and_inside_quotes_is_not_split():
+    where = Parser().parse("SELECT * FROM u WHERE name = 'rock AND roll'").where
+    assert where == Where("name", "rock AND roll")
+
+
+def test_between_with_quoted_bounds():
+    where = Parser().parse("SELECT * FROM u WHERE name BETWEEN 'a AND b' AND 'z'").where
+    assert [(w.op, w.value) for w in where.terms] == [(">=", "a AND b"), ("<=", "z")]
+
+
+@pytest.mark.parametrize("cond", ["x = 1 OR y = 2", "id ~ 3", "id IN (1) OR id IN (2)", "name = rock roll"])
+def test_unparseable_condition_raises(cond):
+    with pytest.raises(ValueError):
+        Parser().parse(f"SELECT * FROM u WHERE {cond}")
+
+
+def test_select_with_quoted_and(users):
+    assert users.execute("SELECT id FROM u WHERE name = 'rock AND roll'") == [{"id": 1}]
+
+
+def test_delete_with_quoted_and_deletes_one_row(users):
+    assert users.execute("DELETE FROM u WHERE name = 'rock AND roll'")["deleted"] == 1
+    assert len(users.execute("SELECT * FROM u")) == 2
+
+
+def test_unparseable_delete_changes_nothing(users):
+    with pytest.raises(ValueError):
+        users.execute("DELETE FROM u WHERE id = 1 OR id = 2")
+    assert len(users.execute("SELECT * FROM u")) == 3
+
+
+@pytest.mark.parametrize("cond", ["id NOT IN (1)", "NOT EXISTS (SELECT id FROM u WHERE id = 1)",
+                                  "NOT id = 1", "id NOT IN (SELECT id FROM u)"])
+def test_negated_predicates_are_rejected(users, cond):
+    with pytest.raises(ValueError, match="NOT"):
+        users.execute(f"DELETE FROM u WHERE {cond}")
+    assert len(users.execute("SELECT * FROM u")) == 3
+
+
+def test_in_list_and_subquery(users):
+    assert users.execute("SELECT id FROM u WHERE id IN (3, 1, 3, 99)") == [{"id": 3}, {"id": 1}]
+    assert users.execute("SELECT id FROM u WHERE name IN ('rock AND roll', 'x')") == [{"id": 1}]
+    assert users.execute("SELECT id FROM u WHERE id IN (SELECT id FROM u WHERE name = 'roll')") == [{"id": 3}]
+
+
+def test_exists(users):
+    users.execute("CREATE TABLE o (oid INT, uid INT, PRIMARY KEY (oid))")
+    users.execute("INSERT INTO o (oid, uid) VALUES (1, 2), (2, 2)")
+    rows = users.execute("SELECT id FROM u WHERE EXISTS (SELECT oid FROM o WHERE o.uid = u.id)")
+    assert rows == [{"id": 2}]
+    assert users.execute("SELECT id FROM u WHERE EXISTS (SELECT oid FROM o WHERE oid = 9)") == []
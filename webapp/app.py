@@ -1,6 +1,9 @@
-from flask import Flask, request, render_template_string, redirect, url_for
+from flask import (Flask, Response, abort, request, render_template, render_template_string, redirect,
+                   stream_with_context, url_for)
 from datetime import date, datetime
+import json
 import re
+import threading
 
 
 def _format_display_value(v):
@@ -21,10 +24,91 @@ def _format_display_value(v):
         except Exception:
             pass
     return str(v)
-from rdbms.executor import Executor
+
+def _display_formatter(typ):
+    """Return a function formatting stored values of a column type for display.
+
+    Chosen once per column from the schema, so table pages do not sniff each
+    value the way `_format_display_value` does.
+    """
+    typ = (typ or '').upper()
+    if typ == 'TIMESTAMP':
+        # stored as ISO 'YYYY-MM-DDTHH:MM:SS'
+        return lambda v: '' if v is None else str(v).replace('T', ' ', 1)[:19]
+    return lambda v: '' if v is None else str(v)
+
 
 app = Flask(__name__)
-exe = Executor(base_dir="data")
+_exe = None
+# compiled page templates, keyed by source; built on first render
+_compiled = {}
+
+
+def get_executor():
+    """Return the shared Executor, importing the engine on first use."""
+    global _exe
+    if _exe is None:
+        import os
+
+        from rdbms import Executor
+
+        # cache repeated SELECTs (table views, edit-form lookups); invalidated on writes.
+        # MINI_RDBMS_SLOW_QUERY_MS enables the slow-query log (data/slow_queries.jsonl).
+        # MINI_RDBMS_CHANGELOG=dir publishes changes for followers; MINI_RDBMS_FOLLOW=source
+        # (a log directory or a primary's /replication/log URL) makes this a read-only follower.
+        # MINI_RDBMS_MEMORY_BUDGET (bytes) bounds join/aggregate memory, spilling beyond it.
+        # MINI_RDBMS_STATEMENT_TIMEOUT (seconds) stops runaway statements, and
+        # MINI_RDBMS_MAX_HEAVY_QUERIES caps concurrent heavy (>= 10000 estimated rows) queries
+        slow_ms = os.environ.get("MINI_RDBMS_SLOW_QUERY_MS")
+        follow = os.environ.get("MINI_RDBMS_FOLLOW")
+        timeout = os.environ.get("MINI_RDBMS_STATEMENT_TIMEOUT")
+        exe = Executor(base_dir="data", result_cache_bytes=64 * 1024 * 1024,
+                       slow_query_ms=float(slow_ms) if slow_ms else None,
+                       slow_query_log=os.path.join("data", "slow_queries.jsonl") if slow_ms else None,
+                       changelog=os.environ.get("MINI_RDBMS_CHANGELOG"), read_only=bool(follow),
+                       memory_budget=int(os.environ.get("MINI_RDBMS_MEMORY_BUDGET", 0)),
+                       statement_timeout=float(timeout) if timeout else None,
+                       max_heavy_queries=int(os.environ.get("MINI_RDBMS_MAX_HEAVY_QUERIES", 0)))
+        if follow:
+            _start_follower(follow, exe)
+        _exe = exe
+    return _exe
+
+
+_follower = None
+_log_reader = None
+
+
+def _start_follower(source, exe):
+    global _follower
+    from rdbms.replication import Follower
+
+    _follower = Follower(source, executor=exe)
+    threading.Thread(target=_follower.run, name="replication", daemon=True).start()
+
+
+def _template(source):
+    """Compile a full page template once, with `GLOBAL_UI_SCRIPT` inserted
+    before </body> so dark mode works across pages."""
+    tpl = _compiled.get(source)
+    if tpl is None:
+        head, body_end, tail = source.rpartition("</body>")
+        html = head + GLOBAL_UI_SCRIPT + body_end + tail if body_end else source + GLOBAL_UI_SCRIPT
+        tpl = _compiled[source] = app.jinja_env.from_string(html)
+    return tpl
+
+
+def _render(source, **context):
+    """Render a full page."""
+    return render_template(_template(source), **context)
+
+
+def _stream(source, **context):
+    """Render a full page as a streamed response, sent in chunks while the
+    template (and any generators in `context`) are consumed."""
+    stream = _template(source).stream(**context)
+    stream.enable_buffering(20)
+    return Response(stream_with_context(stream))
 
 INDEX_HTML = """
 <!doctype html>
@@ -79,7 +163,7 @@ INDEX_HTML = """
 </html>
 """
 
-# Attach global UI script/CSS to templates so dark-mode works across pages
+# global UI script/CSS inserted into every page by `_render` so dark-mode works across pages
 GLOBAL_UI_SCRIPT = """
 <script>
 // Dark mode toggle and persistence
@@ -129,11 +213,6 @@ GLOBAL_UI_SCRIPT = """
 </style>
 """
 
-# Insert `GLOBAL_UI_SCRIPT` before the closing </body></html> so it executes inside the page
-INDEX_HTML = INDEX_HTML.replace("</body>\n</html>", GLOBAL_UI_SCRIPT + "\n</body>\n</html>")
-TABLE_HTML = TABLE_HTML.replace("</body>\n</html>", GLOBAL_UI_SCRIPT + "\n</body>\n</html>")
-FORM_HTML = FORM_HTML.replace("</body>\n</html>", GLOBAL_UI_SCRIPT + "\n</body>\n</html>")
-CREATE_TABLE_HTML = CREATE_TABLE_HTML.replace("</body>\n</html>", GLOBAL_UI_SCRIPT + "\n</body>\n</html>")
 
 
 
@@ -155,28 +234,37 @@ TABLE_HTML = """
         </div>
         <h1 class="mb-0">Table: {{table}}</h1>
     </div>
+    {% if error %}<div class="alert alert-danger">{{ error }}</div>{% endif %}
     <div class="card">
       <div class="card-body">
-        <h5 class="card-title">Rows</h5>
+        <div class="d-flex justify-content-between align-items-center mb-2">
+            <h5 class="card-title mb-0">Rows {% if total %}{{ offset + 1 }}&ndash;{{ offset + count }} of {{ total }}{% else %}(none){% endif %}</h5>
+            <form method="get" class="d-flex gap-2 align-items-center">
+                {% if sort %}<input type="hidden" name="sort" value="{{sort}}"><input type="hidden" name="dir" value="{{dir}}">{% endif %}
+                <select class="form-select form-select-sm" name="limit" onchange="this.form.submit()">
+                {% for n in page_sizes %}<option value="{{n}}" {% if n == limit %}selected{% endif %}>{{n}} per page</option>{% endfor %}
+                </select>
+            </form>
+        </div>
         <div class="table-responsive">
         <table class="table table-striped">
     <thead>
     <tr>
     {% for h in headers %}
-        <th>{{h}}</th>
+        <th><a href="{{ sort_links[h] }}">{{h}}</a>{% if h == sort_column %} {{ '&#9660;'|safe if dir == 'desc' else '&#9650;'|safe }}{% endif %}</th>
     {% endfor %}
         <th>Actions</th>
     </tr>
     </thead>
     <tbody>
-    {% for r in rows %}
+    {% for pk, cells in rows %}
     <tr>
-    {% for h in headers %}
-        <td>{{ r.get(h) }}</td>
+    {% for v in cells %}
+        <td>{{ v }}</td>
     {% endfor %}
         <td>
-            <a class="btn btn-sm btn-primary" href="/table/{{table}}/edit/{{ rows_raw[loop.index0].get(headers[0]) }}">Edit</a>
-            <form method="post" action="/table/{{table}}/delete/{{ rows_raw[loop.index0].get(headers[0]) }}" style="display:inline">
+            <a class="btn btn-sm btn-primary" href="{{ url_for('edit_row', table=table, pk=pk) }}">Edit</a>
+            <form method="post" action="{{ url_for('delete_row', table=table, pk=pk) }}" style="display:inline">
                 <button class="btn btn-sm btn-danger" type="submit">Delete</button>
             </form>
         </td>
@@ -185,6 +273,11 @@ TABLE_HTML = """
     </tbody>
         </table>
         </div>
+        <nav class="d-flex gap-2">
+            <a class="btn btn-outline-secondary btn-sm {% if not first_link %}disabled{% endif %}" href="{{ first_link or '#' }}">First</a>
+            <a class="btn btn-outline-secondary btn-sm {% if not prev_link %}disabled{% endif %}" href="{{ prev_link or '#' }}">Previous</a>
+            <a class="btn btn-outline-secondary btn-sm {% if not next_link %}disabled{% endif %}" href="{{ next_link or '#' }}">Next</a>
+        </nav>
       </div>
     </div>
 </div>
@@ -210,9 +303,9 @@ FORM_HTML = """
                         <label class="form-label">{{col.name}}</label>
                         {% set t = (col.type or '').upper() %}
                         {% if t == 'INT' %}
-                            <input class="form-control" type="number" step="1" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name==primary_key %}readonly{% endif %}>
+                            <input class="form-control" type="number" step="1" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name in primary_key %}readonly{% endif %}>
                         {% elif t == 'FLOAT' %}
-                            <input class="form-control" type="number" step="any" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name==primary_key %}readonly{% endif %}>
+                            <input class="form-control" type="number" step="any" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name in primary_key %}readonly{% endif %}>
                         {% elif t == 'BOOL' %}
                             <div class="form-check">
                                 <input class="form-check-input" type="checkbox" name="{{col.name}}" value="1" id="chk_{{col.name}}" {% if values.get(col.name) in [True, 'True', 'true', '1', 1] %}checked{% endif %}>
@@ -220,7 +313,7 @@ FORM_HTML = """
                             </div>
                         {% elif t == 'TIMESTAMP' %}
                             <div class="d-flex gap-2 align-items-center">
-                                <input class="form-control" type="datetime-local" name="{{col.name}}" value="{{ (values.get(col.name) or '')[:16] }}" {% if primary_key and col.name==primary_key %}readonly{% endif %}>
+                                <input class="form-control" type="datetime-local" name="{{col.name}}" value="{{ (values.get(col.name) or '')[:16] }}" {% if primary_key and col.name in primary_key %}readonly{% endif %}>
                                 <div class="form-check">
                                     <input class="form-check-input" type="checkbox" name="use_now_{{col.name}}" id="use_now_{{col.name}}" {% if values.get(col.name) == 'CURRENT_TIMESTAMP' %}checked{% endif %}>
                                     <label class="form-check-label small" for="use_now_{{col.name}}">Use current time</label>
@@ -229,7 +322,7 @@ FORM_HTML = """
                             <div><small class="text-muted">Tip: checking 'Use current time' stores a token evaluated on insert/update; leaving blank auto-fills current time at submit; entering a time uses that specific timestamp.</small></div>
                         {% elif t == 'DATE' %}
                             <div class="d-flex gap-2 align-items-center">
-                                <input class="form-control" type="date" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name==primary_key %}readonly{% endif %}>
+                                <input class="form-control" type="date" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name in primary_key %}readonly{% endif %}>
                                 <div class="form-check">
                                     <input class="form-check-input" type="checkbox" name="use_today_{{col.name}}" id="use_today_{{col.name}}" {% if values.get(col.name) == 'CURRENT_DATE' %}checked{% endif %}>
                                     <label class="form-check-label small" for="use_today_{{col.name}}">Use today's date</label>
@@ -237,7 +330,7 @@ FORM_HTML = """
                             </div>
                             <div><small class="text-muted">Tip: checking 'Use today's date' stores a token evaluated on insert/update; leaving blank auto-fills today's date at submit time; entering a date uses that specific date.</small></div>
                         {% else %}
-                            <input class="form-control" type="text" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name==primary_key %}readonly{% endif %}>
+                            <input class="form-control" type="text" name="{{col.name}}" value="{{ values.get(col.name, '') }}" {% if primary_key and col.name in primary_key %}readonly{% endif %}>
                         {% endif %}
                 </div>
         {% endfor %}
@@ -251,17 +344,239 @@ FORM_HTML = """
 
 @app.route("/", methods=["GET"])
 def index():
-    import os
+    tables = get_executor().catalog.list_tables()
+    return _render(INDEX_HTML, tables=tables)
+
+@app.route("/metrics")
+def metrics():
+    """Statement counters and latency histograms in the Prometheus text format."""
+    return get_executor().metrics.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@app.route("/replication/log")
+def replication_log():
+    """Change-log records after LSN `after` (at most `limit`) as NDJSON, for followers."""
+    global _log_reader
+    exe = get_executor()
+    if exe.changelog is None:
+        return _json_response({"error": "Change log is not enabled (set MINI_RDBMS_CHANGELOG)"}, 404)
+    if _log_reader is None:
+        from rdbms.replication import LogReader
+
+        _log_reader = LogReader(exe.changelog.path)
+    try:
+        after = int(request.args.get("after", 0))
+        limit = max(1, min(int(request.args.get("limit", 10000)), 100000))
+        records = _log_reader.read(after, limit)
+    except Exception as e:
+        return _json_response({"error": str(e)}, 400)
+    return Response(_ndjson_rows(records), mimetype="application/x-ndjson")
+
+
+@app.route("/replication/status")
+def replication_status():
+    """This node's role, log position and (on a follower) replication lag."""
+    exe = get_executor()
+    if _follower is not None:
+        return _json_response({"role": "follower", **_follower.status()})
+    if exe.changelog is not None:
+        return _json_response({"role": "primary", "lsn": exe.changelog.lsn})
+    return _json_response({"role": "standalone"})
+
+# JSON API: statements with `?` parameters in, JSON or NDJSON out
+
+# held while a request runs statements that write, so batches do not interleave
+_api_lock = threading.Lock()
+# rows per chunk of a streamed NDJSON result
+NDJSON_CHUNK_ROWS = 1000
+
+
+def _dumpb(obj):
+    from rdbms import codec
+
+    return codec.dumpb(obj)
+
+
+def _json_response(obj, status=200):
+    return Response(_dumpb(obj), status=status, mimetype="application/json")
+
+
+def _api_body():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+    return body
+
+
+def _wants_ndjson(body):
+    return body.get("format") == "ndjson" or "application/x-ndjson" in request.headers.get("Accept", "")
+
+
+def _check_statement(item):
+    if not isinstance(item, dict) or not isinstance(item.get("sql"), str):
+        raise ValueError("Each statement must be an object with an 'sql' string")
+    if item.get("params") is not None and not isinstance(item["params"], list):
+        raise ValueError("'params' must be a list")
+    many = item.get("many")
+    if many is not None and not (isinstance(many, list) and all(isinstance(p, list) for p in many)):
+        raise ValueError("'many' must be a list of parameter lists")
+
+
+def _ndjson_rows(rows):
+    # iterate rather than slice: a spilled result streams back from its temp file
+    chunk = []
+    for r in rows:
+        chunk.append(_dumpb(r) + b"\n")
+        if len(chunk) == NDJSON_CHUNK_ROWS:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _as_list(res):
+    """A SELECT that spilled under the memory budget returns a read-only
+    `RowBuffer` sequence; JSON and HTML output need a plain list."""
+    from rdbms.memory import RowBuffer
+
+    return list(res) if isinstance(res, RowBuffer) else res
 
-    cats = exe.catalog.base_dir
-    tables = [d for d in os.listdir(cats) if os.path.isdir(os.path.join(cats, d))]
-    return render_template_string(INDEX_HTML, tables=tables)
+
+@app.route("/api/query", methods=["POST"])
+def api_query():
+    """Run one statement: {"sql": "SELECT ... WHERE id = ?", "params": [1]}.
+
+    Responds {"result": rows or status}, or one JSON row per line when the
+    body has "format": "ndjson" or the request accepts application/x-ndjson.
+    An optional "timeout" (seconds) overrides the statement timeout.
+    SELECTs run without the API lock, so a slow query does not hold up others.
+    """
+    try:
+        body = _api_body()
+        _check_statement(body)
+        timeout = body.get("timeout")
+        if timeout is not None and not isinstance(timeout, (int, float)):
+            raise ValueError("'timeout' must be a number of seconds")
+        sql = body["sql"]
+        if sql.lstrip()[:6].upper() == "SELECT":
+            res = get_executor().execute(sql, body.get("params"), timeout=timeout)
+        else:
+            with _api_lock:
+                res = get_executor().execute(sql, body.get("params"), timeout=timeout)
+    except Exception as e:
+        return _json_response({"error": str(e)}, 400)
+    if _wants_ndjson(body) and not isinstance(res, (dict, type(None))):
+        return Response(_ndjson_rows(res), mimetype="application/x-ndjson")
+    return _json_response({"result": _as_list(res)})
+
+
+@app.route("/api/running")
+def api_running():
+    """Statements queued or running in this process, with their ids for /api/cancel."""
+    exe = get_executor()
+    admission = exe.admission.stats() if exe.admission is not None else None
+    return _json_response({"statements": exe.running(), "admission": admission})
+
+
+@app.route("/api/cancel/<int:statement_id>", methods=["POST"])
+def api_cancel(statement_id):
+    """Cancel a queued or running statement; it fails with QueryCancelled."""
+    if not get_executor().cancel(statement_id):
+        return _json_response({"error": f"No running statement {statement_id}"}, 404)
+    return _json_response({"cancelled": statement_id})
+
+
+def _batch_groups(statements):
+    """Split a batch into runs: (sql, [parameter lists], [(item index, count)], many).
+
+    Consecutive INSERTs with the same SQL share a run, executed as one
+    all-or-nothing `execute_many` (one data-file append and index write).
+    """
+    groups = []
+    for i, item in enumerate(statements):
+        _check_statement(item)
+        sql = item["sql"]
+        many = item.get("many")
+        param_sets = many if many is not None else [item.get("params") or []]
+        insert = sql.lstrip()[:6].upper() == "INSERT"
+        if insert and groups and groups[-1][3] and groups[-1][0] == sql:
+            groups[-1][1].extend(param_sets)
+            groups[-1][2].append((i, len(param_sets)))
+        else:
+            groups.append((sql, list(param_sets), [(i, len(param_sets))], insert or many is not None))
+    return groups
+
+
+def _run_batch(groups):
+    """Run batch groups in order, yielding (item index, result, error) and
+    stopping after the first failing group."""
+    exe = get_executor()
+    for sql, param_sets, items, many in groups:
+        try:
+            if many:
+                res = exe.execute_many(sql, param_sets)
+            else:
+                res = exe.execute(sql, param_sets[0] or None)
+        except Exception as e:
+            for i, _ in items:
+                yield i, None, str(e)
+            return
+        if many and len(items) > 1 and isinstance(res, dict) and "inserted" in res:
+            # a shared INSERT run: every parameter list inserted the same number of rows
+            per = res["inserted"] // max(1, len(param_sets))
+            for i, n in items:
+                yield i, {"status": "OK", "inserted": per * n}, None
+        else:
+            yield items[0][0], _as_list(res), None
+
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """Run statements in order in one request:
+    {"statements": [{"sql": ..., "params": [...]}, {"sql": ..., "many": [[...], ...]}]}.
+
+    Execution stops at the first error; statements before it stay applied
+    (the engine has no transactions, but each INSERT run is all-or-nothing).
+    Responds {"ok", "results", "failed_at", "error"}, or streams one NDJSON
+    line per statement followed by a summary line.
+    """
+    try:
+        body = _api_body()
+        statements = body.get("statements")
+        if not isinstance(statements, list):
+            raise ValueError("'statements' must be a list")
+        groups = _batch_groups(statements)
+    except Exception as e:
+        return _json_response({"error": str(e)}, 400)
+
+    if _wants_ndjson(body):
+        def generate():
+            ok, done = True, 0
+            with _api_lock:
+                for i, res, err in _run_batch(groups):
+                    line = {"index": i, "error": err} if err is not None else {"index": i, "result": res}
+                    ok = ok and err is None
+                    done += err is None
+                    yield _dumpb(line) + b"\n"
+            yield _dumpb({"ok": ok, "executed": done, "statements": len(statements)}) + b"\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    results, failed_at, error = [], None, None
+    with _api_lock:
+        for i, res, err in _run_batch(groups):
+            if err is not None:
+                failed_at = i if failed_at is None else failed_at
+                error = err
+                continue
+            results.append(res)
+    return _json_response({"ok": error is None, "results": results, "failed_at": failed_at, "error": error})
 
 @app.route("/execute", methods=["POST"])
 def execute():
     sql = request.form.get("sql")
     try:
-        res = exe.execute(sql)
+        res = _as_list(get_executor().execute(sql))
     except Exception as e:
         res = {"error": str(e)}
 
@@ -286,6 +601,9 @@ def execute():
             {% if res is mapping and res.status %}
                 <div class="alert alert-success">Status: {{ res.status }}{% if res.inserted is defined %} — inserted {{res.inserted}}{% endif %}{% if res.updated is defined %} — updated {{res.updated}}{% endif %}{% if res.deleted is defined %} — deleted {{res.deleted}}{% endif %}</div>
                 <pre>{{ res }}</pre>
+            {% elif plan is not none %}
+                <h4>Query plan</h4>
+                <pre class="bg-light p-3">{{ plan }}</pre>
             {% elif res is sequence and res|length>0 and res[0] is mapping %}
                 <h4>Rows ({{ res|length }})</h4>
                 <table class="table table-striped">
@@ -306,7 +624,11 @@ def execute():
     """
 
     headers = []
-    if isinstance(res, list) and res and isinstance(res[0], dict):
+    plan = None
+    if isinstance(res, list) and res and isinstance(res[0], dict) and list(res[0]) == ["QUERY PLAN"]:
+        # EXPLAIN output keeps its indentation
+        plan = "\n".join(r["QUERY PLAN"] for r in res)
+    elif isinstance(res, list) and res and isinstance(res[0], dict):
         # format values for display
         formatted = []
         keys = set()
@@ -316,29 +638,77 @@ def execute():
         headers = sorted(keys)
         res = formatted
 
-    return render_template_string(RESULT_HTML + GLOBAL_UI_SCRIPT, res=res, sql=sql, headers=headers)
+    return _render(RESULT_HTML, res=res, sql=sql, headers=headers, plan=plan)
     
 
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+def _cursor(arg):
+    """Decode an `after`/`before` query argument: JSON [row key, sort value]."""
+    if not arg:
+        return None
+    try:
+        pk, value = json.loads(arg)
+    except (ValueError, TypeError):
+        return None
+    return str(pk), value
+
+
 @app.route("/table/<table>")
 def show_table(table):
+    """One page of a table, ordered by the primary key or `?sort=col&dir=desc`.
+
+    Pages are found by keyset (`after`/`before` cursors) rather than OFFSET,
+    so every page costs the same regardless of its position in the table.
+    """
+    args = request.args
+    try:
+        limit = int(args.get("limit", 50))
+    except ValueError:
+        limit = 50
+    limit = min(max(limit, 1), max(PAGE_SIZES))
+    sort = args.get("sort") or None
+    direction = "desc" if args.get("dir") == "desc" else "asc"
+    error = None
     try:
-        rows_raw = exe.execute(f"SELECT * FROM {table};")
-        rows = []
-        if isinstance(rows_raw, list):
-            for r in rows_raw:
-                rows.append({k: _format_display_value(v) for k, v in r.items()})
+        t = get_executor().table(table)
+        if sort not in t.columns:
+            sort = None
+        page = t.page(sort, direction == "desc", after=_cursor(args.get("after")),
+                      before=_cursor(args.get("before")), limit=limit)
     except Exception as e:
-        rows_raw = []
-        rows = []
-    headers = []
-    if rows and isinstance(rows, list):
-        # collect union of keys
-        keys = set()
-        for r in rows:
-            keys.update(r.keys())
-        headers = sorted(keys)
-    # also pass raw rows for action links (preserve original PK values)
-    return render_template_string(TABLE_HTML, table=table, rows=rows, headers=headers, rows_raw=rows_raw)
+        t, page, error = None, {"rows": [], "offset": 0, "total": 0, "has_prev": False, "has_next": False}, str(e)
+    from rdbms.views import hidden_columns
+
+    # a materialized view's bookkeeping columns are not shown
+    headers = [c for c in t.columns if c not in hidden_columns(t.schema)] if t is not None else []
+    formatters = [_display_formatter(t.columns[h].get("type")) for h in headers] if t is not None else []
+    sort_column = sort or (t.pk_columns[0] if t is not None and t.pk_columns else None)
+
+    def link(**kw):
+        params = {"sort": sort, "dir": direction if sort or direction == "desc" else None, "limit": limit}
+        params.update(kw)
+        return url_for("show_table", table=table, **{k: v for k, v in params.items() if v is not None})
+
+    def cursor(item):
+        pk, row = item
+        return json.dumps([pk, row.get(sort) if sort else None])
+
+    page_rows = page["rows"]
+    # the header toggles direction on the current sort column, else sorts ascending
+    sort_links = {h: link(sort=h, dir="desc" if h == sort_column and direction == "asc" else "asc")
+                  for h in headers}
+    # cells are formatted lazily while the response streams; row links carry
+    # the full row key (the encoded key of every primary-key column)
+    rows = ((pk, [f(row.get(h)) for h, f in zip(headers, formatters)]) for pk, row in page_rows)
+    return _stream(TABLE_HTML, table=table, headers=headers, rows=rows, error=error,
+                   sort=sort, dir=direction, sort_column=sort_column, sort_links=sort_links,
+                   limit=limit, page_sizes=PAGE_SIZES, offset=page["offset"], count=len(page_rows),
+                   total=page["total"],
+                   first_link=link() if page["has_prev"] else None,
+                   prev_link=link(before=cursor(page_rows[0])) if page["has_prev"] and page_rows else None,
+                   next_link=link(after=cursor(page_rows[-1])) if page["has_next"] and page_rows else None)
 
 
 def _format_value_for_sql(val, typ):
@@ -446,16 +816,11 @@ CREATE_TABLE_HTML = """
 </html>
 """
 
-# Attach global UI script/CSS to templates so dark-mode works across pages
-INDEX_HTML = INDEX_HTML + GLOBAL_UI_SCRIPT
-TABLE_HTML = TABLE_HTML + GLOBAL_UI_SCRIPT
-FORM_HTML = FORM_HTML + GLOBAL_UI_SCRIPT
-CREATE_TABLE_HTML = CREATE_TABLE_HTML + GLOBAL_UI_SCRIPT
 
 
 @app.route('/table/<table>/insert', methods=['GET', 'POST'])
 def insert_row(table):
-    schema = exe.catalog.load_schema(table)
+    schema = get_executor().catalog.load_schema(table)
     cols = schema.get('columns', [])
     pk_col = schema.get('constraints', {}).get('primary_key', [None])[0]
     if request.method == 'POST':
@@ -486,13 +851,13 @@ def insert_row(table):
         vals = ', '.join([_format_value_for_sql(values[c['name']], c['type']) for c in cols])
         sql = f"INSERT INTO {table} ({col_names}) VALUES ({vals});"
         try:
-            exe.execute(sql)
+            get_executor().execute(sql)
             return redirect(url_for('show_table', table=table))
         except Exception as e:
             # For insert, allow editing PK (do not mark readonly)
-            return render_template_string(FORM_HTML, title=f"Insert into {table}", columns=cols, values=values, table=table, error=str(e), primary_key=None)
+            return _render(FORM_HTML, title=f"Insert into {table}", columns=cols, values=values, table=table, error=str(e), primary_key=None)
     # For insert form, allow editing primary key
-    return render_template_string(FORM_HTML, title=f"Insert into {table}", columns=cols, values={}, table=table, primary_key=None)
+    return _render(FORM_HTML, title=f"Insert into {table}", columns=cols, values={}, table=table, primary_key=None)
 
 
 @app.route('/table/<table>/rename', methods=['GET', 'POST'])
@@ -502,7 +867,7 @@ def rename_table(table):
                 if not new_name:
                         return render_template_string("<div class='alert alert-danger'>New name required</div><a href='/' class='btn btn-secondary'>Back</a>")
                 try:
-                        exe.execute(f"RENAME TABLE {table} TO {new_name};")
+                        get_executor().execute(f"RENAME TABLE {table} TO {new_name};")
                         return redirect(url_for('index'))
                 except Exception as e:
                         return render_template_string("<div class='alert alert-danger'>{{err}}</div><a href='/' class='btn btn-secondary'>Back</a>", err=str(e))
@@ -537,22 +902,37 @@ def rename_table(table):
 @app.route('/table/<table>/drop', methods=['POST'])
 def drop_table(table):
         try:
-                exe.execute(f"DROP TABLE {table};")
+                get_executor().execute(f"DROP TABLE {table};")
         except Exception as e:
                 return render_template_string("<div class='alert alert-danger'>{{err}}</div><a href='/' class='btn btn-secondary'>Back</a>", err=str(e))
         return redirect(url_for('index'))
 
 
-@app.route('/table/<table>/edit/<pk>', methods=['GET', 'POST'])
+def _row_key(table, pk):
+    """Decode a row key from a table page link into (primary-key columns,
+    WHERE clause with `?` placeholders, parameters)."""
+    t = get_executor().table(table)
+    cols = list(t.pk_columns)
+    if not cols:
+        abort(404)
+    try:
+        values = t.pk_values(pk)
+        params = [values[c] for c in cols]
+    except (ValueError, TypeError, KeyError):
+        abort(404)
+    return cols, " AND ".join(f"{c} = ?" for c in cols), params
+
+
+@app.route('/table/<table>/edit/<path:pk>', methods=['GET', 'POST'])
 def edit_row(table, pk):
-    schema = exe.catalog.load_schema(table)
+    schema = get_executor().catalog.load_schema(table)
     cols = schema.get('columns', [])
-    pk_col = schema.get('constraints', {}).get('primary_key', [cols[0]['name']])[0]
+    pk_cols, where, params = _row_key(table, pk)
     # fetch existing
-    rows = exe.execute(f"SELECT * FROM {table} WHERE {schema.get('constraints', {}).get('primary_key', [cols[0]['name']])[0]} = {pk};")
-    values = {}
-    if rows:
-        values = rows[0]
+    rows = get_executor().execute(f"SELECT * FROM {table} WHERE {where};", params)
+    if not rows:
+        abort(404)
+    values = rows[0]
     if request.method == 'POST':
         changes = {}
         for c in cols:
@@ -571,26 +951,22 @@ def edit_row(table, pk):
                     v = changes.get(name)
                     if v and 'T' in v and len(v) == 16:
                         changes[name] = v + ':00'
-        # build UPDATE excluding pk
-        pk_col = schema.get('constraints', {}).get('primary_key', [cols[0]['name']])[0]
-        set_clause = ', '.join([f"{c['name']} = {_format_value_for_sql(changes[c['name']], c['type'])}" for c in cols if c['name'] != pk_col])
-        sql = f"UPDATE {table} SET {set_clause} WHERE {pk_col} = {pk};"
+        # build UPDATE excluding the primary-key columns
+        set_clause = ', '.join([f"{c['name']} = {_format_value_for_sql(changes[c['name']], c['type'])}" for c in cols if c['name'] not in pk_cols])
+        sql = f"UPDATE {table} SET {set_clause} WHERE {where};"
         try:
-            exe.execute(sql)
+            get_executor().execute(sql, params)
             return redirect(url_for('show_table', table=table))
         except Exception as e:
-            return render_template_string(FORM_HTML, title=f"Edit {table}", columns=cols, values=changes, table=table, error=str(e), primary_key=pk_col)
-    return render_template_string(FORM_HTML, title=f"Edit {table}", columns=cols, values=values, table=table, primary_key=pk_col)
+            return _render(FORM_HTML, title=f"Edit {table}", columns=cols, values=changes, table=table, error=str(e), primary_key=pk_cols)
+    return _render(FORM_HTML, title=f"Edit {table}", columns=cols, values=values, table=table, primary_key=pk_cols)
 
 
-@app.route('/table/<table>/delete/<pk>', methods=['POST'])
+@app.route('/table/<table>/delete/<path:pk>', methods=['POST'])
 def delete_row(table, pk):
-    schema = exe.catalog.load_schema(table)
-    pk_col = schema.get('constraints', {}).get('primary_key', [None])[0]
-    if pk_col is None:
-        return redirect(url_for('show_table', table=table))
+    _, where, params = _row_key(table, pk)
     try:
-        exe.execute(f"DELETE FROM {table} WHERE {pk_col} = {pk};")
+        get_executor().execute(f"DELETE FROM {table} WHERE {where};", params)
     except Exception:
         pass
     return redirect(url_for('show_table', table=table))
@@ -621,7 +997,7 @@ def create_table():
                 col['default'] = d
             cols.append(col)
             if request.form.get(f'col_index_{i}'):
-                indexes.append(n.strip())
+                indexes.append({'columns': [n.strip()], 'unique': False})
         if not cols:
             return "At least one column required", 400
         pk_val = request.form.get('pk_col')
@@ -635,13 +1011,20 @@ def create_table():
                 pk_col = mapping.get(pk_idx)
             except Exception:
                 pk_col = None
-        schema = {'name': name, 'columns': cols, 'constraints': {'primary_key': [pk_col] if pk_col else None, 'unique': []}, 'indexes': indexes}
+        from rdbms.parser import CreateTable
+
+        stmt = CreateTable(name=name, columns=cols, indexes=indexes,
+                           constraints={'primary_key': [pk_col] if pk_col else None, 'unique': []})
         try:
-            exe.catalog.create_table(schema)
+            exe = get_executor()
+            if exe.read_only:
+                return "Error creating table: this node is a read-only follower", 400
+            # through the executor, so the table is also created on followers
+            exe.run_statement(stmt)
             return redirect(url_for('index'))
         except Exception as e:
             return f"Error creating table: {e}", 400
-    return render_template_string(CREATE_TABLE_HTML)
+    return _render(CREATE_TABLE_HTML)
 
 if __name__ == "__main__":
     app.run(port=5000)